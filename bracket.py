@@ -0,0 +1,236 @@
+"""
+Playoff brackets and whole-season tournaments sampled from a head-to-head matrix.
+
+Bracket odds replay the same pairs of footballsim.TEAMS over and over, so every
+ordered (home, away) pair is simulated once, up front. For each pair the matrix
+keeps:
+- the home team's win probability, with ties counted as half a win;
+- the tie probability;
+- the sampled final scores (the score distribution).
+
+The games are spread over worker processes. The finished matrix is saved to
+MATRIX_PATH under a key built from the effective engine config, the games per
+pair, the seed, the overtime rules and ENGINE_VERSION (the same hash sweep.py
+uses), so the matrix is only rebuilt when one of those changes.
+
+Sampling from the matrix needs no game engine:
+- simulate_brackets() plays a seeded 14-team bracket many times.
+- sample_seasons() draws whole seasons of results for season.seed_seasons().
+- tournament_odds() chains the two.
+Both samplers run at a few microseconds per game.
+
+    python bracket.py --games 40 --brackets 1000000
+"""
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import footballsim as fs
+import season
+import sweep
+
+MATRIX_PATH = "footballsim_matrix.json"
+DEFAULT_GAMES_PER_PAIR = 40
+ROUNDS = ("divisional", "conference", "super_bowl", "champion")
+
+# =========================== Matrix ===========================
+
+class WinMatrix:
+    """
+    Flat n*n tables indexed home * n + away. `p_home` counts ties as half a win;
+    `p_tie` is kept separately for regular-season sampling. `scores[i]` holds the
+    sampled (home, away) final scores for pair i (empty on the diagonal).
+    """
+
+    def __init__(self, p_home: List[float], p_tie: List[float], scores: List[List[Tuple[int, int]]], key: str = ""):
+        self.n = len(fs.TEAMS)
+        if not len(p_home) == len(p_tie) == len(scores) == self.n * self.n:
+            raise ValueError(f"matrix tables must have {self.n * self.n} entries")
+        self.p_home, self.p_tie, self.scores, self.key = p_home, p_tie, scores, key
+
+    def win_prob(self, home: int, away: int) -> float:
+        return self.p_home[home * self.n + away]
+
+    def neutral_prob(self, a: int, b: int) -> float:
+        """`a`'s chance against `b` on a neutral field: the two home/away matchups averaged."""
+        n = self.n
+        return 0.5 * (self.p_home[a * n + b] + 1.0 - self.p_home[b * n + a])
+
+    def sample_score(self, home: int, away: int, rng: random.Random) -> Tuple[int, int]:
+        return rng.choice(self.scores[home * self.n + away])
+
+    def to_json(self) -> dict:
+        return {"key": self.key, "p_home": self.p_home, "p_tie": self.p_tie, "scores": self.scores}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "WinMatrix":
+        return cls(data["p_home"], data["p_tie"], [[tuple(s) for s in pair] for pair in data["scores"]], data["key"])
+
+def matrix_key(games_per_pair: int, seed, overtime: Optional[str]) -> str:
+    return sweep.config_key(sweep.effective_overrides({}), games_per_pair, f"matrix/{seed}/{overtime}")
+
+def _play_pairs(overrides: sweep.Config, pairs: List[Tuple[int, int]], games: int, seed,
+                overtime: Optional[str]) -> List[List[Tuple[int, int]]]:
+    saved = random.getstate()
+    out = []
+    try:
+        with fs.config_overridden(overrides):
+            for h, a in pairs:
+                scores = []
+                for i in range(games):
+                    st = fs.simulate_game(fs.TEAMS[h], fs.TEAMS[a], seed=f"{seed}/{h}/{a}/{i}", overtime=overtime)
+                    scores.append((st.scoreboard[st.user_team.name], st.scoreboard[st.cpu_team.name]))
+                out.append(scores)
+    finally:
+        random.setstate(saved)
+    return out
+
+def build_matrix(games_per_pair: int = DEFAULT_GAMES_PER_PAIR, seed=0, overtime: Optional[str] = "playoff",
+                 workers: Optional[int] = None) -> WinMatrix:
+    """Plays `games_per_pair` seeded games for every ordered pair of TEAMS."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n = len(fs.TEAMS)
+    pairs = [(h, a) for h in range(n) for a in range(n) if h != a]
+    overrides = sweep.effective_overrides({})
+    n_chunks = max(1, min(len(pairs), workers * 4))
+    chunks = [pairs[i::n_chunks] for i in range(n_chunks)]
+    if workers <= 1:
+        results = [_play_pairs(overrides, c, games_per_pair, seed, overtime) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play_pairs, [overrides] * len(chunks), chunks, [games_per_pair] * len(chunks),
+                                    [seed] * len(chunks), [overtime] * len(chunks)))
+    p_home, p_tie = [0.5] * (n * n), [0.0] * (n * n)
+    scores: List[List[Tuple[int, int]]] = [[] for _ in range(n * n)]
+    for chunk, chunk_scores in zip(chunks, results):
+        for (h, a), games in zip(chunk, chunk_scores):
+            i = h * n + a
+            wins = sum(1 for x, y in games if x > y)
+            ties = sum(1 for x, y in games if x == y)
+            p_home[i] = (wins + 0.5 * ties) / len(games)
+            p_tie[i] = ties / len(games)
+            scores[i] = games
+    return WinMatrix(p_home, p_tie, scores, matrix_key(games_per_pair, seed, overtime))
+
+def load_matrix(games_per_pair: int = DEFAULT_GAMES_PER_PAIR, seed=0, overtime: Optional[str] = "playoff",
+                workers: Optional[int] = None, path: Optional[str] = MATRIX_PATH) -> WinMatrix:
+    """The matrix for the current engine config: read from `path` if it matches, else built and saved."""
+    key = matrix_key(games_per_pair, seed, overtime)
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("key") == key:
+            return WinMatrix.from_json(data)
+    matrix = build_matrix(games_per_pair, seed, overtime, workers)
+    if path:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(matrix.to_json(), f)
+        os.replace(tmp, path)
+    return matrix
+
+# =========================== Sampling ===========================
+
+def simulate_brackets(matrix: WinMatrix, seeds: Sequence[int], n: int, seed=None) -> Dict[str, Dict[str, float]]:
+    """
+    Plays the 14-team bracket `seeds` (season.SeasonStandings.seeds() order) `n` times.
+    The better seed hosts, the top seed has a bye, and the final is on a neutral field.
+    Returns, per playoff team, the share of brackets in which it reached each of ROUNDS.
+    """
+    per_conf = season.SEEDS_PER_CONFERENCE
+    # One bye and three wild-card games per conference: the rounds below are laid out for 7 seeds
+    assert per_conf == 7, per_conf
+    if len(seeds) != 2 * per_conf:
+        raise ValueError(f"expected {2 * per_conf} seeds, got {len(seeds)}")
+    rnd = random.Random(seed).random
+    p, size = matrix.p_home, matrix.n
+    confs = [list(seeds[:per_conf]), list(seeds[per_conf:])]
+    # Home win probability by seed position within each conference
+    home = [[p[s[i] * size + s[j]] for j in range(per_conf) for i in range(per_conf)] for s in confs]
+    final = [[matrix.neutral_prob(x, y) for y in confs[1]] for x in confs[0]]
+    counts = {t: [0, 0, 0, 0] for t in seeds}
+    for _ in range(n):
+        champs = []
+        for c in (0, 1):
+            hp, s = home[c], confs[c]
+            # seed positions 0..6; hp[j * per_conf + i] is position i hosting position j
+            a = 1 if rnd() < hp[6 * per_conf + 1] else 6
+            b = 2 if rnd() < hp[5 * per_conf + 2] else 5
+            d = 3 if rnd() < hp[4 * per_conf + 3] else 4
+            lo, mid, hi = sorted((a, b, d))
+            x = 0 if rnd() < hp[hi * per_conf] else hi
+            y = lo if rnd() < hp[mid * per_conf + lo] else mid
+            if x > y:
+                x, y = y, x
+            z = x if rnd() < hp[y * per_conf + x] else y
+            for pos in (0, lo, mid, hi):
+                counts[s[pos]][0] += 1
+            counts[s[x]][1] += 1
+            counts[s[y]][1] += 1
+            counts[s[z]][2] += 1
+            champs.append(z)
+        a, b = champs
+        winner = confs[0][a] if rnd() < final[a][b] else confs[1][b]
+        counts[winner][3] += 1
+    return {fs.TEAMS[t].name: dict(zip(ROUNDS, (c / n for c in cs))) for t, cs in counts.items()}
+
+def sample_seasons(matrix: WinMatrix, schedule: season.Schedule, n: int, seed=None) -> bytearray:
+    """`n` seasons of results for `schedule`, each game drawn from the matrix (ties included)."""
+    rnd = random.Random(seed).random
+    size = matrix.n
+    # Per game: below `win` the home team wins, below `win + tie` it's a tie
+    thresholds = []
+    for h, a in schedule.games:
+        i = h * size + a
+        tie = matrix.p_tie[i]
+        thresholds.append((matrix.p_home[i] - 0.5 * tie, matrix.p_home[i] + 0.5 * tie))
+    home_win, away_win, tie = season.HOME_WIN, season.AWAY_WIN, season.TIE
+    out = bytearray()
+    for _ in range(n):
+        out.extend(home_win if r < w else tie if r < wt else away_win
+                   for (w, wt), r in zip(thresholds, iter(rnd, None)))
+    return out
+
+def tournament_odds(matrix: WinMatrix, schedule: season.Schedule, n: int, seed=None,
+                    workers: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """Whole seasons sampled from the matrix, seeded, then one bracket each: playoff and round odds per team."""
+    results = sample_seasons(matrix, schedule, n, seed=f"{seed}/seasons")
+    seeds = season.seed_seasons(schedule, results, workers)
+    per_season = 2 * season.SEEDS_PER_CONFERENCE
+    totals = {t.name: dict.fromkeys(("playoffs",) + ROUNDS, 0.0) for t in fs.TEAMS}
+    for i in range(n):
+        for name, rounds in simulate_brackets(matrix, seeds[i * per_season:(i + 1) * per_season], 1,
+                                              seed=f"{seed}/{i}").items():
+            row = totals[name]
+            row["playoffs"] += 1
+            for r, v in rounds.items():
+                row[r] += v
+    return {name: {k: v / n for k, v in row.items()} for name, row in totals.items()}
+
+# =========================== CLI ===========================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Bracket odds sampled from a cached head-to-head matrix.")
+    ap.add_argument("--games", type=int, default=DEFAULT_GAMES_PER_PAIR, help="games per ordered pair")
+    ap.add_argument("--brackets", type=int, default=100000)
+    ap.add_argument("--year", type=int, default=0, help="schedule rotation year used to seed the bracket")
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--matrix", default=MATRIX_PATH, help="matrix cache file ('' to disable)")
+    args = ap.parse_args(argv)
+
+    matrix = load_matrix(args.games, args.seed, workers=args.workers, path=args.matrix or None)
+    schedule = season.make_schedule(args.year)
+    results = sample_seasons(matrix, schedule, 1, seed=args.seed)
+    seeds = season.SeasonStandings(schedule, bytes(results)).seeds()
+    odds = simulate_brackets(matrix, seeds, args.brackets, seed=args.seed)
+    print(f"{'team':12s} " + " ".join(f"{r:>10s}" for r in ROUNDS))
+    for name, rounds in sorted(odds.items(), key=lambda kv: -kv[1]["champion"]):
+        print(f"{name:12s} " + " ".join(f"{rounds[r] * 100:9.1f}%" for r in ROUNDS))
+
+if __name__ == "__main__":
+    main()
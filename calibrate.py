@@ -0,0 +1,180 @@
+"""
+Fits DEF_EFFECTS and the QB baseline clamps to league aggregates with SPSA
+(simultaneous perturbation stochastic approximation).
+
+Each iteration perturbs every parameter at once in a random +/- direction and
+plays the same seeded games for both sides of the perturbation (sweep.run_sweep,
+so the games run in parallel with common random numbers). Two evaluations per
+iteration regardless of the number of parameters keeps a full calibration to
+a few minutes. The result is written as a JSON config for footballsim.load_config;
+the source is never edited.
+
+Targets CSV (weight optional, default 1):
+
+    metric,target,weight
+    yards_per_play,5.4,1
+    completion_pct,64.5,1
+    points_per_game,22.0,1
+
+    python calibrate.py league_targets.csv --iterations 40 --games 200 --out footballsim_config.json
+"""
+import argparse
+import csv
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import footballsim as fs
+import sweep
+
+CONFIG_PATH = "footballsim_config.json"
+
+Targets = Dict[str, Tuple[float, float]]  # metric -> (target, weight)
+
+@dataclass(frozen=True)
+class Param:
+    """
+    One tunable knob. `key` is an override key; "*.field" shifts that field in every
+    formation by the same amount, keeping the formations' differences. Shifts are
+    bounded to [lo, hi] and the optimizer moves in units of `scale`.
+    """
+    key: str
+    scale: float
+    lo: float
+    hi: float
+
+DEFAULT_PARAMS = [
+    Param("*.pass_mean", 1.0, -4.0, 4.0),
+    Param("*.run_mean", 0.5, -2.0, 2.0),
+    Param("*.tfl_chance", 0.02, -0.05, 0.05),
+    Param("*.pass_big_play_chance", 0.01, -0.03, 0.05),
+    Param("*.run_big_play_chance", 0.01, -0.03, 0.05),
+    Param("*.pass_completion_adj", 0.02, -0.10, 0.10),
+    Param("pass_baseline.comp_min", 0.02, -0.10, 0.05),
+    Param("pass_baseline.comp_max", 0.02, -0.05, 0.10),
+]
+
+# Fields that are probabilities or magnitudes and must not go negative.
+_NON_NEGATIVE = ("_chance", "_mean", "_std")
+
+def read_targets(path: str) -> Targets:
+    targets: Targets = {}
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            metric = row["metric"].strip()
+            if metric not in sweep.METRICS:
+                raise ValueError(f"Unknown metric {metric!r} (expected one of {', '.join(sweep.METRICS)})")
+            weight = row.get("weight") or "1"
+            targets[metric] = (float(row["target"]), float(weight))
+    if not targets:
+        raise ValueError(f"No targets in {path}")
+    return targets
+
+def loss(metrics: Dict[str, float], targets: Targets) -> float:
+    """Weighted sum of squared relative errors."""
+    return sum(w * ((metrics[m] - t) / t) ** 2 for m, (t, w) in targets.items())
+
+def overrides_for(shifts: List[float], params: List[Param]) -> sweep.Config:
+    """Turns parameter shifts into absolute overrides against the current engine values."""
+    overrides: sweep.Config = {}
+    for p, shift in zip(params, shifts):
+        table, _, name = p.key.rpartition(".")
+        keys = [f"{f}.{name}" for f in fs.DEF_CHOICES] if table == "*" else [p.key]
+        for key in keys:
+            [(values, _)] = fs.effect_override_targets(key)
+            value = values[name] + shift
+            overrides[key] = max(0.0, value) if name.endswith(_NON_NEGATIVE) else value
+    return overrides
+
+@dataclass
+class CalibrationResult:
+    overrides: sweep.Config
+    loss: float
+    metrics: Dict[str, float]
+    start_loss: float
+    start_metrics: Dict[str, float]
+    history: List[float] = field(default_factory=list)  # mean loss of each iteration's +/- pair
+
+def calibrate(targets: Targets, params: Optional[List[Param]] = None, iterations: int = 40,
+              games: int = sweep.DEFAULT_GAMES, seed=0, workers: Optional[int] = None,
+              a: Optional[float] = None, c: float = 1.0, initial_step: float = 0.5,
+              log: Callable[[str], None] = print) -> CalibrationResult:
+    """
+    Runs SPSA for `iterations` steps and evaluates the start and end points on a
+    fresh set of `2 * games` games. With `a=None` the step size is set from the first
+    gradient estimate so the first move is about `initial_step` scale units.
+    """
+    params = list(params) if params is not None else list(DEFAULT_PARAMS)
+    rng = random.Random(f"spsa/{seed}")
+    A = max(1.0, iterations / 10)
+    u = [0.0] * len(params)  # shifts in units of each param's scale
+    bounds = [(p.lo / p.scale, p.hi / p.scale) for p in params]
+
+    def clip(v: List[float]) -> List[float]:
+        return [min(hi, max(lo, x)) for x, (lo, hi) in zip(v, bounds)]
+
+    def configs(*points: List[float]) -> List[sweep.Config]:
+        return [overrides_for([x * p.scale for x, p in zip(pt, params)], params) for pt in points]
+
+    history = []
+    for k in range(iterations):
+        ck = c / (k + 1) ** 0.101
+        delta = [rng.choice((-1, 1)) for _ in params]
+        plus = clip([x + ck * d for x, d in zip(u, delta)])
+        minus = clip([x - ck * d for x, d in zip(u, delta)])
+        rows = sweep.run_sweep(configs(plus, minus), games=games, seed=f"{seed}/{k}", workers=workers)
+        lp, lm = loss(rows[0], targets), loss(rows[1], targets)
+        g = [(lp - lm) / (2 * ck * d) for d in delta]
+        if a is None:
+            a = initial_step * (A + 1) ** 0.602 / max(max(abs(x) for x in g), 1e-12)
+        ak = a / (k + 1 + A) ** 0.602
+        u = clip([x - ak * gi for x, gi in zip(u, g)])
+        history.append((lp + lm) / 2)
+        log(f"iter {k + 1:3d}/{iterations}  loss {history[-1]:.5f}")
+
+    start, end = sweep.run_sweep(configs([0.0] * len(params), u), games=2 * games, seed=f"{seed}/final", workers=workers)
+    start_metrics = {m: start[m] for m in sweep.METRICS}
+    end_metrics = {m: end[m] for m in sweep.METRICS}
+    return CalibrationResult(
+        overrides=configs(u)[0],
+        loss=loss(end_metrics, targets), metrics=end_metrics,
+        start_loss=loss(start_metrics, targets), start_metrics=start_metrics,
+        history=history,
+    )
+
+def write_config(result: CalibrationResult, targets: Targets, path: str = CONFIG_PATH) -> None:
+    with fs.config_overridden(result.overrides):
+        config = fs.export_config()
+    config["calibration"] = {  # informational; load_config ignores it
+        "engine_version": fs.ENGINE_VERSION,
+        "targets": {m: t for m, (t, _) in targets.items()},
+        "metrics": result.metrics,
+        "loss": result.loss,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Calibrate DEF_EFFECTS to league targets with SPSA.")
+    ap.add_argument("targets", help="CSV with metric,target[,weight] columns")
+    ap.add_argument("--iterations", type=int, default=40)
+    ap.add_argument("--games", type=int, default=sweep.DEFAULT_GAMES, help="games per evaluation")
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--start", default=None, help="config JSON to start from")
+    ap.add_argument("--out", default=CONFIG_PATH)
+    args = ap.parse_args(argv)
+
+    if args.start:
+        fs.load_config(args.start)
+    targets = read_targets(args.targets)
+    result = calibrate(targets, iterations=args.iterations, games=args.games, seed=args.seed, workers=args.workers)
+    for m in targets:
+        print(f"{m:16s} target {targets[m][0]:7.2f} | start {result.start_metrics[m]:7.2f} | fitted {result.metrics[m]:7.2f}")
+    print(f"loss {result.start_loss:.5f} -> {result.loss:.5f}")
+    write_config(result, targets, args.out)
+    print(f"Wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
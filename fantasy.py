@@ -0,0 +1,214 @@
+"""
+Fantasy-point projections for a weekly slate of simulated games.
+
+Each matchup of the slate is simulated once. Every rostered player's stat line
+is kept for every game, in one array('h') per matchup (game-major: game,
+player, then projections.STAT_FIELDS). These lines are cached in memory, and
+optionally in a JSON file, under a key built from the effective engine config,
+the games per matchup, the seed and ENGINE_VERSION (the same hash sweep.py
+uses). Scoring is applied afterwards, so switching between the SCORING systems
+(or custom weights, or boom/bust lines) costs no simulation at all.
+
+Per player, project_slate() reports:
+- mean, std and p10/p50/p90 of fantasy points;
+- boom: the share of games at or above `boom` points;
+- bust: the share of games at or below `bust` points.
+
+    python fantasy.py --games 2000 --scoring half_ppr
+"""
+import argparse
+import json
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import footballsim as fs
+import projections
+import season
+import sweep
+
+STAT_FIELDS = projections.STAT_FIELDS
+DEFAULT_GAMES = 1000
+BOOM_POINTS = 20.0
+BUST_POINTS = 5.0
+
+_STANDARD = {"rush_yards": 0.1, "rec_yards": 0.1, "pass_yards": 0.04, "touchdowns": 6.0,
+             "pass_touchdowns": 4.0, "interceptions_thrown": -2.0, "receptions": 0.0}
+SCORING: Dict[str, Dict[str, float]] = {
+    "standard": _STANDARD,
+    "half_ppr": dict(_STANDARD, receptions=0.5),
+    "ppr": dict(_STANDARD, receptions=1.0),
+}
+
+Scoring = Union[str, Dict[str, float]]
+PlayerKey = Tuple[str, str]  # (team, canonical player name)
+
+# In-process cache: matchup key -> MatchupLines
+_LINES_CACHE: Dict[str, "MatchupLines"] = {}
+
+# =========================== Stat lines ===========================
+
+class MatchupLines:
+    """Every rostered player's stat line in each of `games` simulated games of one matchup."""
+    __slots__ = ("players", "games", "values", "key")
+
+    def __init__(self, players: List[PlayerKey], games: int, values: array, key: str = ""):
+        if len(values) != games * len(players) * len(STAT_FIELDS):
+            raise ValueError(f"expected {games * len(players) * len(STAT_FIELDS)} values, got {len(values)}")
+        self.players, self.games, self.values, self.key = players, games, values, key
+
+    def points(self, weights: Sequence[float]) -> Dict[PlayerKey, List[float]]:
+        """Fantasy points per player and game, for weights in STAT_FIELDS order."""
+        width = len(STAT_FIELDS)
+        stride = len(self.players) * width
+        vals = self.values
+        out = {}
+        for p, player in enumerate(self.players):
+            out[player] = [sum(w * v for w, v in zip(weights, vals[g * stride + p * width:g * stride + (p + 1) * width]))
+                           for g in range(self.games)]
+        return out
+
+    def to_json(self) -> dict:
+        return {"key": self.key, "players": self.players, "games": self.games, "values": self.values.tolist()}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "MatchupLines":
+        return cls([tuple(p) for p in data["players"]], data["games"], array("h", data["values"]), data["key"])
+
+def lines_key(home: int, away: int, games: int, seed) -> str:
+    return sweep.config_key(sweep.effective_overrides({}), games, f"fantasy/{seed}/{home}/{away}")
+
+def _rostered(team: fs.Team) -> List[PlayerKey]:
+    return [(team.name, fs.canonical_name(team.roster[pos])) for pos in fs.ROSTER_POSITIONS]
+
+def _simulate_matchup(overrides: sweep.Config, home: int, away: int, games: int, seed) -> MatchupLines:
+    h, a = fs.TEAMS[home], fs.TEAMS[away]
+    players = _rostered(h) + _rostered(a)
+    values = array("h")
+    saved = random.getstate()
+    try:
+        with fs.config_overridden(overrides):
+            for i in range(games):
+                st = fs.simulate_game(h, a, seed=f"{seed}/{home}/{away}/{i}")
+                merged = {team: fs.coalesce(st.stats.get(team, {})) for team in (h.name, a.name)}
+                for team, name in players:
+                    ps = merged[team].get(name) or fs.PlayerStats()
+                    values.extend(getattr(ps, f) for f in STAT_FIELDS)
+    finally:
+        random.setstate(saved)
+    return MatchupLines(players, games, values, lines_key(home, away, games, seed))
+
+def load_slate(slate: Sequence[Tuple[int, int]], games: int = DEFAULT_GAMES, seed=0,
+               workers: Optional[int] = None, path: Optional[str] = None) -> List[MatchupLines]:
+    """
+    Stat lines for each (home, away) matchup of `slate`. Matchups already cached
+    for the current config (in this process, or in `path`) are reused; the rest
+    are simulated, one matchup per task, and cached.
+    """
+    stored: Dict[str, dict] = {}
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    keys = [lines_key(h, a, games, seed) for h, a in slate]
+    for k in keys:
+        if k not in _LINES_CACHE and k in stored:
+            _LINES_CACHE[k] = MatchupLines.from_json(stored[k])
+    missing = [(h, a) for (h, a), k in zip(slate, keys) if k not in _LINES_CACHE]
+    missing = list(dict.fromkeys(missing))
+    if missing:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        overrides = sweep.effective_overrides({})
+        if workers <= 1 or len(missing) == 1:
+            fresh = [_simulate_matchup(overrides, h, a, games, seed) for h, a in missing]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+                fresh = list(pool.map(_simulate_matchup, [overrides] * len(missing), [h for h, _ in missing],
+                                      [a for _, a in missing], [games] * len(missing), [seed] * len(missing)))
+        for lines in fresh:
+            _LINES_CACHE[lines.key] = lines
+        if path:
+            stored.update({lines.key: lines.to_json() for lines in fresh})
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(tmp, path)
+    return [_LINES_CACHE[k] for k in keys]
+
+def clear_cache() -> None:
+    _LINES_CACHE.clear()
+
+# =========================== Scoring ===========================
+
+def scoring_weights(scoring: Scoring) -> List[float]:
+    """Weights in STAT_FIELDS order, from a SCORING name or a {stat: points} dict (missing stats score 0)."""
+    table = SCORING[scoring] if isinstance(scoring, str) else scoring
+    unknown = set(table) - set(STAT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown stats in scoring: {sorted(unknown)}")
+    return [float(table.get(f, 0.0)) for f in STAT_FIELDS]
+
+def fantasy_points(ps: fs.PlayerStats, scoring: Scoring = "ppr") -> float:
+    return sum(w * getattr(ps, f) for w, f in zip(scoring_weights(scoring), STAT_FIELDS))
+
+def score_slate(lines: Sequence[MatchupLines], scoring: Scoring = "ppr", boom: float = BOOM_POINTS,
+                bust: float = BUST_POINTS,
+                quantiles: Sequence[float] = projections.DEFAULT_QUANTILES) -> Dict[PlayerKey, dict]:
+    """Per player: games, mean, std, one "pNN" entry per quantile, and boom/bust shares."""
+    weights = scoring_weights(scoring)
+    out = {}
+    for matchup in lines:
+        for player, pts in matchup.points(weights).items():
+            moments = projections.RunningStats()
+            for x in pts:
+                moments.push(x)
+            ranked = sorted(pts)
+            n = len(ranked)
+            row = {"games": n, "mean": moments.mean, "std": moments.std}
+            row.update((f"p{round(q * 100)}", ranked[min(int(q * n), n - 1)]) for q in quantiles)
+            row["boom"] = sum(1 for x in pts if x >= boom) / n
+            row["bust"] = sum(1 for x in pts if x <= bust) / n
+            out[player] = row
+    return out
+
+def project_slate(slate: Sequence[Tuple[int, int]], scoring: Scoring = "ppr", games: int = DEFAULT_GAMES,
+                  seed=0, workers: Optional[int] = None, path: Optional[str] = None, boom: float = BOOM_POINTS,
+                  bust: float = BUST_POINTS) -> Dict[PlayerKey, dict]:
+    return score_slate(load_slate(slate, games, seed, workers, path), scoring, boom, bust)
+
+def default_slate(year: int = 0) -> List[Tuple[int, int]]:
+    """One week: schedule games taken in order, skipping any team already playing."""
+    busy, slate = set(), []
+    for h, a in season.make_schedule(year).games:
+        if h not in busy and a not in busy:
+            busy.update((h, a))
+            slate.append((h, a))
+    return slate
+
+# =========================== CLI ===========================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Fantasy-point projections for a simulated weekly slate.")
+    ap.add_argument("--games", type=int, default=DEFAULT_GAMES, help="games per matchup")
+    ap.add_argument("--scoring", default="ppr", choices=sorted(SCORING))
+    ap.add_argument("--year", type=int, default=0, help="schedule rotation year the slate is drawn from")
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--boom", type=float, default=BOOM_POINTS)
+    ap.add_argument("--bust", type=float, default=BUST_POINTS)
+    ap.add_argument("--cache", default=None, help="JSON file to keep stat lines in between runs")
+    ap.add_argument("--top", type=int, default=40)
+    args = ap.parse_args(argv)
+
+    rows = project_slate(default_slate(args.year), args.scoring, args.games, args.seed, args.workers,
+                         args.cache, args.boom, args.bust)
+    print(f"{'team':12s} {'player':22s} {'mean':>6s} {'std':>5s} {'p10':>6s} {'p50':>6s} {'p90':>6s} "
+          f"{'boom':>6s} {'bust':>6s}")
+    for (team, player), r in sorted(rows.items(), key=lambda kv: -kv[1]["mean"])[:args.top]:
+        print(f"{team:12s} {player:22s} {r['mean']:6.1f} {r['std']:5.1f} {r['p10']:6.1f} {r['p50']:6.1f} "
+              f"{r['p90']:6.1f} {r['boom'] * 100:5.1f}% {r['bust'] * 100:5.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,23 @@
 
+import copy
+import json
+import math
+import os
+import queue
 import random
+import struct
+import sys
+import time
 import unicodedata
-from dataclasses import dataclass
-from typing import Dict, Tuple, Optional, List
+import zlib
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
+from itertools import accumulate
+from statistics import NormalDist
+from typing import Callable, Dict, Tuple, Optional, List
 
 # =========================== Team & Player Structures ===========================
 
@@ -17,14 +32,18 @@ class PlayerStats:
     rush_yards: int = 0
     rec_yards: int = 0
     pass_yards: int = 0
-    touchdowns: int = 0
+    touchdowns: int = 0          # rushing and receiving
     interceptions_thrown: int = 0
+    receptions: int = 0
+    pass_touchdowns: int = 0
 
 StatsType = Dict[str, Dict[str, PlayerStats]]
 
 # =========================== Canonicalization Helpers ===========================
 
+@lru_cache(maxsize=1024)
 def canonical_name(name: str) -> str:
+    # Memoized: the same few roster names are normalized on every snap.
     s = unicodedata.normalize("NFKC", name or "")
     s = " ".join(s.strip().split())
     return s
@@ -35,6 +54,16 @@ def ensure_player(stats: StatsType, team: str, player: str) -> None:
     stats.setdefault(team_key, {})
     stats[team_key].setdefault(player_key, PlayerStats())
 
+def player_stats(stats: StatsType, team: str, player: str) -> PlayerStats:
+    """Stats row for an already-canonical name (no re-normalization)."""
+    team_stats = stats.get(team)
+    if team_stats is None:
+        team_stats = stats[team] = {}
+    row = team_stats.get(player)
+    if row is None:
+        row = team_stats[player] = PlayerStats()
+    return row
+
 # =========================== Config & Effects ===========================
 
 # Formation effects (unchanged)
@@ -83,6 +112,82 @@ DEF_EFFECTS = {
 }
 DEF_CHOICES = list(DEF_EFFECTS.keys())
 
+# Allowed range of every DEF_EFFECTS field. The *_bonus fields are (low, high) ranges
+# of whole yards; everything else is a number.
+EFFECT_RANGES: Dict[str, Tuple[float, float]] = {
+    "pass_completion_adj": (-0.5, 0.5),
+    "pass_int_adj": (-0.1, 0.1),
+    "sack_adj": (-0.2, 0.2),
+    "pass_mean": (0, 99),
+    "pass_std": (0, 30),
+    "pass_big_play_chance": (0, 1),
+    "pass_big_play_bonus": (0, 99),
+    "run_mean": (0, 99),
+    "run_std": (0, 20),
+    "tfl_chance": (0, 1),
+    "run_big_play_chance": (0, 1),
+    "run_big_play_bonus": (0, 99),
+}
+
+@dataclass(frozen=True)
+class FormationEffects:
+    """
+    One DEF_EFFECTS entry, validated and compiled for the play samplers, which read
+    it by attribute. DEF_EFFECTS stays the editable source; FORMATIONS is rebuilt
+    whenever it is changed through the config functions below.
+    """
+    __slots__ = tuple(EFFECT_RANGES)
+    pass_completion_adj: float
+    pass_int_adj: float
+    sack_adj: float
+    pass_mean: float
+    pass_std: float
+    pass_big_play_chance: float
+    pass_big_play_bonus: Tuple[int, int]
+    run_mean: float
+    run_std: float
+    tfl_chance: float
+    run_big_play_chance: float
+    run_big_play_bonus: Tuple[int, int]
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def compile_formation(name: str, effects: Dict[str, object]) -> FormationEffects:
+    """Checks one formation against EFFECT_RANGES; raises ValueError naming the bad field."""
+    missing = [k for k in EFFECT_RANGES if k not in effects]
+    unknown = [k for k in effects if k not in EFFECT_RANGES]
+    if missing or unknown:
+        problems = ([f"missing {', '.join(missing)}"] if missing else []) + \
+                   ([f"unknown {', '.join(unknown)}"] if unknown else [])
+        raise ValueError(f"Formation {name!r}: {'; '.join(problems)}")
+    values = {}
+    for key, (lo, hi) in EFFECT_RANGES.items():
+        v = effects[key]
+        if key.endswith("_bonus"):
+            ok = (isinstance(v, (tuple, list)) and len(v) == 2
+                  and all(isinstance(x, int) and not isinstance(x, bool) for x in v) and lo <= v[0] <= v[1] <= hi)
+            if not ok:
+                raise ValueError(f"{name}.{key} must be a (low, high) pair of whole yards in {lo}..{hi}, got {v!r}")
+            v = tuple(v)
+        elif not (_is_number(v) and lo <= v <= hi):
+            raise ValueError(f"{name}.{key} must be a number in {lo}..{hi}, got {v!r}")
+        values[key] = v
+    return FormationEffects(**values)
+
+def compile_formations(effects: Dict[str, Dict[str, object]]) -> Dict[str, FormationEffects]:
+    return {name: compile_formation(name, eff) for name, eff in effects.items()}
+
+FORMATIONS: Dict[str, FormationEffects] = compile_formations(DEF_EFFECTS)
+
+def register_formation(name: str, effects: Dict[str, object]) -> None:
+    """Adds (or replaces) a defensive formation; it is validated before anything changes."""
+    compiled = compile_formation(name, effects)
+    DEF_EFFECTS[name] = {k: getattr(compiled, k) for k in EFFECT_RANGES}
+    if name not in DEF_CHOICES:
+        DEF_CHOICES.append(name)
+    FORMATIONS[name] = compiled
+
 # =========================== Your Teams ===========================
 
 TEAMS = [
@@ -127,6 +232,24 @@ TEAMS = [
     Team("Raiders", {"QB": "G. Smith", "RB": "A. Jeanty", "WR1": "T. Lockett", "WR2": "J. Bech", "TE": "B. Bowers"}),
 ]
 
+# Four teams per division, in TEAMS order. A team's place in its tuple is its
+# default division finish (used by schedule rotations when no standings are given).
+DIVISIONS: Dict[str, Tuple[str, ...]] = {
+    "NFC North": ("Packers", "Bears", "Lions", "Vikings"),
+    "NFC South": ("Saints", "Falcons", "Bucaneers", "Panthers"),
+    "NFC East": ("Eagles", "Cowboys", "Giants", "Commanders"),
+    "NFC West": ("Seahawks", "Rams", "49ers", "Cardinals"),
+    "AFC North": ("Steelers", "Ravens", "Browns", "Bengals"),
+    "AFC East": ("Patriots", "Bills", "Dolphins", "Jets"),
+    "AFC South": ("Texans", "Colts", "Titans", "Jaguars"),
+    "AFC West": ("Broncos", "Chargers", "Chiefs", "Raiders"),
+}
+CONFERENCES: Dict[str, Tuple[str, ...]] = {
+    "NFC": ("NFC North", "NFC South", "NFC East", "NFC West"),
+    "AFC": ("AFC North", "AFC East", "AFC South", "AFC West"),
+}
+TEAM_DIVISION: Dict[str, str] = {team: div for div, teams in DIVISIONS.items() for team in teams}
+
 # =========================== QB baselines (comp %, INT %) ===========================
 
 QB_INPUT_RATES: Dict[str, Dict[str, float]] = {
@@ -172,6 +295,150 @@ QB_INPUT_RATES: Dict[str, Dict[str, float]] = {
     "Raiders":  {"comp_pct": 67.4, "int_pct": 4.8},
 }
 
+# Clamp ranges applied to the QB baselines in get_team_pass_baselines().
+PASS_BASELINE_CLAMPS: Dict[str, float] = {
+    "comp_min": 0.55, "comp_max": 0.75,
+    "int_min": 0.008, "int_max": 0.035,
+}
+
+# Per-team nudges to the QB baselines, added before the clamps. All zero by default;
+# ratings.py derives them from power ratings.
+TEAM_ADJUSTMENT_RANGES: Dict[str, Tuple[float, float]] = {"comp_adj": (-0.15, 0.15), "int_adj": (-0.03, 0.03)}
+TEAM_ADJUSTMENTS: Dict[str, Dict[str, float]] = {t.name: dict.fromkeys(TEAM_ADJUSTMENT_RANGES, 0.0) for t in TEAMS}
+
+# =========================== Tunable config ===========================
+# DEF_EFFECTS, PASS_BASELINE_CLAMPS, TEAM_ADJUSTMENTS and PENALTIES can be overridden
+# for a sweep or loaded from a JSON config file (see calibrate.py), without editing
+# this module.
+
+def effect_override_targets(key: str) -> List[Tuple[dict, str]]:
+    """
+    Resolves an override key to the (table, field) slots it sets:
+    "Formation.param", "*.param" (every formation), "pass_baseline.param",
+    "team.Name.param" or "penalty.name.field".
+    """
+    table, sep, param = key.rpartition(".")
+    if not sep:
+        raise ValueError(f"Override key must look like 'Formation.param': {key!r}")
+    if table == "pass_baseline":
+        if param not in PASS_BASELINE_CLAMPS:
+            raise ValueError(f"Unknown PASS_BASELINE_CLAMPS entry: {param}")
+        return [(PASS_BASELINE_CLAMPS, param)]
+    if table.startswith("team."):
+        name = table[len("team."):]
+        if name not in TEAM_ADJUSTMENTS or param not in TEAM_ADJUSTMENT_RANGES:
+            raise ValueError(f"Unknown TEAM_ADJUSTMENTS entry: {name}.{param}")
+        return [(TEAM_ADJUSTMENTS[name], param)]
+    if table.startswith("penalty."):
+        name = table[len("penalty."):]
+        if name not in PENALTIES or param not in PENALTIES[name]:
+            raise ValueError(f"Unknown PENALTIES entry: {name}.{param}")
+        return [(PENALTIES[name], param)]
+    formations = DEF_CHOICES if table == "*" else [table]
+    for f in formations:
+        if f not in DEF_EFFECTS or param not in DEF_EFFECTS[f]:
+            raise ValueError(f"Unknown DEF_EFFECTS entry: {f}.{param}")
+    return [(DEF_EFFECTS[f], param) for f in formations]
+
+def _check_team_adjustments() -> None:
+    for name, adj in TEAM_ADJUSTMENTS.items():
+        for key, (lo, hi) in TEAM_ADJUSTMENT_RANGES.items():
+            if not (_is_number(adj[key]) and lo <= adj[key] <= hi):
+                raise ValueError(f"team.{name}.{key} must be a number in {lo}..{hi}, got {adj[key]!r}")
+
+_config_generation = 0
+
+def config_generation() -> int:
+    """Bumped on every config change made through overrides or apply_config(), so caches can check it cheaply."""
+    return _config_generation
+
+def clear_table_caches() -> None:
+    """Drops the cached situation and conversion tables; call it after editing KICKOFF or CONVERSIONS."""
+    situation_table.cache_clear()
+    conversion_chart.cache_clear()
+
+def _recompile() -> None:
+    """Rebuilds FORMATIONS and PENALTY_TYPES from their source tables."""
+    global _config_generation
+    _check_team_adjustments()
+    formations = compile_formations(DEF_EFFECTS)  # these raise before anything changes
+    penalties = compile_penalties(PENALTIES)
+    FORMATIONS.clear()
+    FORMATIONS.update(formations)
+    PENALTY_TYPES.clear()
+    PENALTY_TYPES.update(penalties)
+    _PENALTY_TABLES.clear()
+    clear_table_caches()
+    _config_generation += 1
+
+def _set_overrides(overrides: Dict[str, object]) -> List[Tuple[dict, str, object]]:
+    """
+    Writes overrides into the tables and recompiles them. Returns the values
+    they replaced; on an unknown key or an out-of-range value nothing is changed.
+    """
+    if not overrides:
+        return []
+    saved = []
+    try:
+        for key, value in overrides.items():
+            for table, param in effect_override_targets(key):
+                saved.append((table, param, table[param]))
+                table[param] = value
+        _recompile()
+    except ValueError:
+        _restore_overrides(saved)
+        raise
+    return saved
+
+def _restore_overrides(saved: List[Tuple[dict, str, object]]) -> None:
+    if not saved:
+        return
+    for table, param, value in reversed(saved):
+        table[param] = value
+    _recompile()
+
+@contextmanager
+def config_overridden(overrides: Dict[str, object]):
+    """Temporarily applies overrides in place; old values come back on exit."""
+    saved = _set_overrides(overrides)
+    try:
+        yield
+    finally:
+        _restore_overrides(saved)
+
+def export_config() -> dict:
+    return {
+        "def_effects": {f: {k: list(v) if isinstance(v, tuple) else v for k, v in eff.items()}
+                        for f, eff in DEF_EFFECTS.items()},
+        "pass_baseline_clamps": dict(PASS_BASELINE_CLAMPS),
+        "team_adjustments": {name: dict(adj) for name, adj in TEAM_ADJUSTMENTS.items()},
+        "penalties": {name: dict(spec, rates=dict(spec["rates"])) for name, spec in PENALTIES.items()},
+    }
+
+def config_to_overrides(config: dict) -> Dict[str, object]:
+    """Flattens a (possibly partial) export_config() dict into override keys."""
+    overrides = {}
+    for f, eff in config.get("def_effects", {}).items():
+        for k, v in eff.items():
+            overrides[f"{f}.{k}"] = tuple(v) if isinstance(v, list) else v
+    for k, v in config.get("pass_baseline_clamps", {}).items():
+        overrides[f"pass_baseline.{k}"] = v
+    for name, adj in config.get("team_adjustments", {}).items():
+        for k, v in adj.items():
+            overrides[f"team.{name}.{k}"] = v
+    for name, spec in config.get("penalties", {}).items():
+        for k, v in spec.items():
+            overrides[f"penalty.{name}.{k}"] = v
+    return overrides
+
+def apply_config(config: dict) -> None:
+    """Applies a (possibly partial) config as produced by export_config(); all or nothing."""
+    _set_overrides(config_to_overrides(config))
+
+def load_config(path: str) -> None:
+    with open(path, "r", encoding="utf-8") as f:
+        apply_config(json.load(f))
+
 # =========================== Utilities ===========================
 
 def clamp(val: float, low: float, high: float) -> float:
@@ -200,6 +467,14 @@ def mmss(seconds: int) -> str:
     s = seconds % 60
     return f"{m:02d}:{s:02d}"
 
+# Draws behind rare events go through these, by name, so ImportanceSampler can tilt them.
+
+def chance(p: float, event: str) -> bool:
+    return random.random() < p
+
+def normal(mu: float, sigma: float, event: str) -> float:
+    return random.gauss(mu, sigma)
+
 def sample_yards(mean: float, std: float, allow_negative: bool = True, max_gain: int = 60) -> int:
     y = int(round(random.gauss(mean, std)))
     if not allow_negative:
@@ -262,6 +537,49 @@ def ai_choose_deep_target(offense: Team, defense_formation: str) -> str:
     return wr1
 
 # =========================== Penalties ===========================
+# The penalty catalogue. `rates` are per-snap probabilities keyed by play call, play
+# kind ("run"/"pass") or "*"; the most specific key wins. Each (call, phase) pair gets
+# a cumulative table, so a snap costs one random draw however many penalties exist.
+# Enforcement: "previous_spot" replaces the play's yardage with the penalty (the play
+# is wiped out and the down replayed); "end_of_play" adds the penalty to what the
+# play gained. After the play the non-offending side may decline (penalty_accepted).
+
+ENFORCEMENTS = ("previous_spot", "end_of_play")
+
+def _penalty(description: str, phase: str, against: str, yards: int, rates: Dict[str, float],
+             automatic_first: bool = False, enforcement: str = "previous_spot") -> dict:
+    return {"description": description, "phase": phase, "against": against, "yards": yards,
+            "automatic_first": automatic_first, "enforcement": enforcement, "rates": rates}
+
+PENALTIES: Dict[str, dict] = {
+    # Pre-snap (checked before the user's snaps), about 3.2% of snaps in all.
+    "false_start": _penalty("False start on offense", "pre", "offense", 5, {"*": 0.0125}),
+    "offside": _penalty("Offside on defense", "pre", "defense", 5, {"*": 0.0060}),
+    "encroachment": _penalty("Encroachment on defense", "pre", "defense", 5, {"*": 0.0030}),
+    "neutral_zone_infraction": _penalty("Neutral zone infraction on defense", "pre", "defense", 5, {"*": 0.0030}),
+    "delay_of_game": _penalty("Delay of game on offense", "pre", "offense", 5, {"*": 0.0030}),
+    "illegal_formation": _penalty("Illegal formation on offense", "pre", "offense", 5, {"*": 0.0020}),
+    "too_many_men": _penalty("Too many men on the field, defense", "pre", "defense", 5, {"*": 0.0015}),
+    "illegal_shift": _penalty("Illegal shift on offense", "pre", "offense", 5, {"*": 0.0010}),
+    # After the play (plays where the ball was carried), about 4.8% of snaps in all.
+    "holding": _penalty("Offensive holding", "post", "offense", 10, {"run": 0.030, "pass": 0.012}),
+    "defensive_holding": _penalty("Defensive holding", "post", "defense", 5, {"run": 0.002, "pass": 0.006},
+                                  automatic_first=True, enforcement="end_of_play"),
+    "pass_interference": _penalty("Defensive pass interference", "post", "defense", 15, {"pass": 0.012},
+                                  automatic_first=True, enforcement="end_of_play"),
+    "offensive_pass_interference": _penalty("Offensive pass interference", "post", "offense", 10, {"pass": 0.004}),
+    "illegal_contact": _penalty("Illegal contact on defense", "post", "defense", 5, {"pass": 0.003},
+                                automatic_first=True, enforcement="end_of_play"),
+    "roughing_the_passer": _penalty("Roughing the passer", "post", "defense", 15, {"pass": 0.003},
+                                    automatic_first=True, enforcement="end_of_play"),
+    "unnecessary_roughness": _penalty("Unnecessary roughness on defense", "post", "defense", 15,
+                                      {"run": 0.004, "pass": 0.003}, automatic_first=True, enforcement="end_of_play"),
+    "face_mask": _penalty("Face mask on defense", "post", "defense", 15, {"run": 0.004, "pass": 0.002},
+                          automatic_first=True, enforcement="end_of_play"),
+    "illegal_block": _penalty("Illegal block in the back", "post", "offense", 10, {"run": 0.006, "pass": 0.002},
+                              enforcement="end_of_play"),
+    "tripping": _penalty("Tripping on offense", "post", "offense", 10, {"run": 0.002, "pass": 0.001}),
+}
 
 @dataclass
 class PenaltyResult:
@@ -270,21 +588,128 @@ class PenaltyResult:
     yardage: int
     against_defense: bool
     automatic_first: bool = False
-
-def maybe_penalty(offense: Team, defense: Team, is_pass: bool) -> Optional[PenaltyResult]:
-    if random.random() > 0.08:
-        return None
-    pre = (random.random() < 0.40)
-    if pre:
-        if random.random() < 0.55:
-            return PenaltyResult(True, "False start on offense (-5)", -5, against_defense=False)
-        else:
-            return PenaltyResult(True, "Offside on defense (+5)", +5, against_defense=True)
-    else:
-        if is_pass and random.random() < 0.50:
-            return PenaltyResult(False, "Defensive pass interference (+15, automatic first down)", +15, True, True)
-        else:
-            return PenaltyResult(False, "Offensive holding (-10)", -10, False)
+    name: str = "penalty"
+    enforcement: str = "end_of_play"
+
+@dataclass(frozen=True)
+class PenaltyType:
+    """One compiled PENALTIES entry; `yardage` is signed for the offense."""
+    __slots__ = ("name", "pre_snap", "against_defense", "yardage", "automatic_first", "enforcement",
+                 "description", "rates")
+    name: str
+    pre_snap: bool
+    against_defense: bool
+    yardage: int
+    automatic_first: bool
+    enforcement: str
+    description: str
+    rates: Dict[str, float]
+
+    def rate(self, call: str, kind: str) -> float:
+        rates = self.rates
+        return rates.get(call, rates.get(kind, rates.get("*", 0.0)))
+
+    def result(self) -> PenaltyResult:
+        return PenaltyResult(self.pre_snap, self.description, self.yardage, self.against_defense,
+                             self.automatic_first, self.name.replace("_", " "), self.enforcement)
+
+_PENALTY_FIELDS = ("description", "phase", "against", "yards", "automatic_first", "enforcement", "rates")
+
+def compile_penalty(name: str, spec: Dict[str, object]) -> PenaltyType:
+    """Checks one catalogue entry; raises ValueError naming the bad field."""
+    missing = [k for k in _PENALTY_FIELDS if k not in spec]
+    unknown = [k for k in spec if k not in _PENALTY_FIELDS]
+    if missing or unknown:
+        raise ValueError(f"Penalty {name!r}: missing {missing or 'nothing'}, unknown {unknown or 'nothing'}")
+    checks = (
+        ("description", isinstance(spec["description"], str) and spec["description"], "a non-empty string"),
+        ("phase", spec["phase"] in ("pre", "post"), "'pre' or 'post'"),
+        ("against", spec["against"] in ("offense", "defense"), "'offense' or 'defense'"),
+        ("yards", isinstance(spec["yards"], int) and not isinstance(spec["yards"], bool)
+                  and 0 < spec["yards"] <= 99, "whole yards in 1..99"),
+        ("automatic_first", isinstance(spec["automatic_first"], bool), "true or false"),
+        ("enforcement", spec["enforcement"] in ENFORCEMENTS, " or ".join(ENFORCEMENTS)),
+        ("rates", isinstance(spec["rates"], dict) and all(isinstance(k, str) and _is_number(v) and 0 <= v <= 1
+                                                          for k, v in spec["rates"].items()),
+         "a dict of call/kind -> probability"),
+    )
+    for key, ok, expected in checks:
+        if not ok:
+            raise ValueError(f"penalty.{name}.{key} must be {expected}, got {spec[key]!r}")
+    if spec["phase"] == "pre" and spec["enforcement"] != "previous_spot":
+        raise ValueError(f"penalty.{name}: pre-snap penalties are enforced from the previous spot")
+    against_defense = spec["against"] == "defense"
+    yards = spec["yards"] if against_defense else -spec["yards"]
+    first = ", automatic first down" if spec["automatic_first"] else ""
+    return PenaltyType(name, spec["phase"] == "pre", against_defense, yards, spec["automatic_first"],
+                       spec["enforcement"], f"{spec['description']} ({yards:+d}{first})", dict(spec["rates"]))
+
+def check_penalty_rates(penalties: Dict[str, PenaltyType], play_types: Dict[str, "PlayType"]) -> None:
+    """
+    Every call's rates must add up to at most 1 in each phase penalty_table() builds
+    (pre, post and both together). Registered play types are rated as penalty_table()
+    rates them, falling back on their kind; any other rate key stands for itself.
+    """
+    kinds = {key: key for key in {"run", "pass"}.union(*(p.rates for p in penalties.values())) - {"*"}}
+    kinds.update((name, pt.kind) for name, pt in play_types.items())
+    for call, kind in kinds.items():
+        for phase in ("pre", "post", "any"):
+            total = sum(p.rate(call, kind) for p in penalties.values()
+                        if phase == "any" or p.pre_snap == (phase == "pre"))
+            if total > 1:
+                raise ValueError(f"Penalty rates for {call!r} ({phase}) add up to {total:.3f} (more than 1)")
+
+def compile_penalties(specs: Dict[str, dict], play_types: Optional[Dict[str, "PlayType"]] = None
+                      ) -> Dict[str, PenaltyType]:
+    """Compiles and checks a catalogue against `play_types` (the registered PLAY_TYPES by default)."""
+    compiled = {name: compile_penalty(name, spec) for name, spec in specs.items()}
+    check_penalty_rates(compiled, PLAY_TYPES if play_types is None else play_types)
+    return compiled
+
+# PLAY_TYPES is defined further down; the catalogue is checked against it there
+PENALTY_TYPES: Dict[str, PenaltyType] = compile_penalties(PENALTIES, play_types={})
+
+# (call, phase) -> (penalties, cumulative rates); phase is "pre", "post" or "any".
+# Built on first use and cleared whenever the catalogue or the play types change.
+_PENALTY_TABLES: Dict[Tuple[str, str], Tuple[List[PenaltyType], List[float]]] = {}
+_PENALTY_PHASE = {True: "pre", False: "post", None: "any"}
+
+def penalty_table(call: str, phase: str) -> Tuple[List[PenaltyType], List[float]]:
+    table = _PENALTY_TABLES.get((call, phase))
+    if table is None:
+        kind = PLAY_TYPES[call].kind if call in PLAY_TYPES else call
+        rated = [(p, p.rate(call, kind)) for p in PENALTY_TYPES.values()
+                 if phase == "any" or p.pre_snap == (phase == "pre")]
+        rated = [(p, r) for p, r in rated if r > 0]
+        table = ([p for p, _ in rated], list(accumulate(r for _, r in rated)))
+        _PENALTY_TABLES[(call, phase)] = table
+    return table
+
+def maybe_penalty(offense: Team, defense: Team, is_pass: bool, pre_snap: Optional[bool] = None,
+                  call: Optional[str] = None) -> Optional[PenaltyResult]:
+    """
+    One draw against the catalogue for `call` (or plain run/pass by `is_pass`).
+    `pre_snap` limits it to pre- or post-snap fouls; None draws from both.
+    """
+    penalties, cum = penalty_table(call or ("pass" if is_pass else "run"), _PENALTY_PHASE[pre_snap])
+    i = bisect_right(cum, random.random())
+    return penalties[i].result() if i < len(penalties) else None
+
+def penalty_batch(call: str, pre_snap: Optional[bool], n: int) -> List[Optional[PenaltyResult]]:
+    """`n` independent penalty draws for one call and phase (see maybe_penalty)."""
+    penalties, cum = penalty_table(call, _PENALTY_PHASE[pre_snap])
+    hits = [bisect_right(cum, random.random()) for _ in range(n)]
+    return [penalties[i].result() if i < len(penalties) else None for i in hits]
+
+def register_penalty(name: str, spec: Dict[str, object]) -> None:
+    """Adds (or replaces) a catalogue entry; it is validated before anything changes."""
+    specs = dict(PENALTIES)
+    specs[name] = dict(spec)
+    compiled = compile_penalties(specs)
+    PENALTIES[name] = specs[name]
+    PENALTY_TYPES.clear()
+    PENALTY_TYPES.update(compiled)
+    _PENALTY_TABLES.clear()
 
 # =========================== Team Penalty Totals ===========================
 
@@ -302,34 +727,253 @@ def apply_post_play_penalty_for_spot_and_note(play_yards: int, p: PenaltyResult,
                                               offense: Team, defense: Team, penalty_totals: PenaltyTotalsType
                                               ) -> Tuple[int, str]:
     accrue_penalty(penalty_totals, offense, defense, p)
-    if p.description.startswith("Offensive holding"):
-        return -10, " (holding: -10)"
-    sign = "+" if p.yardage >= 0 else ""
-    return play_yards + p.yardage, f" (penalty: {sign}{p.yardage})"
+    if p.enforcement == "previous_spot":
+        return enforced_yards(play_yards, p), f" ({p.name}: {p.yardage:+d})"
+    return enforced_yards(play_yards, p), f" (penalty: {p.yardage:+d})"
+
+def enforced_yards(play_yards: int, p: PenaltyResult) -> int:
+    """Net yards from the previous spot if the penalty is accepted."""
+    return p.yardage if p.enforcement == "previous_spot" else play_yards + p.yardage
+
+# =========================== Situation Values ===========================
+# Expected points for the team with the ball in every (down, distance, ball_on),
+# from a simple field-position model: a first down is worth -0.7 + 0.067 per yard
+# gained on the field, later downs and longer distances cost a fixed amount, and a
+# 4th down is worth at least punting or kicking. The table is built once; lookups
+# are O(1), so penalty decisions cost nothing measurable in batch runs. Scores are
+# worth their points plus the try (try_points()) less the kickoff that follows
+# (kickoff_start()), both read from CONVERSIONS and KICKOFF.
+
+MAX_DISTANCE = 30          # longer distances share the last row
+_DOWN_VALUE = (0.0, -0.35, -0.9, -1.6)
+_DISTANCE_VALUE = (0.05, 0.08, 0.12, 0.15)  # per yard beyond 10, by down
+
+def _first_down_value(ball_on: int) -> float:
+    return -0.7 + 0.067 * ball_on
+
+def _situation_value(down: int, distance: int, ball_on: int) -> float:
+    value = _first_down_value(ball_on) + _DOWN_VALUE[down - 1] - _DISTANCE_VALUE[down - 1] * (distance - 10)
+    if down == 4:
+        opp_after_punt = 25 if ball_on + 44 >= 100 else 100 - (ball_on + 44) + 5
+        fg = field_goal_success_prob(ball_on)
+        value = max(value, -_first_down_value(opp_after_punt),
+                    fg * (3 - _first_down_value(kickoff_start())) - (1 - fg) * _first_down_value(to_receiving_spot(ball_on)))
+    return value
+
+@lru_cache(maxsize=1)
+def situation_table() -> Tuple[float, ...]:
+    """Flat table indexed by ((down - 1) * MAX_DISTANCE + distance - 1) * 100 + ball_on."""
+    return tuple(_situation_value(down, distance, ball_on)
+                 for down in range(1, 5) for distance in range(1, MAX_DISTANCE + 1) for ball_on in range(100))
+
+def situation_value(down: int, distance: int, ball_on: int) -> float:
+    distance = clamp_int(distance, 1, MAX_DISTANCE)
+    return situation_table()[((down - 1) * MAX_DISTANCE + distance - 1) * 100 + clamp_int(ball_on, 1, 99)]
+
+def result_value(down: int, line_to_gain: int, ball_on: int, net_yards: int, first_down: bool = False,
+                 replay_down: bool = False) -> float:
+    """Value to the offense of gaining `net_yards` on this down (touchdowns, safeties and turnovers included)."""
+    spot = ball_on + net_yards
+    if spot >= 100:
+        return 6 + try_points() - situation_value(1, 10, kickoff_start())
+    if spot <= 0:
+        return -2 - situation_value(1, 10, 40)
+    if first_down or spot >= line_to_gain:
+        return situation_value(1, min(10, 100 - spot), spot)
+    if replay_down:
+        return situation_value(down, line_to_gain - spot, spot)
+    if down == 4:
+        return -situation_value(1, 10, 100 - spot)
+    return situation_value(down + 1, line_to_gain - spot, spot)
+
+def penalty_accepted(down: int, line_to_gain: int, ball_on: int, play_yards: int, p: PenaltyResult,
+                     is_pass: bool = False) -> bool:
+    """
+    The non-offending side's choice: accept when the enforced result is at least as
+    good for them as the play's own result. Pass plays never lose yards after the
+    catch, as in apply_play.
+    """
+    accept_yards = enforced_yards(play_yards, p)
+    if is_pass:
+        accept_yards, play_yards = max(0, accept_yards), max(0, play_yards)
+    accept = result_value(down, line_to_gain, ball_on, accept_yards, p.automatic_first,
+                          replay_down=p.enforcement == "previous_spot")
+    decline = result_value(down, line_to_gain, ball_on, play_yards)
+    return accept >= decline if p.against_defense else accept <= decline
+
+# =========================== Conversions ===========================
+# After a touchdown the scoring team kicks the PAT or goes for two. The choice comes
+# from a chart over (margin after the six points, minutes left), built once from a
+# possession-count win-probability model: each side gets about one drive per
+# POSSESSION_SECONDS and each drive ends in a touchdown, a field goal or nothing.
+# Ties count as half a win. Lookups are O(1).
+
+CONVERSIONS: Dict[str, float] = {"pat": 0.94, "two_point": 0.47}
+POSSESSION_SECONDS = 125
+DRIVE_SCORING = ((7, 0.22), (3, 0.14))   # (points, chance) per drive; otherwise no score
+CHART_MARGIN = 24                        # margins beyond this always kick
+TWO_POINT_EDGE = 0.008                   # win probability a try must add over the kick
+
+def sample_pat() -> bool:
+    return random.random() < CONVERSIONS["pat"]
+
+def sample_two_point() -> bool:
+    return random.random() < CONVERSIONS["two_point"]
+
+def try_points() -> float:
+    """Expected points of the better try after a touchdown, from CONVERSIONS."""
+    return max(CONVERSIONS["pat"], 2 * CONVERSIONS["two_point"])
+
+def _drive_points(drives: int) -> Dict[int, float]:
+    """Distribution of points scored over `drives` possessions."""
+    dist = {0: 1.0}
+    none = 1.0 - sum(p for _, p in DRIVE_SCORING)
+    for _ in range(drives):
+        nxt: Dict[int, float] = {}
+        for pts, p in dist.items():
+            nxt[pts] = nxt.get(pts, 0.0) + p * none
+            for score, q in DRIVE_SCORING:
+                nxt[pts + score] = nxt.get(pts + score, 0.0) + p * q
+        dist = nxt
+    return dist
+
+def _margin_change(seconds_remaining: int) -> Dict[int, float]:
+    """
+    Change in the scoring team's margin from here to the end; the other side receives
+    next. The drive count is uncertain by one either way once a few are left.
+    """
+    mean = int(round(seconds_remaining / POSSESSION_SECONDS))
+    spread = ((mean, 1.0),) if mean < 2 else ((mean - 1, 0.25), (mean, 0.5), (mean + 1, 0.25))
+    change: Dict[int, float] = {}
+    for drives, w in spread:
+        ours, theirs = _drive_points(drives // 2), _drive_points(drives - drives // 2)
+        for a, p in ours.items():
+            for b, q in theirs.items():
+                change[a - b] = change.get(a - b, 0.0) + w * p * q
+    return change
+
+def _win_prob(margin: int, change: Dict[int, float]) -> float:
+    return sum(p if margin + c > 0 else 0.5 * p if margin + c == 0 else 0.0 for c, p in change.items())
+
+@lru_cache(maxsize=1)
+def conversion_chart() -> bytes:
+    """Flat chart indexed by minute * (2 * CHART_MARGIN + 1) + margin + CHART_MARGIN; 1 means go for two."""
+    pat, two = CONVERSIONS["pat"], CONVERSIONS["two_point"]
+    chart = bytearray()
+    for minute in range(QUARTERS * SECS_PER_Q // 60 + 1):
+        change = _margin_change(minute * 60)
+        for margin in range(-CHART_MARGIN, CHART_MARGIN + 1):
+            base = _win_prob(margin, change)
+            kick = pat * (_win_prob(margin + 1, change) - base)
+            go = two * (_win_prob(margin + 2, change) - base)
+            chart.append(go > kick + TWO_POINT_EDGE)
+    return bytes(chart)
+
+def ai_go_for_two(margin: int, seconds_remaining: int) -> bool:
+    """`margin` is the scoring team's lead after the touchdown, before the try."""
+    if abs(margin) > CHART_MARGIN:
+        return False
+    minute = clamp_int((seconds_remaining + 59) // 60, 0, QUARTERS * SECS_PER_Q // 60)
+    return bool(conversion_chart()[minute * (2 * CHART_MARGIN + 1) + margin + CHART_MARGIN])
+
+# =========================== Narration ===========================
+
+# Verbosity levels. Each level includes everything below it.
+SILENT = 0
+SUMMARY = 1        # scoring plays, quarter breaks, final score & stats
+PLAY_BY_PLAY = 2   # every snap (the interactive default)
+DEBUG = 3          # probabilities and clock runoff behind each snap
+
+VERBOSITY_LEVELS: Dict[str, int] = {
+    "silent": SILENT,
+    "summary": SUMMARY,
+    "play-by-play": PLAY_BY_PLAY,
+    "debug": DEBUG,
+}
+
+class StdoutSink:
+    """Prints each message. Goes through print() so redirected stdout (tests, GUI) still sees it."""
+    def write(self, msg: str) -> None:
+        print(msg)
+    def close(self) -> None:
+        pass
+
+class FileSink:
+    def __init__(self, path: str, mode: str = "w"):
+        self._fh = open(path, mode, encoding="utf-8")
+    def write(self, msg: str) -> None:
+        self._fh.write(msg + "\n")
+    def close(self) -> None:
+        self._fh.close()
+
+class QueueSink:
+    def __init__(self, q: Optional[queue.Queue] = None):
+        self.queue = q if q is not None else queue.Queue()
+    def write(self, msg: str) -> None:
+        self.queue.put(msg)
+    def close(self) -> None:
+        pass
+
+class NullSink:
+    def write(self, msg: str) -> None:
+        pass
+    def close(self) -> None:
+        pass
+
+class Narrator:
+    """
+    Routes game narration to a sink at a given verbosity.
+    Call sites test the level flag BEFORE building the message, so a disabled
+    level costs one attribute check and no string formatting:
+
+        if out.pbp: out.emit(f"RUN: {runner} gains {yards} yards.")
+    """
+    __slots__ = ("level", "sink", "summary", "pbp", "debug")
+
+    def __init__(self, level=PLAY_BY_PLAY, sink=None):
+        self.sink = sink if sink is not None else StdoutSink()
+        self.set_level(level)
+
+    def set_level(self, level) -> None:
+        if isinstance(level, str):
+            level = VERBOSITY_LEVELS[level.strip().lower()]
+        self.level = level
+        self.summary = level >= SUMMARY
+        self.pbp = level >= PLAY_BY_PLAY
+        self.debug = level >= DEBUG
+
+    def emit(self, msg: str) -> None:
+        self.sink.write(msg)
+
+    def close(self) -> None:
+        self.sink.close()
+
+def silent_narrator() -> Narrator:
+    return Narrator(SILENT, NullSink())
 
 # =========================== Stats & Print ===========================
 
 def update_run_stats(stats: StatsType, team: str, runner: str, play_yards: int, td: bool) -> None:
-    runner = canonical_name(runner)
-    ensure_player(stats, team, runner)
-    stats[team][runner].rush_yards += play_yards
+    row = player_stats(stats, team, canonical_name(runner))
+    row.rush_yards += play_yards
     if td:
-        stats[team][runner].touchdowns += 1
+        row.touchdowns += 1
 
 def update_pass_stats(stats: StatsType, team: str, qb: str, receiver: Optional[str],
                       play_yards: int, completed: bool, intercepted: bool, td: bool) -> None:
-    qb = canonical_name(qb)
-    ensure_player(stats, team, qb)
+    row = player_stats(stats, team, canonical_name(qb))
     if intercepted:
-        stats[team][qb].interceptions_thrown += 1
+        row.interceptions_thrown += 1
     if completed:
-        stats[team][qb].pass_yards += play_yards
+        row.pass_yards += play_yards
+        if td:
+            row.pass_touchdowns += 1
         if receiver:
-            receiver = canonical_name(receiver)
-            ensure_player(stats, team, receiver)
-            stats[team][receiver].rec_yards += play_yards
+            rec = player_stats(stats, team, canonical_name(receiver))
+            rec.rec_yards += play_yards
+            rec.receptions += 1
             if td:
-                stats[team][receiver].touchdowns += 1
+                rec.touchdowns += 1
 
 def coalesce(players: Dict[str, PlayerStats]) -> Dict[str, PlayerStats]:
     merged: Dict[str, PlayerStats] = {}
@@ -343,31 +987,36 @@ def coalesce(players: Dict[str, PlayerStats]) -> Dict[str, PlayerStats]:
         m.pass_yards += ps.pass_yards
         m.touchdowns += ps.touchdowns
         m.interceptions_thrown += ps.interceptions_thrown
+        m.receptions += ps.receptions
+        m.pass_touchdowns += ps.pass_touchdowns
     return merged
 
-def print_stats(stats: StatsType, penalty_totals: PenaltyTotalsType) -> None:
-    print("\n=== Player Stats ===")
+def print_stats(stats: StatsType, penalty_totals: PenaltyTotalsType, out: Optional[Narrator] = None) -> None:
+    emit = out.emit if out is not None else print
+    emit("\n=== Player Stats ===")
     for team, players in stats.items():
-        print(f"\nTeam: {team}")
-        print("-" * (6 + len(team)))
+        emit(f"\nTeam: {team}")
+        emit("-" * (6 + len(team)))
         merged = coalesce(players)
         for name in sorted(merged.keys()):
             ps = merged[name]
-            print(f"{name:20s} | Rush: {ps.rush_yards:3d} | Rec: {ps.rec_yards:3d} | Pass: {ps.pass_yards:3d} | TD: {ps.touchdowns:2d} | INT Thrown: {ps.interceptions_thrown:2d}")
+            emit(f"{name:20s} | Rush: {ps.rush_yards:3d} | Rec: {ps.receptions:2d}-{ps.rec_yards:3d} "
+                 f"| Pass: {ps.pass_yards:3d} ({ps.pass_touchdowns} TD) | TD: {ps.touchdowns:2d} | INT Thrown: {ps.interceptions_thrown:2d}")
         pt = penalty_totals.get(team, {"count": 0, "yards": 0})
-        print(f"Penalties: {pt['count']} for {pt['yards']} yards")
-    print("=" * 22 + "\n")
+        emit(f"Penalties: {pt['count']} for {pt['yards']} yards")
+    emit("=" * 22 + "\n")
 
-def print_score(scoreboard: Dict[str, int]) -> None:
-    print("\n=== Scoreboard ===")
+def print_score(scoreboard: Dict[str, int], out: Optional[Narrator] = None) -> None:
+    emit = out.emit if out is not None else print
+    emit("\n=== Scoreboard ===")
     for team, pts in scoreboard.items():
-        print(f"{team}: {pts}")
-    print("=" * 22 + "\n")
+        emit(f"{team}: {pts}")
+    emit("=" * 22 + "\n")
 
 # =========================== Special Teams ===========================
 
 def punt_result(ball_on: int) -> Tuple[int, str]:
-    base = int(round(random.gauss(44, 6)))
+    base = int(round(normal(44, 6, "punt")))
     base = clamp_int(base, 28, 65)
     kick_to = ball_on + base
     desc = f"Punt travels {base} yards"
@@ -407,6 +1056,92 @@ def safety_free_kick_result() -> Tuple[int, str]:
         recv_ball_on = clamp_start_spot(100 - kick_to + ret)
         return recv_ball_on, desc + f" Receiving team starts at O-{recv_ball_on}."
 
+# Kickoffs from the 35. One definition feeds both sample_kickoff() and kickoff_batch():
+# kickoff_params() reads the table once and roll_kickoff() only draws. Spots are the
+# receiving team's yard line, like every other spot in the engine.
+KICKOFF: Dict[str, object] = {
+    "touchback_chance": 0.58, "touchback_spot": 25,
+    "field_mean": 3, "field_std": 3,            # where the returner fields it
+    "return_mean": 22, "return_std": 7,
+    "big_return_chance": 0.04, "big_return_bonus": (15, 70),
+    "muff_chance": 0.012,                        # kicking team recovers at the catch
+    "onside_recovery": 0.12, "onside_spot": 54,  # ~11 yards downfield from the 35
+}
+
+@dataclass(frozen=True)
+class KickoffOutcome:
+    # "touchback", "return", "return_td", "muff", "onside_recovered" or "onside_failed"
+    result: str
+    spot: int                   # receiving team's yard line where the ball ends up
+    return_yards: int = 0
+
+    @property
+    def kicking_team_ball(self) -> bool:
+        return self.result in ("muff", "onside_recovered")
+
+def kickoff_params(onside: bool = False) -> tuple:
+    k = KICKOFF
+    if onside:
+        return (True, k["onside_recovery"], k["onside_spot"])
+    return (False, k["touchback_chance"], k["touchback_spot"], k["field_mean"], k["field_std"], k["muff_chance"],
+            k["return_mean"], k["return_std"], k["big_return_chance"], k["big_return_bonus"])
+
+def roll_kickoff(params: tuple) -> KickoffOutcome:
+    if params[0]:
+        _, recovery, spot = params
+        spot += random.randint(-2, 2)
+        return KickoffOutcome("onside_recovered" if random.random() < recovery else "onside_failed", spot)
+    _, touchback, tb_spot, field_mean, field_std, muff, ret_mean, ret_std, big, bonus = params
+    if chance(touchback, "touchback"):
+        return KickoffOutcome("touchback", tb_spot)
+    fielded = clamp_int(int(round(random.gauss(field_mean, field_std))), 1, 10)
+    if random.random() < muff:
+        return KickoffOutcome("muff", fielded)
+    ret = max(0, int(round(normal(ret_mean, ret_std, "kick_return"))))
+    if random.random() < big:
+        ret += sample_big_play(bonus)
+    if fielded + ret >= 100:
+        return KickoffOutcome("return_td", 100, 100 - fielded)
+    return KickoffOutcome("return", fielded + ret, ret)
+
+def sample_kickoff(onside: bool = False) -> KickoffOutcome:
+    return roll_kickoff(kickoff_params(onside))
+
+def kickoff_batch(n: int, onside: bool = False) -> List[KickoffOutcome]:
+    params = kickoff_params(onside)
+    return [roll_kickoff(params) for _ in range(n)]
+
+def kickoff_start() -> int:
+    """The receiving team's mean start after a deep kickoff, from KICKOFF (muffs left out)."""
+    k = KICKOFF
+    low, high = k["big_return_bonus"]
+    returned = min(100, k["field_mean"] + k["return_mean"] + k["big_return_chance"] * (low + high) / 2)
+    return round(k["touchback_chance"] * k["touchback_spot"] + (1 - k["touchback_chance"]) * returned)
+
+ONSIDE_ONE_SCORE_SECONDS = 120   # trailing by one score: onside only when the defense can't get the ball back
+ONSIDE_TWO_SCORE_SECONDS = 300   # trailing by more: onside inside the last five minutes
+
+@lru_cache(maxsize=4096)
+def ai_onside_kick(quarter: int, seconds_left: int, deficit: int) -> bool:
+    """Whether the kicking team, trailing by `deficit`, tries an onside kick."""
+    if quarter != QUARTERS or deficit <= 0:
+        return False
+    limit = ONSIDE_ONE_SCORE_SECONDS if deficit <= 8 else ONSIDE_TWO_SCORE_SECONDS
+    return seconds_left <= limit
+
+def describe_kickoff(k: KickoffOutcome, kicking: Team, receiving: Team) -> str:
+    if k.result == "touchback":
+        return f"touchback. {receiving.name} start at O-{k.spot}."
+    if k.result == "return":
+        return f"returned {k.return_yards} yards to O-{k.spot}."
+    if k.result == "return_td":
+        return f"{receiving.name} RETURN IT {k.return_yards} YARDS FOR A TOUCHDOWN!"
+    if k.result == "muff":
+        return f"MUFFED by the returner! {kicking.name} recover at O-{100 - k.spot}."
+    if k.result == "onside_recovered":
+        return f"ONSIDE KICK recovered by {kicking.name} at O-{100 - k.spot}!"
+    return f"onside kick, {receiving.name} recover at O-{k.spot}."
+
 def field_goal_success_prob(ball_on: int) -> float:
     dist = 100 - ball_on + 17
     if dist <= 35: return 0.95
@@ -423,95 +1158,298 @@ def field_goal_success_prob(ball_on: int) -> float:
 
 def get_team_pass_baselines(team_name: str) -> Tuple[float, float]:
     """
-    Returns normalized (completion, interception) baselines for a team.
-    We clamp to reasonable ranges to keep gameplay stable.
+    Returns normalized (completion, interception) baselines for a team, with its
+    TEAM_ADJUSTMENTS added. We clamp to reasonable ranges to keep gameplay stable.
     """
     rates = QB_INPUT_RATES.get(team_name)
     if not rates:
         # Conservative league-average fallback
         return 0.62, 0.023
-    comp = clamp(rates["comp_pct"] / 100.0, 0.55, 0.75)
-    intr = clamp(rates["int_pct"] / 100.0, 0.008, 0.035)
-    return comp, intr
+    adj = TEAM_ADJUSTMENTS.get(team_name)
+    comp, intr = rates["comp_pct"] / 100.0, rates["int_pct"] / 100.0
+    if adj:
+        comp += adj["comp_adj"]
+        intr += adj["int_adj"]
+    lim = PASS_BASELINE_CLAMPS
+    return clamp(comp, lim["comp_min"], lim["comp_max"]), clamp(intr, lim["int_min"], lim["int_max"])
 
 def compute_pass_probs(team_name: str, defense_formation: str) -> Tuple[float, float, float]:
-    eff = DEF_EFFECTS[defense_formation]
+    eff = FORMATIONS[defense_formation]
     base_comp, base_int = get_team_pass_baselines(team_name)
-    comp = clamp(base_comp + eff["pass_completion_adj"], 0.30, 0.90)
-    inter = clamp(base_int + eff["pass_int_adj"], 0.005, 0.08)
-    sack = clamp(BASE_SACK_CHANCE + eff.get("sack_adj", 0.0), 0.01, 0.20)
+    comp = clamp(base_comp + eff.pass_completion_adj, 0.30, 0.90)
+    inter = clamp(base_int + eff.pass_int_adj, 0.005, 0.08)
+    sack = clamp(BASE_SACK_CHANCE + eff.sack_adj, 0.01, 0.20)
     return comp, inter, sack
 
 def compute_deep_pass_probs(team_name: str, defense_formation: str) -> Tuple[float, float, float]:
-    eff = DEF_EFFECTS[defense_formation]
+    eff = FORMATIONS[defense_formation]
     base_comp, base_int = get_team_pass_baselines(team_name)
     # Deep baseline tweaks
-    comp = clamp(base_comp - 0.12 + eff["pass_completion_adj"], 0.20, 0.85)
-    inter = clamp(base_int + 0.01 + eff["pass_int_adj"], 0.006, 0.10)
-    sack = clamp(BASE_SACK_CHANCE + 0.03 + eff.get("sack_adj", 0.0), 0.02, 0.25)
+    comp = clamp(base_comp - 0.12 + eff.pass_completion_adj, 0.20, 0.85)
+    inter = clamp(base_int + 0.01 + eff.pass_int_adj, 0.006, 0.10)
+    sack = clamp(BASE_SACK_CHANCE + 0.03 + eff.sack_adj, 0.02, 0.25)
     return comp, inter, sack
 
 # =========================== Play Simulation ===========================
 
-def simulate_run(offense: Team, defense_formation: str) -> Tuple[str, int, bool, bool]:
-    eff = DEF_EFFECTS[defense_formation]
-    runner = choose_run_ballcarrier(offense.roster)
-    if random.random() < eff["tfl_chance"]:
+@dataclass
+class PlayOutcome:
+    """A sampled scrimmage play before it is applied to the game."""
+    call: str
+    player: str                 # ball carrier (run plays) or passer
+    receiver: Optional[str]
+    yards: int
+    completed: bool = False
+    intercepted: bool = False
+    sacked: bool = False
+    fumble_lost: bool = False
+
+# Each play type is split into `<play>_params(offense, formation)`, which does the
+# per-matchup lookups (FORMATIONS, QB baselines) and `roll_<play>(params, target)`,
+# which only draws random numbers. A single snap is roll(params(...)); a batch
+# reuses one params tuple for every draw (see sample_batch).
+
+def _roll_carry(call: str, carrier: str, tfl: float, mean: float, std: float,
+                big: float, bonus: Tuple[int, int]) -> PlayOutcome:
+    if chance(tfl, "tfl"):
         yards = -random.randint(1, 5)
     else:
-        yards = sample_yards(eff["run_mean"], eff["run_std"], allow_negative=True)
-        if random.random() < eff["run_big_play_chance"]:
-            yards += sample_big_play(eff["run_big_play_bonus"])
+        yards = sample_yards(mean, std, allow_negative=True)
+        if random.random() < big:
+            yards += sample_big_play(bonus)
     fumble_lost = (random.random() < BASE_RUN_FUMBLE) and (random.random() < 0.5)
-    return runner, yards, False, fumble_lost
-
-def simulate_pass(offense: Team, defense_formation: str, target: Optional[str] = None
-                  ) -> Tuple[str, Optional[str], int, bool, bool, bool, bool]:
-    eff = DEF_EFFECTS[defense_formation]
-    qb = canonical_name(offense.roster["QB"])
-    receiver = canonical_name(target or choose_receiver(offense.roster))
-
-    comp, inter, sack = compute_pass_probs(offense.name, defense_formation)
+    return PlayOutcome(call, carrier, None, yards, fumble_lost=fumble_lost)
 
-    if random.random() < sack:
-        yards = -clamp_int(int(round(random.gauss(6, 3))), 1, 15)
+def _roll_throw(call: str, qb: str, receiver: str, comp: float, inter: float, sack: float,
+                sack_mean: float, mean: float, std: float, floor: int,
+                big: float, bonus: Tuple[int, int]) -> PlayOutcome:
+    if chance(sack, "sack"):
+        yards = -clamp_int(int(round(random.gauss(sack_mean, 3))), 1, 15)
         fumble_lost = (random.random() < BASE_SACK_FUMBLE) and (random.random() < 0.5)
-        return qb, receiver, yards, False, False, True, fumble_lost
-
+        return PlayOutcome(call, qb, receiver, yards, sacked=True, fumble_lost=fumble_lost)
     if random.random() < inter:
-        return qb, receiver, 0, False, True, False, False
-
+        return PlayOutcome(call, qb, receiver, 0, intercepted=True)
     if random.random() < comp:
-        yards = sample_yards(DEF_EFFECTS[defense_formation]["pass_mean"], DEF_EFFECTS[defense_formation]["pass_std"], allow_negative=False)
-        if random.random() < DEF_EFFECTS[defense_formation]["pass_big_play_chance"]:
-            yards += sample_big_play(DEF_EFFECTS[defense_formation]["pass_big_play_bonus"])
+        yards = max(floor, sample_yards(mean, std, allow_negative=False))
+        if random.random() < big:
+            yards += sample_big_play(bonus)
         fumble_lost = (random.random() < BASE_REC_FUMBLE) and (random.random() < 0.5)
-        return qb, receiver, yards, True, False, False, fumble_lost
+        return PlayOutcome(call, qb, receiver, yards, completed=True, fumble_lost=fumble_lost)
+    return PlayOutcome(call, qb, receiver, 0)
 
-    return qb, receiver, 0, False, False, False, False
+def run_params(offense: Team, defense_formation: str) -> tuple:
+    eff = FORMATIONS[defense_formation]
+    return (offense.roster, eff.tfl_chance, eff.run_mean, eff.run_std,
+            eff.run_big_play_chance, eff.run_big_play_bonus)
 
-def simulate_deep_pass(offense: Team, defense_formation: str, target: Optional[str] = None
-                       ) -> Tuple[str, Optional[str], int, bool, bool, bool, bool]:
+def roll_run(params: tuple, target: Optional[str] = None) -> PlayOutcome:
+    roster, *rest = params
+    return _roll_carry("run", choose_run_ballcarrier(roster), *rest)
+
+def pass_params(offense: Team, defense_formation: str) -> tuple:
+    eff = FORMATIONS[defense_formation]
+    comp, inter, sack = compute_pass_probs(offense.name, defense_formation)
+    return (offense.roster, comp, inter, sack, 6, eff.pass_mean, eff.pass_std, 0,
+            eff.pass_big_play_chance, eff.pass_big_play_bonus)
+
+def roll_pass(params: tuple, target: Optional[str] = None) -> PlayOutcome:
+    roster, *rest = params
+    qb = canonical_name(roster["QB"])
+    return _roll_throw("pass", qb, canonical_name(target or choose_receiver(roster)), *rest)
+
+def deep_params(offense: Team, defense_formation: str) -> tuple:
+    comp, inter, sack = compute_deep_pass_probs(offense.name, defense_formation)
+    return (offense, defense_formation, comp, inter, sack, 7, 27, 10, 20, 0.08, (18, 35))
+
+def roll_deep(params: tuple, target: Optional[str] = None) -> PlayOutcome:
+    offense, defense_formation, *rest = params
     qb = canonical_name(offense.roster["QB"])
     receiver = canonical_name(target or ai_choose_deep_target(offense, defense_formation))
-    comp, inter, sack = compute_deep_pass_probs(offense.name, defense_formation)
+    return _roll_throw("deep", qb, receiver, *rest)
+
+def screen_params(offense: Team, defense_formation: str) -> tuple:
+    eff = FORMATIONS[defense_formation]
+    base_comp, base_int = get_team_pass_baselines(offense.name)
+    comp = clamp(base_comp + 0.15 + 0.5 * eff.pass_completion_adj, 0.45, 0.95)
+    inter = clamp(0.5 * base_int, 0.002, 0.03)
+    sack = clamp(0.4 * (BASE_SACK_CHANCE + eff.sack_adj), 0.005, 0.10)
+    # Screens punish pressure: extra sack chance turns into yards after the catch.
+    mean = eff.run_mean + 1.5 + 40 * max(0.0, eff.sack_adj)
+    return (offense.roster, comp, inter, sack, 4, mean, eff.run_std + 1.0, 0,
+            eff.run_big_play_chance, eff.run_big_play_bonus)
+
+def roll_screen(params: tuple, target: Optional[str] = None) -> PlayOutcome:
+    roster, *rest = params
+    qb = canonical_name(roster["QB"])
+    receiver = canonical_name(target or (roster["RB"] if random.random() < 0.7 else roster["TE"]))
+    return _roll_throw("screen", qb, receiver, *rest)
+
+def playaction_params(offense: Team, defense_formation: str) -> tuple:
+    eff = FORMATIONS[defense_formation]
+    comp, inter, sack = compute_pass_probs(offense.name, defense_formation)
+    # The run fake holds run-first fronts (high tfl_chance) but the longer drop invites sacks.
+    mean = eff.pass_mean + 1 + 20 * eff.tfl_chance
+    return (offense.roster, clamp(comp - 0.02, 0.30, 0.90), inter, clamp(sack + 0.02, 0.01, 0.22), 7,
+            mean, eff.pass_std + 2, 0, min(1.0, 1.5 * eff.pass_big_play_chance), eff.pass_big_play_bonus)
+
+def roll_playaction(params: tuple, target: Optional[str] = None) -> PlayOutcome:
+    roster, *rest = params
+    qb = canonical_name(roster["QB"])
+    return _roll_throw("playaction", qb, canonical_name(target or choose_receiver(roster)), *rest)
+
+def sneak_params(offense: Team, defense_formation: str) -> tuple:
+    eff = FORMATIONS[defense_formation]
+    return (offense.roster, 0.5 * eff.tfl_chance, clamp(0.20 + 0.03 * eff.run_mean, 0.0, 0.5))
+
+def roll_sneak(params: tuple, target: Optional[str] = None) -> PlayOutcome:
+    roster, stuffed, push = params
+    qb = canonical_name(roster["QB"])
+    if random.random() < stuffed:
+        yards = -random.randint(0, 1)
+    else:
+        yards = 1 + (random.randint(1, 3) if random.random() < push else 0)
+    fumble_lost = (random.random() < 0.5 * BASE_RUN_FUMBLE) and (random.random() < 0.5)
+    return PlayOutcome("sneak", qb, None, yards, fumble_lost=fumble_lost)
+
+def draw_params(offense: Team, defense_formation: str) -> tuple:
+    eff = FORMATIONS[defense_formation]
+    # Draws exploit pass-rush fronts: extra sack pressure turns into running room.
+    mean = eff.run_mean + 0.5 + 25 * max(0.0, eff.sack_adj)
+    return (offense.roster, 0.8 * eff.tfl_chance, mean, eff.run_std + 0.5,
+            eff.run_big_play_chance, eff.run_big_play_bonus)
+
+def roll_draw(params: tuple, target: Optional[str] = None) -> PlayOutcome:
+    roster, *rest = params
+    return _roll_carry("draw", canonical_name(roster["RB"]), *rest)
+
+# Analytic means of (PlayOutcome.yards, turnover) for each roll (the `expected` of
+# PLAY_TYPES), e.g. for SnapControl. They mirror the draws above, clamps and
+# rounding included; a turnover is an interception or a lost fumble.
+
+@lru_cache(maxsize=4096)
+def expected_rounded_yards(mean: float, std: float, low: int, high: int) -> float:
+    """E[clamp(round(gauss(mean, std)), low, high)], summed over the integers in between."""
+    cdf = NormalDist(mean, std).cdf
+    edges = [cdf(k + 0.5) for k in range(low, high)]
+    total = low * edges[0] + high * (1.0 - edges[-1])
+    for k, lo, hi in zip(range(low + 1, high), edges, edges[1:]):
+        total += k * (hi - lo)
+    return total
+
+def _carry_expected(tfl: float, mean: float, std: float, big: float,
+                    bonus: Tuple[int, int]) -> Tuple[float, float]:
+    gain = expected_rounded_yards(mean, std, -12, 60) + big * (bonus[0] + bonus[1]) / 2
+    return tfl * -3.0 + (1 - tfl) * gain, 0.5 * BASE_RUN_FUMBLE
+
+def _throw_expected(comp: float, inter: float, sack: float, sack_mean: float, mean: float, std: float,
+                    floor: int, big: float, bonus: Tuple[int, int]) -> Tuple[float, float]:
+    sacked = -expected_rounded_yards(sack_mean, 3, 1, 15)
+    caught = expected_rounded_yards(mean, std, max(0, floor), 60) + big * (bonus[0] + bonus[1]) / 2
+    completed = (1 - sack) * (1 - inter) * comp
+    turnover = sack * 0.5 * BASE_SACK_FUMBLE + (1 - sack) * inter + completed * 0.5 * BASE_REC_FUMBLE
+    return sack * sacked + completed * caught, turnover
+
+def _sneak_expected(stuffed: float, push: float) -> Tuple[float, float]:
+    return stuffed * -0.5 + (1 - stuffed) * (1 + 2 * push), 0.25 * BASE_RUN_FUMBLE
+
+# The original tuple-returning entry points (also what tests patch).
 
-    if random.random() < sack:
-        yards = -clamp_int(int(round(random.gauss(7, 3))), 1, 15)
-        fumble_lost = (random.random() < BASE_SACK_FUMBLE) and (random.random() < 0.5)
-        return qb, receiver, yards, False, False, True, fumble_lost
+def simulate_run(offense: Team, defense_formation: str) -> Tuple[str, int, bool, bool]:
+    o = roll_run(run_params(offense, defense_formation))
+    return o.player, o.yards, False, o.fumble_lost
 
-    if random.random() < inter:
-        return qb, receiver, 0, False, True, False, False
+def simulate_pass(offense: Team, defense_formation: str, target: Optional[str] = None
+                  ) -> Tuple[str, Optional[str], int, bool, bool, bool, bool]:
+    o = roll_pass(pass_params(offense, defense_formation), target)
+    return o.player, o.receiver, o.yards, o.completed, o.intercepted, o.sacked, o.fumble_lost
 
-    if random.random() < comp:
-        yards = max(20, sample_yards(27, 10, allow_negative=False))
-        if random.random() < 0.08:
-            yards += sample_big_play((18, 35))
-        fumble_lost = (random.random() < BASE_REC_FUMBLE) and (random.random() < 0.5)
-        return qb, receiver, yards, True, False, False, fumble_lost
+def simulate_deep_pass(offense: Team, defense_formation: str, target: Optional[str] = None
+                       ) -> Tuple[str, Optional[str], int, bool, bool, bool, bool]:
+    o = roll_deep(deep_params(offense, defense_formation), target)
+    return o.player, o.receiver, o.yards, o.completed, o.intercepted, o.sacked, o.fumble_lost
+
+# --- Play-type registry -----------------------------------------------------------
 
-    return qb, receiver, 0, False, False, False, False
+@dataclass(frozen=True)
+class PlayText:
+    label: str          # "RUN: ...", "DEEP PASS: ..."
+    sack: str
+    suffix: str         # appended to safety reasons
+    catch: str          # "FUMBLE after the catch!"
+
+@dataclass(frozen=True)
+class PlayType:
+    """
+    A scrimmage call. `kind` picks the half of apply_play that handles it ("run":
+    carried from the snap, "pass": thrown) and what defensive tendencies count it as.
+    """
+    name: str
+    kind: str
+    params: Callable[[Team, str], tuple]
+    roll: Callable[[tuple, Optional[str]], PlayOutcome]
+    effect_fields: Tuple[str, ...]      # DEF_EFFECTS fields `params` reads
+    text: PlayText
+    clock: str = "run"                  # play type passed to advance_clock()
+    target: Optional[Callable[[Team, str], str]] = None     # AI receiver choice
+    sample: Optional[Callable[..., PlayOutcome]] = None     # scalar override (st, formation, pick_target)
+    expected: Optional[Callable[[tuple], Tuple[float, float]]] = None  # mean (yards, turnover) from `params`
+
+# Lambdas look the functions up at call time, so patching the module still works.
+PLAY_TYPES: Dict[str, PlayType] = {pt.name: pt for pt in (
+    PlayType("run", "run", lambda o, f: run_params(o, f), lambda p, t=None: roll_run(p, t),
+             ("tfl_chance", "run_mean", "run_std", "run_big_play_chance", "run_big_play_bonus"),
+             PlayText("RUN", "SACK", "", "the run"),
+             sample=lambda st, f, pick=True: sample_run(st, f, pick),
+             expected=lambda p: _carry_expected(*p[1:])),
+    PlayType("pass", "pass", lambda o, f: pass_params(o, f), lambda p, t=None: roll_pass(p, t),
+             ("pass_completion_adj", "pass_int_adj", "sack_adj", "pass_mean", "pass_std",
+              "pass_big_play_chance", "pass_big_play_bonus"),
+             PlayText("PASS", "SACK", "", "the catch"), clock="pass",
+             target=lambda o, f: ai_choose_target(o, f),
+             sample=lambda st, f, pick=True: sample_pass(st, f, pick),
+             expected=lambda p: _throw_expected(*p[1:])),
+    PlayType("deep", "pass", lambda o, f: deep_params(o, f), lambda p, t=None: roll_deep(p, t),
+             ("pass_completion_adj", "pass_int_adj", "sack_adj"),
+             PlayText("DEEP PASS", "SACK (deep)", " (deep)", "the deep catch"), clock="pass",
+             target=lambda o, f: ai_choose_deep_target(o, f),
+             sample=lambda st, f, pick=True: sample_deep(st, f, pick),
+             expected=lambda p: _throw_expected(*p[2:])),
+    PlayType("screen", "pass", lambda o, f: screen_params(o, f), lambda p, t=None: roll_screen(p, t),
+             ("pass_completion_adj", "sack_adj", "run_mean", "run_std", "run_big_play_chance", "run_big_play_bonus"),
+             PlayText("SCREEN", "SACK (screen)", " (screen)", "the screen"), clock="pass",
+             expected=lambda p: _throw_expected(*p[1:])),
+    PlayType("playaction", "pass", lambda o, f: playaction_params(o, f), lambda p, t=None: roll_playaction(p, t),
+             ("pass_completion_adj", "pass_int_adj", "sack_adj", "tfl_chance", "pass_mean", "pass_std",
+              "pass_big_play_chance", "pass_big_play_bonus"),
+             PlayText("PLAY-ACTION", "SACK (play-action)", " (play-action)", "the catch"), clock="pass",
+             target=lambda o, f: ai_choose_target(o, f),
+             expected=lambda p: _throw_expected(*p[1:])),
+    PlayType("sneak", "run", lambda o, f: sneak_params(o, f), lambda p, t=None: roll_sneak(p, t),
+             ("tfl_chance", "run_mean"),
+             PlayText("QB SNEAK", "SACK", "", "the sneak"),
+             expected=lambda p: _sneak_expected(*p[1:])),
+    PlayType("draw", "run", lambda o, f: draw_params(o, f), lambda p, t=None: roll_draw(p, t),
+             ("sack_adj", "tfl_chance", "run_mean", "run_std", "run_big_play_chance", "run_big_play_bonus"),
+             PlayText("DRAW", "SACK", "", "the draw"),
+             expected=lambda p: _carry_expected(*p[1:])),
+)}
+check_penalty_rates(PENALTY_TYPES, PLAY_TYPES)
+
+def sample_batch(call: str, offense: Team, defense_formation: str, n: int,
+                 pick_target: bool = True) -> List[PlayOutcome]:
+    """`n` independent snaps of one play vs one formation; the matchup lookups are done once."""
+    pt = PLAY_TYPES[call]
+    params, roll = pt.params(offense, defense_formation), pt.roll
+    if pick_target and pt.target is not None:
+        target = pt.target
+        return [roll(params, target(offense, defense_formation)) for _ in range(n)]
+    return [roll(params, None) for _ in range(n)]
+
+def debug_pass_probs(team_name: str, defense_formation: str) -> str:
+    comp, inter, sack = compute_pass_probs(team_name, defense_formation)
+    dcomp, dinter, dsack = compute_deep_pass_probs(team_name, defense_formation)
+    return (f"[debug] {team_name} vs {defense_formation}: pass comp {comp:.2f} int {inter:.3f} sack {sack:.2f}"
+            f" | deep comp {dcomp:.2f} int {dinter:.3f} sack {dsack:.2f}")
 
 # =========================== AI Helpers ===========================
 
@@ -525,7 +1463,7 @@ class Tendencies:
     def run_ratio(self) -> float:
         if not self.recent_offense_calls:
             return 0.5
-        runs = sum(1 for c in self.recent_offense_calls if c == "run")
+        runs = sum(1 for c in self.recent_offense_calls if c in PLAY_TYPES and PLAY_TYPES[c].kind == "run")
         return runs / len(self.recent_offense_calls)
 
 def ai_choose_defense(ball_on: int, distance_to_first: int, down: int, seconds_left: int,
@@ -541,8 +1479,28 @@ def ai_choose_defense(ball_on: int, distance_to_first: int, down: int, seconds_l
         return random.choices(["4-3 Base", "Blitz", "Nickel"], weights=[0.6, 0.3, 0.1])[0]
     return random.choices(["4-3 Base", "Nickel", "Dime", "Blitz"], weights=[0.4, 0.3, 0.2, 0.1])[0]
 
+def _call_mix(*pairs: Tuple[str, float]) -> Tuple[List[str], List[float]]:
+    calls = [c for c, _ in pairs]
+    return calls, list(accumulate(w for _, w in pairs))
+
+# Play-calling mixes by situation, as (calls, cumulative weights): random.choices with
+# cum_weights draws exactly like weights= without rebuilding the lists every snap.
+AI_OFFENSE_MIX: Dict[str, Tuple[List[str], List[float]]] = {
+    "hurry_up": _call_mix(("deep", 0.4), ("pass", 0.4), ("run", 0.2)),
+    "short": _call_mix(("sneak", 0.45), ("run", 0.30), ("playaction", 0.15), ("pass", 0.10)),
+    "long": _call_mix(("pass", 0.55), ("deep", 0.25), ("run", 0.20)),
+    "midfield": _call_mix(("run", 0.30), ("pass", 0.30), ("deep", 0.15), ("playaction", 0.15), ("draw", 0.10)),
+    "red_zone": _call_mix(("run", 0.55), ("pass", 0.40), ("deep", 0.05)),
+    "default": _call_mix(("run", 0.35), ("pass", 0.30), ("deep", 0.12), ("screen", 0.10),
+                         ("draw", 0.08), ("playaction", 0.05)),
+}
+
+def _pick_call(situation: str) -> str:
+    calls, cum = AI_OFFENSE_MIX[situation]
+    return random.choices(calls, cum_weights=cum)[0]
+
 def ai_choose_offense(distance_to_first: int, down: int, ball_on: int, seconds_left: int,
-                      score_trail: int) -> str:
+                      score_trail: int, quarter: Optional[int] = None) -> str:
     yards_to_td = 100 - ball_on
     if down == 4:
         fg_prob = field_goal_success_prob(ball_on)
@@ -550,16 +1508,20 @@ def ai_choose_offense(distance_to_first: int, down: int, ball_on: int, seconds_l
             return "fg"
         if yards_to_td > 20 and distance_to_first > 1:
             return "punt"
+        if distance_to_first <= 1:
+            return _pick_call("short")
         return random.choice(["run", "pass", "deep"])
-    if seconds_left < 90 and score_trail > 0:
-        return random.choices(["deep", "pass", "run"], weights=[0.4, 0.4, 0.2])[0]
+    if seconds_left < 90 and score_trail > 0 and quarter in (None, 2, QUARTERS):
+        return _pick_call("hurry_up")
+    if down == 3 and distance_to_first <= 1:
+        return _pick_call("short")
     if distance_to_first >= 8:
-        return random.choices(["pass", "deep", "run"], weights=[0.55, 0.25, 0.20])[0]
+        return _pick_call("long")
     if 40 <= ball_on <= 60 and down in (1, 2):
-        return random.choices(["run", "pass", "deep"], weights=[0.40, 0.40, 0.20])[0]
+        return _pick_call("midfield")
     if yards_to_td <= 10:
-        return random.choices(["run", "pass", "deep"], weights=[0.55, 0.40, 0.05])[0]
-    return random.choices(["run", "pass", "deep"], weights=[0.45, 0.40, 0.15])[0]
+        return _pick_call("red_zone")
+    return _pick_call("default")
 
 def ai_choose_target(offense: Team, defense_formation: str) -> str:
     wr1 = canonical_name(offense.roster["WR1"])
@@ -582,645 +1544,1632 @@ def ai_choose_target(offense: Team, defense_formation: str) -> str:
 
 # =========================== UI Helpers ===========================
 
-def select_team(teams: List[Team], prompt: str) -> Team:
-    print(prompt)
+def _mute(*args, **kwargs) -> None:
+    pass
+
+# Every prompt goes through `ask` (input() by default) and every menu line through
+# `show`, so recorded games can be replayed without a keyboard or console noise.
+
+def select_team(teams: List[Team], prompt: str, ask: Optional[Callable[[str], str]] = None,
+                show: Callable[..., None] = print) -> Team:
+    ask = ask if ask is not None else input
+    show(prompt)
     for idx, t in enumerate(teams):
-        print(f"{idx+1}. {t.name}  (QB: {t.roster['QB']}, RB: {t.roster['RB']}, WR1: {t.roster['WR1']}, WR2: {t.roster['WR2']}, TE: {t.roster['TE']})")
+        show(f"{idx+1}. {t.name}  (QB: {t.roster['QB']}, RB: {t.roster['RB']}, WR1: {t.roster['WR1']}, WR2: {t.roster['WR2']}, TE: {t.roster['TE']})")
     while True:
-        choice = input("Enter team number: ").strip()
+        choice = ask("Enter team number: ").strip()
         if choice.isdigit():
             i = int(choice) - 1
             if 0 <= i < len(teams):
                 return teams[i]
-        print("Invalid selection. Try again.")
+        show("Invalid selection. Try again.")
 
-def user_offense_choice() -> str:
+MENU_COMMANDS = ["stats", "score", "clock", "timeout", "save", "whatif", "quit"]
+
+def user_offense_choice(ask: Optional[Callable[[str], str]] = None, show: Callable[..., None] = print) -> str:
+    ask = ask if ask is not None else input
     while True:
-        s = input("Your offense: [run/pass/deep/punt/fg] (or 'stats', 'score', 'clock', 'timeout', 'quit'): ").strip().lower()
-        if s in ["run", "pass", "deep", "punt", "fg", "stats", "score", "clock", "timeout", "quit"]:
+        s = ask(f"Your offense: [{'/'.join(OFFENSE_CALLS)}] (or 'stats', 'score', 'clock', 'timeout', 'save', 'whatif', 'quit'): ").strip().lower()
+        if s in PLAY_TYPES or s in SPECIAL_CALLS or s in MENU_COMMANDS:
             return s
-        print("Invalid choice. Try again.")
+        show("Invalid choice. Try again.")
 
-def user_defense_choice() -> str:
-    print("Your defense: choose formation:")
+def user_defense_choice(ask: Optional[Callable[[str], str]] = None, show: Callable[..., None] = print) -> str:
+    ask = ask if ask is not None else input
+    show("Your defense: choose formation:")
     for idx, d in enumerate(DEF_CHOICES):
-        print(f"{idx+1}. {d}")
+        show(f"{idx+1}. {d}")
     while True:
-        choice = input("Enter formation (or 'stats', 'score', 'clock', 'timeout', 'quit'): ").strip().lower()
-        if choice in ["stats", "score", "clock", "timeout", "quit"]:
+        choice = ask("Enter formation (or 'stats', 'score', 'clock', 'timeout', 'save', 'whatif', 'quit'): ").strip().lower()
+        if choice in MENU_COMMANDS:
             return choice
         if choice.isdigit():
             i = int(choice) - 1
             if 0 <= i < len(DEF_CHOICES):
                 return DEF_CHOICES[i]
-        print("Invalid selection. Try again.")
+        show("Invalid selection. Try again.")
+
+# =========================== Game State ===========================
+
+QUARTERS = 4
+SECS_PER_Q = 12 * 60
+TIMEOUTS_PER_HALF = 3
+
+# Overtime for games tied after the 4th quarter. Both are modified sudden death: a
+# score ends the game only once the side that didn't score has had the ball, except
+# that with guaranteed_possession off an opening-possession touchdown (or a defensive
+# score) wins outright. "periods" 0 means play on until someone wins.
+# Append-only: the index is how the rules are serialized.
+OVERTIME_RULES: Dict[str, Dict[str, object]] = {
+    "regular": {"seconds": 10 * 60, "periods": 1, "timeouts": 2, "guaranteed_possession": False},
+    "playoff": {"seconds": 15 * 60, "periods": 0, "timeouts": 3, "guaranteed_possession": True},
+}
 
-# =========================== Game Loop ===========================
+ROSTER_POSITIONS = ("QB", "RB", "WR1", "WR2", "TE")
+# Append-only: the index is how tendencies are serialized.
+OFFENSE_CALLS = ("run", "pass", "deep", "punt", "fg", "screen", "playaction", "sneak", "draw", "spike", "kneel")
 
-def game():
-    random.seed()
-    print("Welcome to the Football Simulator. Good Luck!\n")
-    user_team = select_team(TEAMS, "Select YOUR TEAM:")
-    cpu_team = select_team(TEAMS, "Select the COMPUTER TEAM:")
-
-    print("\nWho receives the opening kickoff?")
-    print("1. Your team")
-    print("2. Computer team")
-    user_receives = (input("Enter 1 or 2: ").strip() == "1")
-
-    initial_receiving_team = user_team if user_receives else cpu_team
-
-    stats: StatsType = {}
-    penalty_totals: PenaltyTotalsType = make_penalty_totals(user_team, cpu_team)
-    scoreboard = {user_team.name: 0, cpu_team.name: 0}
-    tendencies_user = Tendencies(recent_offense_calls=[])
-    tendencies_cpu = Tendencies(recent_offense_calls=[])
-
-    QUARTERS = 4
-    SECS_PER_Q = 12 * 60
-    quarter = 1
-    seconds_left = SECS_PER_Q
-    timeouts = {user_team.name: 3, cpu_team.name: 3}
-    halftime_done = False
-
-    def reset_timeouts():
-        timeouts[user_team.name] = 3
-        timeouts[cpu_team.name] = 3
-
-    def kickoff_to(team_receives: Team):
-        offense = team_receives
-        defense = cpu_team if offense is user_team else user_team
-        ball_on = 25
-        down = 1
-        line_to_gain = min(ball_on + 10, 100)
-        return offense, defense, ball_on, line_to_gain, down
-
-    offense, defense, ball_on, line_to_gain, down = kickoff_to(initial_receiving_team)
-
-    def distance_to_first():
-        return max(1, line_to_gain - ball_on)
-
-    def situation():
-        print(f"\nQ{quarter} {mmss(seconds_left)} | {offense.name} ball | {down} & {distance_to_first()} at O-{ball_on}")
-
-    def advance_clock(play_type: str, completed: bool) -> bool:
-        nonlocal seconds_left, quarter, halftime_done, offense, defense, ball_on, line_to_gain, down
-        halftime_kickoff = False
-        if play_type == "run":
-            delta = random.randint(28, 42)
-        elif play_type == "pass":
-            delta = random.randint(30, 40) if completed else random.randint(5, 10)
+@dataclass
+class TeamTotals:
+    """Per-team offensive counters (scrimmage plays only, no penalty yards)."""
+    plays: int = 0
+    yards: int = 0
+    pass_attempts: int = 0
+    completions: int = 0
+
+@dataclass
+class GameState:
+    """
+    Everything needed to continue a game from the current snap.
+    `offense`/`defense` are always the same objects as `user_team`/`cpu_team`.
+    """
+    user_team: Team
+    cpu_team: Team
+    initial_receiver: Team
+    offense: Team
+    defense: Team
+    ball_on: int = 25
+    line_to_gain: int = 35
+    down: int = 1
+    quarter: int = 1
+    seconds_left: int = SECS_PER_Q
+    halftime_done: bool = False
+    scoreboard: Dict[str, int] = field(default_factory=dict)
+    timeouts: Dict[str, int] = field(default_factory=dict)
+    stats: StatsType = field(default_factory=dict)
+    penalty_totals: PenaltyTotalsType = field(default_factory=dict)
+    totals: Dict[str, TeamTotals] = field(default_factory=dict)
+    tendencies_user: Tendencies = field(default_factory=lambda: Tendencies(recent_offense_calls=[]))
+    tendencies_cpu: Tendencies = field(default_factory=lambda: Tendencies(recent_offense_calls=[]))
+    rng_state: Optional[tuple] = None
+    clock_running: bool = False     # the last play left the clock running into this snap
+    user_controlled: bool = False   # a person calls the user team's snaps and timeouts (game())
+    overtime: Optional[str] = None  # OVERTIME_RULES key; None lets a tie stand
+    ot_possessions: int = 0         # overtime snaps taken so far: 1 = user team, 2 = CPU team
+
+    @classmethod
+    def new(cls, user_team: Team, cpu_team: Team, user_receives: bool,
+            overtime: Optional[str] = "regular") -> "GameState":
+        if overtime is not None and overtime not in OVERTIME_RULES:
+            raise ValueError(f"Unknown overtime rules {overtime!r}; expected one of {sorted(OVERTIME_RULES)} or None")
+        receiver = user_team if user_receives else cpu_team
+        st = cls(user_team=user_team, cpu_team=cpu_team, initial_receiver=receiver, overtime=overtime,
+                 offense=receiver, defense=cpu_team if receiver is user_team else user_team,
+                 scoreboard={user_team.name: 0, cpu_team.name: 0},
+                 timeouts={user_team.name: TIMEOUTS_PER_HALF, cpu_team.name: TIMEOUTS_PER_HALF},
+                 penalty_totals=make_penalty_totals(user_team, cpu_team),
+                 totals={user_team.name: TeamTotals(), cpu_team.name: TeamTotals()})
+        kickoff_to(st, receiver)
+        return st
+
+    def distance_to_first(self) -> int:
+        return max(1, self.line_to_gain - self.ball_on)
+
+    def game_over(self) -> bool:
+        # The clock only sits at 0:00 once the 4th quarter or the last overtime period is done
+        return self.seconds_left <= 0
+
+    def game_seconds_left(self) -> int:
+        return max(0, QUARTERS - self.quarter) * SECS_PER_Q + max(0, self.seconds_left)
+
+    def in_overtime(self) -> bool:
+        return self.quarter > QUARTERS
+
+    def copy(self) -> "GameState":
+        """Independent copy of the mutable containers (teams are shared, they never change)."""
+        cp = copy.copy(self)
+        cp.scoreboard = dict(self.scoreboard)
+        cp.timeouts = dict(self.timeouts)
+        cp.stats = {t: {n: replace(ps) for n, ps in players.items()} for t, players in self.stats.items()}
+        cp.penalty_totals = {t: dict(v) for t, v in self.penalty_totals.items()}
+        cp.totals = {t: replace(v) for t, v in self.totals.items()}
+        cp.tendencies_user = Tendencies(list(self.tendencies_user.recent_offense_calls))
+        cp.tendencies_cpu = Tendencies(list(self.tendencies_cpu.recent_offense_calls))
+        return cp
+
+    def snapshot(self) -> "GameState":
+        """Copy of the game right now, including the global RNG state."""
+        snap = self.copy()
+        snap.rng_state = random.getstate()
+        return snap
+
+    def restore_rng(self) -> None:
+        if self.rng_state is not None:
+            random.setstate(self.rng_state)
+
+    def to_bytes(self) -> bytes:
+        return encode_game_state(self)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GameState":
+        return decode_game_state(data)
+
+# --- Compact binary encoding ------------------------------------------------
+# Teams are stored as indexes into TEAMS and players by roster position, so the
+# core state is ~210 bytes. The optional Mersenne Twister state adds 2.5 KB.
+
+STATE_FORMAT_VERSION = 5
+_STATE_MAGIC = b"FSGS"
+_STAT_FIELDS = tuple(f.name for f in fields(PlayerStats))
+_TEAM_INDEX = {t.name: i for i, t in enumerate(TEAMS)}
+_CALL_CODE = {c: i for i, c in enumerate(OFFENSE_CALLS)}
+_TENDENCY_SLOTS = 6
+
+_HEADER = struct.Struct("<4sB")
+_CORE = struct.Struct("<BB??BBBBH?HHBBHHHH??BB")
+_OVERTIME_CODE = {name: i + 1 for i, name in enumerate(OVERTIME_RULES)}
+_TENDENCIES = struct.Struct(f"<B{_TENDENCY_SLOTS}s")
+_TEAM_STATS = struct.Struct(f"<B{len(ROSTER_POSITIONS) * len(_STAT_FIELDS)}h")
+_TEAM_TOTALS = struct.Struct("<HiHH")
+_RNG = struct.Struct("<B625I?d")
+
+def _team_index(team: Team) -> int:
+    idx = _TEAM_INDEX.get(team.name)
+    if idx is None:
+        raise ValueError(f"Cannot serialize team not in TEAMS: {team.name!r}")
+    return idx
+
+def _pack_tendencies(t: Tendencies) -> bytes:
+    calls = t.recent_offense_calls[-_TENDENCY_SLOTS:]
+    return _TENDENCIES.pack(len(calls), bytes(_CALL_CODE[c] for c in calls))
+
+def _unpack_tendencies(buf: bytes, offset: int) -> Tendencies:
+    n, codes = _TENDENCIES.unpack_from(buf, offset)
+    return Tendencies(recent_offense_calls=[OFFENSE_CALLS[c] for c in codes[:n]])
+
+def _pack_team_stats(stats: StatsType, team: Team) -> bytes:
+    players = stats.get(team.name, {})
+    by_name = {canonical_name(team.roster[pos]): i for i, pos in enumerate(ROSTER_POSITIONS)}
+    mask = 0
+    values = [0] * (len(ROSTER_POSITIONS) * len(_STAT_FIELDS))
+    for name, ps in coalesce(players).items():
+        i = by_name.get(name)
+        if i is None:
+            raise ValueError(f"Cannot serialize stats for non-roster player {name!r} ({team.name})")
+        mask |= 1 << i
+        for j, f in enumerate(_STAT_FIELDS):
+            values[i * len(_STAT_FIELDS) + j] = getattr(ps, f)
+    return _TEAM_STATS.pack(mask, *values)
+
+def _unpack_team_stats(buf: bytes, offset: int, team: Team, stats: StatsType) -> None:
+    mask, *values = _TEAM_STATS.unpack_from(buf, offset)
+    if not mask:
+        return
+    players = stats.setdefault(team.name, {})
+    for i, pos in enumerate(ROSTER_POSITIONS):
+        if mask & (1 << i):
+            row = values[i * len(_STAT_FIELDS):(i + 1) * len(_STAT_FIELDS)]
+            players[canonical_name(team.roster[pos])] = PlayerStats(*row)
+
+def _pack_totals(st: GameState, team: Team) -> bytes:
+    t = st.totals.get(team.name) or TeamTotals()
+    return _TEAM_TOTALS.pack(t.plays, t.yards, t.pass_attempts, t.completions)
+
+def encode_game_state(st: GameState) -> bytes:
+    u, c = st.user_team, st.cpu_team
+    parts = [
+        _HEADER.pack(_STATE_MAGIC, STATE_FORMAT_VERSION),
+        _CORE.pack(
+            _team_index(u), _team_index(c),
+            st.initial_receiver is u, st.offense is u,
+            st.ball_on, st.line_to_gain, st.down, st.quarter, max(0, st.seconds_left), st.halftime_done,
+            st.scoreboard[u.name], st.scoreboard[c.name],
+            st.timeouts[u.name], st.timeouts[c.name],
+            st.penalty_totals[u.name]["count"], st.penalty_totals[u.name]["yards"],
+            st.penalty_totals[c.name]["count"], st.penalty_totals[c.name]["yards"],
+            st.clock_running, st.user_controlled, _OVERTIME_CODE[st.overtime] if st.overtime else 0, st.ot_possessions,
+        ),
+        _pack_tendencies(st.tendencies_user),
+        _pack_tendencies(st.tendencies_cpu),
+        _pack_team_stats(st.stats, u),
+        _pack_team_stats(st.stats, c),
+        _pack_totals(st, u),
+        _pack_totals(st, c),
+    ]
+    if st.rng_state is not None:
+        version, internal, gauss_next = st.rng_state
+        parts.append(_RNG.pack(version, *internal, gauss_next is not None, gauss_next or 0.0))
+    return b"".join(parts)
+
+def decode_game_state(data: bytes) -> GameState:
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != _STATE_MAGIC:
+        raise ValueError("Not a footballsim game state")
+    if version != STATE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported game state format {version} (expected {STATE_FORMAT_VERSION})")
+    offset = _HEADER.size
+    (ui, ci, recv_is_user, off_is_user, ball_on, line_to_gain, down, quarter, seconds_left, halftime_done,
+     u_pts, c_pts, u_to, c_to, u_pen_n, u_pen_y, c_pen_n, c_pen_y, clock_running, user_controlled,
+     ot_code, ot_possessions) = _CORE.unpack_from(data, offset)
+    offset += _CORE.size
+    u, c = TEAMS[ui], TEAMS[ci]
+    st = GameState(
+        user_team=u, cpu_team=c,
+        initial_receiver=u if recv_is_user else c,
+        offense=u if off_is_user else c, defense=c if off_is_user else u,
+        ball_on=ball_on, line_to_gain=line_to_gain, down=down, quarter=quarter,
+        seconds_left=seconds_left, halftime_done=halftime_done,
+        scoreboard={u.name: u_pts, c.name: c_pts},
+        timeouts={u.name: u_to, c.name: c_to},
+        penalty_totals={u.name: {"count": u_pen_n, "yards": u_pen_y}, c.name: {"count": c_pen_n, "yards": c_pen_y}},
+        clock_running=clock_running, user_controlled=user_controlled,
+        overtime=list(OVERTIME_RULES)[ot_code - 1] if ot_code else None, ot_possessions=ot_possessions,
+    )
+    st.tendencies_user = _unpack_tendencies(data, offset)
+    offset += _TENDENCIES.size
+    st.tendencies_cpu = _unpack_tendencies(data, offset)
+    offset += _TENDENCIES.size
+    _unpack_team_stats(data, offset, u, st.stats)
+    offset += _TEAM_STATS.size
+    _unpack_team_stats(data, offset, c, st.stats)
+    offset += _TEAM_STATS.size
+    for team in (u, c):
+        st.totals[team.name] = TeamTotals(*_TEAM_TOTALS.unpack_from(data, offset))
+        offset += _TEAM_TOTALS.size
+    if len(data) > offset:
+        version, *rest = _RNG.unpack_from(data, offset)
+        internal, has_gauss, gauss = tuple(rest[:625]), rest[625], rest[626]
+        st.rng_state = (version, internal, gauss if has_gauss else None)
+    return st
+
+# --- Engine steps shared by every snap ----------------------------------------
+
+def kickoff_to(st: GameState, team_receives: Team, ball_on: int = 25) -> None:
+    """Gives `team_receives` a new series at `ball_on` (their yard line)."""
+    st.offense = team_receives
+    st.defense = st.cpu_team if team_receives is st.user_team else st.user_team
+    st.ball_on = clamp_start_spot(ball_on)
+    st.down = 1
+    st.line_to_gain = min(st.ball_on + 10, 100)
+    st.clock_running = False
+
+def kick_off(st: GameState, kicking: Team, out: Narrator) -> None:
+    """Kickoff by `kicking` (to open a half or after a score); kicks again after a return touchdown."""
+    while True:
+        if st.game_over():
+            return  # an overtime score ended it
+        receiving = st.cpu_team if kicking is st.user_team else st.user_team
+        deficit = st.scoreboard[receiving.name] - st.scoreboard[kicking.name]
+        onside = ai_onside_kick(st.quarter, st.seconds_left, deficit)
+        k = sample_kickoff(onside)
+        if out.pbp: out.emit(f"Kickoff by {kicking.name}{' (onside)' if onside else ''}: "
+                             f"{describe_kickoff(k, kicking, receiving)}")
+        if k.result != "return_td":
+            break
+        score_touchdown(st, receiving, out)
+        kicking = receiving
+    if k.kicking_team_ball:
+        kickoff_to(st, kicking, 100 - k.spot)
+    else:
+        kickoff_to(st, receiving, k.spot)
+
+def tally_play(st: GameState, yards: int, attempt: bool = False, completed: bool = False) -> None:
+    """Counts one scrimmage play for the offense (yards capped at the goal line)."""
+    t = st.totals.get(st.offense.name)
+    if t is None:
+        t = st.totals[st.offense.name] = TeamTotals()
+    t.plays += 1
+    t.yards += cap_gain_to_td(st.ball_on, yards)
+    if attempt:
+        t.pass_attempts += 1
+        if completed:
+            t.completions += 1
+
+def tally_pass(st: GameState, play_yards: int, completed: bool, sacked: bool) -> None:
+    # Sacks are plays but not attempts; incompletions and picks gain nothing.
+    yards = max(0, play_yards) if completed else play_yards if sacked else 0
+    tally_play(st, yards, attempt=not sacked, completed=completed)
+
+def reset_timeouts(st: GameState) -> None:
+    st.timeouts[st.user_team.name] = TIMEOUTS_PER_HALF
+    st.timeouts[st.cpu_team.name] = TIMEOUTS_PER_HALF
+
+def situation(st: GameState, out: Narrator) -> None:
+    if out.pbp: out.emit(f"\n{period_label(st.quarter)} {mmss(st.seconds_left)} | {st.offense.name} ball | {st.down} & {st.distance_to_first()} at O-{st.ball_on}")
+
+# --- Clock ------------------------------------------------------------------------
+# A snap charges the time the ball is live and, if the clock keeps running after the
+# play, the time until the next snap. Both come from distributions precomputed per
+# situation (a cumulative table each), so a draw is one random number and a bisect.
+# The clock stops on incompletions, scores, changes of possession and timeouts, and
+# on plays out of bounds late in a half; earlier, out of bounds only stops it until
+# the ready-for-play signal. The tempo follows the score late in each half.
+
+LATE_WINDOW = {2: 120, 4: 300}     # seconds left in the quarter when out of bounds stops the clock
+TWO_MINUTE_WARNING = 120
+
+# Seconds the ball is live, by clock class: (low, mode, high) of a triangular distribution.
+PLAY_SECONDS: Dict[str, Tuple[int, int, int]] = {
+    "run": (3, 5, 8), "pass": (4, 6, 9), "kick": (5, 9, 14), "spike": (1, 1, 3), "kneel": (1, 2, 3),
+}
+# Seconds until the next snap while the clock runs, by (how it runs, tempo). "restart":
+# out of bounds outside the late window; the clock starts again on the referee's signal.
+BETWEEN_SNAPS: Dict[Tuple[str, str], Tuple[int, int, int]] = {
+    ("running", "normal"): (24, 30, 35),
+    ("running", "hurry_up"): (8, 12, 18),
+    ("running", "milk"): (34, 38, 40),
+    ("restart", "normal"): (18, 23, 28),
+    ("restart", "hurry_up"): (5, 8, 12),
+    ("restart", "milk"): (28, 32, 36),
+}
+# Chance a play that stays live ends out of bounds, by (clock class, tempo).
+OUT_OF_BOUNDS: Dict[Tuple[str, str], float] = {
+    ("run", "normal"): 0.10, ("run", "hurry_up"): 0.30, ("run", "milk"): 0.03,
+    ("pass", "normal"): 0.20, ("pass", "hurry_up"): 0.45, ("pass", "milk"): 0.08,
+}
+KNEEL_SECONDS = 36                 # what a kneel reliably takes off the clock when no timeout stops it
+
+def _triangle_table(low: int, mode: int, high: int) -> Tuple[List[int], List[float]]:
+    values = list(range(low, high + 1))
+    weights = [(x - low + 1) / (mode - low + 1) if x <= mode else (high - x + 1) / (high - mode + 1) for x in values]
+    return values, list(accumulate(weights))
+
+_PLAY_CLOCK = {k: _triangle_table(*v) for k, v in PLAY_SECONDS.items()}
+_BETWEEN_CLOCK = {k: _triangle_table(*v) for k, v in BETWEEN_SNAPS.items()}
+
+def draw_seconds(table: Tuple[List[int], List[float]]) -> int:
+    values, cum = table
+    return values[bisect_right(cum, random.random() * cum[-1])]
+
+def in_late_window(st: GameState) -> bool:
+    return st.seconds_left <= LATE_WINDOW.get(st.quarter, 0)
+
+def clock_tempo(st: GameState) -> str:
+    """'hurry_up', 'milk' or 'normal' for the team with the ball."""
+    if not in_late_window(st):
+        return "normal"
+    margin = st.scoreboard[st.offense.name] - st.scoreboard[st.defense.name]
+    if st.quarter < QUARTERS or margin < 0 or (margin == 0 and st.seconds_left <= TWO_MINUTE_WARNING):
+        return "hurry_up"
+    return "milk" if margin > 0 else "normal"
+
+def advance_clock(st: GameState, play_type: str, running: bool, out: Narrator,
+                  tempo: Optional[str] = None) -> bool:
+    """
+    Runs the clock for one play. `running` says whether the play left the clock running
+    (a run or catch in bounds, a sack, a kneel). Returns True if the play ended the
+    first half (second-half kickoff done).
+    """
+    halftime_kickoff = False
+    tempo = tempo or clock_tempo(st)
+    delta = draw_seconds(_PLAY_CLOCK[play_type])
+    live = delta
+    if running:
+        oob = (play_type, tempo) in OUT_OF_BOUNDS and random.random() < OUT_OF_BOUNDS[(play_type, tempo)]
+        if oob and in_late_window(st):
+            running = False
+            if out.pbp: out.emit("Out of bounds; the clock stops.")
+        elif ai_maybe_timeout(st, tempo, out):
+            running = False
         else:
-            delta = random.randint(8, 15)
-        if quarter == QUARTERS:
-            delta = min(delta, seconds_left)
-        seconds_left -= delta
-        while seconds_left <= 0 and quarter < QUARTERS:
-            print(f"\n--- End of Q{quarter}. ---")
-            quarter += 1
-            seconds_left = SECS_PER_Q
-            if quarter == 3 and not halftime_done:
-                reset_timeouts()
-                second_half_receiver = cpu_team if initial_receiving_team is user_team else user_team
-                offense, defense, ball_on, line_to_gain, down = kickoff_to(second_half_receiver)
-                halftime_done = True
-                halftime_kickoff = True
-                print("=== Start of Second Half: kickoff (1st & 10 at O-25), 12:00 ===")
-            else:
-                print(f"Start Q{quarter} — {mmss(seconds_left)}")
-        if quarter == QUARTERS and seconds_left < 0:
-            seconds_left = 0
-        return halftime_kickoff
-
-    def consume_clock(play_type: str, completed: bool) -> bool:
-        return advance_clock(play_type, completed)
-
-    def call_timeout(team: Team):
-        if timeouts[team.name] > 0:
-            timeouts[team.name] -= 1
-            print(f"Timeout {team.name}. Timeouts left: {timeouts[team.name]}")
+            delta += draw_seconds(_BETWEEN_CLOCK[("restart" if oob else "running", tempo)])
+    if st.quarter in LATE_WINDOW and st.seconds_left > TWO_MINUTE_WARNING >= st.seconds_left - delta:
+        delta = max(live, st.seconds_left - TWO_MINUTE_WARNING)
+        running = False
+        if out.pbp: out.emit("Two-minute warning.")
+    if st.quarter >= QUARTERS:
+        delta = min(delta, st.seconds_left)
+    st.seconds_left -= delta
+    st.clock_running = running
+    if out.debug: out.emit(f"[debug] clock: {play_type} play runs {delta}s ({tempo}{', running' if running else ''})")
+    while st.seconds_left <= 0 and st.quarter < QUARTERS:
+        if out.summary: out.emit(f"\n--- End of Q{st.quarter}. ---")
+        st.quarter += 1
+        st.seconds_left = SECS_PER_Q
+        if st.quarter == 3 and not st.halftime_done:
+            reset_timeouts(st)
+            st.halftime_done = True
+            halftime_kickoff = True
+            if out.summary: out.emit(f"=== Start of Second Half, {mmss(st.seconds_left)} ===")
+            kick_off(st, st.initial_receiver, out)
         else:
-            print(f"{team.name} has no timeouts remaining.")
-
-    def flip_possession(new_ball_on: int):
-        nonlocal offense, defense, ball_on, line_to_gain, down
-        offense, defense = defense, offense
-        ball_on = clamp_start_spot(new_ball_on)
-        down = 1
-        line_to_gain = min(ball_on + 10, 100)
-        print(f"{offense.name} takes over at O-{ball_on} (1st & {distance_to_first()}).")
-
-    def after_first_down():
-        nonlocal down, line_to_gain
-        print("First down!")
-        down = 1
-        line_to_gain = min(ball_on + 10, 100)
-
-    def enforce_penalty_pre(p: PenaltyResult):
-        nonlocal ball_on
-        print(f"Penalty: {p.description}")
-        accrue_penalty(penalty_totals, offense, defense, p)
-        ball_on = clamp_play_spot(ball_on + p.yardage)
-        if p.automatic_first:
-            after_first_down()
-
-    # --- SAFETY helpers --------------------------------------------------------
-    def handle_safety(reason: str):
-        """Award safety, update score, and restart with a free-kick style possession."""
-        nonlocal offense, defense, ball_on, line_to_gain, down
-        print(f"SAFETY! {reason} Two points to {defense.name}.")
-        scoreboard[defense.name] += 2
-        print_score(scoreboard)
-        # The team that conceded (current offense) free-kicks; scoring team (current defense) receives
-        recv_ball_on, desc = safety_free_kick_result()
-        # Switch possession: scoring team on offense
-        offense, defense = defense, offense
-        ball_on = clamp_start_spot(recv_ball_on)
-        down = 1
-        line_to_gain = min(ball_on + 10, 100)
-        print(desc)
-
-    def check_and_award_safety(net_yards: int, reason: str) -> bool:
-        """
-        Returns True if a safety occurred.
-        We check using raw position change BEFORE clamping, so we catch end-zone outcomes.
-        """
-        if (ball_on + net_yards) <= 0:
-            handle_safety(reason)
-            return True
+            if out.summary: out.emit(f"Start Q{st.quarter} — {mmss(st.seconds_left)}")
+    if st.quarter >= QUARTERS and st.seconds_left <= 0:
+        st.seconds_left = 0
+        halftime_kickoff = start_overtime_period(st, out)
+    return halftime_kickoff
+
+def period_label(quarter: int) -> str:
+    if quarter <= QUARTERS:
+        return f"Q{quarter}"
+    return "OT" if quarter == QUARTERS + 1 else f"OT{quarter - QUARTERS}"
+
+def start_overtime_period(st: GameState, out: Narrator) -> bool:
+    """
+    At 0:00 of the 4th quarter or an overtime period: if the score is tied and the
+    rules allow another period, starts it. The first one opens with a coin toss and
+    a kickoff; later periods carry on with the same series. Returns True if it kicked off.
+    """
+    rules = OVERTIME_RULES.get(st.overtime) if st.overtime else None
+    if rules is None or st.scoreboard[st.user_team.name] != st.scoreboard[st.cpu_team.name]:
+        return False
+    period = st.quarter - QUARTERS + 1
+    if rules["periods"] and period > rules["periods"]:
         return False
+    st.quarter += 1
+    st.seconds_left = rules["seconds"]
+    if period > 1:
+        if out.summary: out.emit(f"\n--- End of {period_label(st.quarter - 1)}, still tied. ---\n"
+                                 f"Start {period_label(st.quarter)} — {mmss(st.seconds_left)}")
+        return False
+    st.timeouts = {st.user_team.name: rules["timeouts"], st.cpu_team.name: rules["timeouts"]}
+    st.ot_possessions = 0
+    receiver = st.user_team if random.random() < 0.5 else st.cpu_team
+    if out.summary: out.emit(f"\n=== Overtime, {mmss(st.seconds_left)} === {receiver.name} win the toss and will receive.")
+    kick_off(st, st.cpu_team if receiver is st.user_team else st.user_team, out)
+    return True
+
+def overtime_score(st: GameState, scorer: Team, out: Narrator, field_goal: bool = False) -> bool:
+    """
+    Called after every score. In overtime, ends the game (clock to 0:00) when `scorer`
+    now leads and the rules say the other side has had its chance. Returns True if so.
+    """
+    if not st.in_overtime():
+        return False
+    other = st.cpu_team if scorer is st.user_team else st.user_team
+    if st.scoreboard[scorer.name] <= st.scoreboard[other.name]:
+        return False
+    if not st.ot_possessions & (1 if other is st.user_team else 2):
+        if field_goal or OVERTIME_RULES[st.overtime]["guaranteed_possession"]:
+            return False
+    st.seconds_left = 0
+    st.clock_running = False
+    if out.summary: out.emit(f"{scorer.name} win it in overtime!")
+    return True
+
+def call_timeout(st: GameState, team: Team, out: Narrator) -> None:
+    if st.timeouts[team.name] > 0:
+        st.timeouts[team.name] -= 1
+        st.clock_running = False
+        if out.pbp: out.emit(f"Timeout {team.name}. Timeouts left: {st.timeouts[team.name]}")
+    else:
+        if out.pbp: out.emit(f"{team.name} has no timeouts remaining.")
+
+def flip_possession(st: GameState, new_ball_on: int, out: Narrator) -> None:
+    st.offense, st.defense = st.defense, st.offense
+    st.ball_on = clamp_start_spot(new_ball_on)
+    st.down = 1
+    st.line_to_gain = min(st.ball_on + 10, 100)
+    if out.pbp: out.emit(f"{st.offense.name} takes over at O-{st.ball_on} (1st & {st.distance_to_first()}).")
+
+def after_first_down(st: GameState, out: Narrator) -> None:
+    if out.pbp: out.emit("First down!")
+    st.down = 1
+    st.line_to_gain = min(st.ball_on + 10, 100)
+
+def enforce_penalty_pre(st: GameState, p: PenaltyResult, out: Narrator) -> None:
+    if out.pbp: out.emit(f"Penalty: {p.description}")
+    accrue_penalty(st.penalty_totals, st.offense, st.defense, p)
+    st.ball_on = clamp_play_spot(st.ball_on + p.yardage)
+    if p.automatic_first:
+        after_first_down(st, out)
+
+def handle_safety(st: GameState, reason: str, out: Narrator) -> None:
+    """Award safety, update score, and restart with a free-kick style possession."""
+    if out.summary: out.emit(f"SAFETY! {reason} Two points to {st.defense.name}.")
+    st.scoreboard[st.defense.name] += 2
+    if out.summary: print_score(st.scoreboard, out)
+    if overtime_score(st, st.defense, out):
+        return
+    # The team that conceded (current offense) free-kicks; scoring team (current defense) receives
+    recv_ball_on, desc = safety_free_kick_result()
+    # Switch possession: scoring team on offense
+    st.offense, st.defense = st.defense, st.offense
+    st.ball_on = clamp_start_spot(recv_ball_on)
+    st.down = 1
+    st.line_to_gain = min(st.ball_on + 10, 100)
+    if out.pbp: out.emit(desc)
+
+def score_touchdown(st: GameState, team: Team, out: Narrator) -> None:
+    """Six points to `team`, then the PAT or two-point try the conversion chart calls for."""
+    name = team.name
+    st.scoreboard[name] += 6
+    if overtime_score(st, team, out):
+        if out.summary: print_score(st.scoreboard, out)
+        return  # no try after a winning overtime touchdown
+    other = st.cpu_team if team is st.user_team else st.user_team
+    if ai_go_for_two(st.scoreboard[name] - st.scoreboard[other.name], st.game_seconds_left()):
+        good = sample_two_point()
+        if good: st.scoreboard[name] += 2
+        if out.summary: out.emit(f"Two-point try is {'GOOD' if good else 'NO GOOD'}.")
+    else:
+        good = sample_pat()
+        if good: st.scoreboard[name] += 1
+        if out.summary: out.emit(f"Extra point is {'GOOD' if good else 'NO GOOD'}.")
+    if out.summary: print_score(st.scoreboard, out)
+    overtime_score(st, team, out)
 
-    def ai_maybe_timeout():
-        if seconds_left <= 120 and scoreboard[defense.name] < scoreboard[offense.name] and timeouts[defense.name] > 0:
-            if random.random() < 0.5:
-                call_timeout(defense)
+def check_and_award_safety(st: GameState, net_yards: int, reason: str, out: Narrator) -> bool:
+    """
+    Returns True if a safety occurred.
+    We check using raw position change BEFORE clamping, so we catch end-zone outcomes.
+    """
+    if (st.ball_on + net_yards) <= 0:
+        handle_safety(st, reason, out)
+        return True
+    return False
 
-    print(f"\nKickoff! {offense.name} starts at their 25-yard line.")
-    print(f"Quarter {quarter} — {mmss(seconds_left)}")
+def ai_maybe_timeout(st: GameState, tempo: str, out: Narrator) -> bool:
+    """
+    Called while the clock would keep running after a play. A hurrying offense stops it
+    in the last minute of the first half or the last two minutes of the game; a defense
+    that is behind stops it while the offense is milking the clock. Returns True if a
+    timeout was called. A user_controlled state leaves the user team's timeouts to the menu.
+    """
+    offense, defense = st.offense.name, st.defense.name
+    human = st.user_team if st.user_controlled else None
+    if tempo == "hurry_up" and st.timeouts[offense] > 0 and st.offense is not human and \
+            st.seconds_left <= (TWO_MINUTE_WARNING if st.quarter == QUARTERS else 60):
+        call_timeout(st, st.offense, out)
+        return True
+    if tempo == "milk" and st.timeouts[defense] > 0 and st.defense is not human \
+            and st.scoreboard[defense] < st.scoreboard[offense] \
+            and st.seconds_left <= 3 * KNEEL_SECONDS + TWO_MINUTE_WARNING:
+        call_timeout(st, st.defense, out)
+        return True
+    return False
+
+def ai_clock_call(st: GameState) -> Optional[str]:
+    """Kneel or spike when the clock situation calls for it, else None (see ai_choose_offense)."""
+    margin = st.scoreboard[st.offense.name] - st.scoreboard[st.defense.name]
+    if st.ball_on > 2:
+        if st.quarter == QUARTERS and margin > 0:
+            # Victory formation once the remaining snaps can run out the clock.
+            snaps = 5 - st.down - st.timeouts[st.defense.name]
+            if st.seconds_left <= KNEEL_SECONDS * snaps:
+                return "kneel"
+        elif st.quarter == 2 and st.seconds_left <= 30 and st.ball_on < 50 and margin >= 0:
+            return "kneel"
+    if st.clock_running and st.down <= 2 and st.timeouts[st.offense.name] == 0 \
+            and 3 < st.seconds_left <= 60 and clock_tempo(st) == "hurry_up":
+        return "spike"
+    return None
+
+SAVE_PATH = "footballsim_save.bin"
+
+def save_game(st: GameState, path: str = SAVE_PATH) -> int:
+    data = st.snapshot().to_bytes()
+    with open(path, "wb") as fh:
+        fh.write(data)
+    print(f"Game saved to {path} ({len(data)} bytes).")
+    return len(data)
+
+def load_game(path: str = SAVE_PATH) -> GameState:
+    with open(path, "rb") as fh:
+        return GameState.from_bytes(fh.read())
+
+# --- Play resolution ------------------------------------------------------------
+# Every scrimmage call (see PLAY_TYPES) is sampled into a PlayOutcome, then one
+# pipeline applies it (penalty, safety, spot, stats, scoring, possession, clock,
+# downs) for both the user's and the CPU's offense. Names are canonicalized once,
+# at sampling time. Run/pass/deep sample through simulate_* so tests can patch them.
+
+def sample_run(st: GameState, defense_formation: str, pick_target: bool = True) -> PlayOutcome:
+    runner, yards, _, fumble_lost = simulate_run(st.offense, defense_formation)
+    return PlayOutcome("run", canonical_name(runner), None, yards, fumble_lost=fumble_lost)
+
+def sample_pass(st: GameState, defense_formation: str, pick_target: bool = True) -> PlayOutcome:
+    target = ai_choose_target(st.offense, defense_formation) if pick_target else None
+    return PlayOutcome("pass", *simulate_pass(st.offense, defense_formation, target))
+
+def sample_deep(st: GameState, defense_formation: str, pick_target: bool = True) -> PlayOutcome:
+    target = ai_choose_deep_target(st.offense, defense_formation)
+    return PlayOutcome("deep", *simulate_deep_pass(st.offense, defense_formation, target))
+
+def sample_play(st: GameState, pt: PlayType, defense_formation: str, pick_target: bool = True) -> PlayOutcome:
+    if pt.sample is not None:
+        return pt.sample(st, defense_formation, pick_target)
+    target = pt.target(st.offense, defense_formation) if pick_target and pt.target is not None else None
+    return pt.roll(pt.params(st.offense, defense_formation), target)
+
+def finish_snap(st: GameState, clock_play_type: str, running: bool, out: Narrator) -> None:
+    """Runs the clock for a play that ended the series (score, turnover, safety)."""
+    advance_clock(st, clock_play_type, running, out)
+
+def next_down(st: GameState, out: Narrator) -> None:
+    """Moves the chains, or hands the ball over on downs."""
+    if st.ball_on >= st.line_to_gain:
+        after_first_down(st, out)
+    elif st.down == 4:
+        if out.pbp: out.emit("Turnover on downs!")
+        flip_possession(st, to_receiving_spot(st.ball_on), out)
+    else:
+        st.down += 1
+
+def apply_play(st: GameState, o: PlayOutcome, defense_formation: str, out: Narrator,
+               user_defending: bool = False) -> None:
+    """Applies a sampled scrimmage play to `st` in one pass."""
+    pt = PLAY_TYPES[o.call]
+    text = pt.text
+    vs = f"vs {'your ' if user_defending else ''}{defense_formation}"
+    recovers = "Your defense" if user_defending else "Defense"
+    team = st.offense.name
+    is_pass = pt.kind == "pass"
+    clock_play_type = pt.clock
+    # Runs, catches and sacks keep the clock running; incompletions stop it.
+    clock_running = o.completed or o.sacked or not is_pass
+    replay_down = False
+    if is_pass:
+        tally_pass(st, o.yards, o.completed, o.sacked)
+    else:
+        tally_play(st, o.yards)
+
+    if o.sacked:
+        if check_and_award_safety(st, o.yards, f"Sack in the end zone{text.suffix} {vs}.", out):
+            finish_snap(st, clock_play_type, False, out); return
+        st.ball_on = clamp_play_spot(st.ball_on + o.yards)
+        if out.pbp: out.emit(f"{text.sack}: {o.player} sacked for {abs(o.yards)} yards {vs}.")
+        if o.fumble_lost:
+            if out.pbp: out.emit(f"FUMBLE on the sack! {recovers} recovers.")
+            flip_possession(st, to_receiving_spot(st.ball_on), out)
+            finish_snap(st, clock_play_type, False, out); return
+
+    elif o.intercepted:
+        player_stats(st.stats, team, o.player).interceptions_thrown += 1
+        if out.pbp: out.emit(f"{text.label}: {o.player} throws an INTERCEPTION {vs}!")
+        flip_possession(st, to_receiving_spot(st.ball_on), out)
+        finish_snap(st, clock_play_type, False, out); return
+
+    elif o.completed or not is_pass:
+        # Ball carried: a run or a completion. Post-play penalties only apply here.
+        gained = max(0, o.yards) if is_pass else o.yards
+        net_yards, note = gained, ""
+        post_pen = maybe_penalty(st.offense, st.defense, is_pass=is_pass, pre_snap=False, call=o.call)
+        if post_pen and not penalty_accepted(st.down, st.line_to_gain, st.ball_on, gained, post_pen, is_pass):
+            if out.pbp: out.emit(f"Penalty after play: {post_pen.description}, declined.")
+            post_pen = None
+        if post_pen:
+            if out.pbp: out.emit(f"Penalty after play: {post_pen.description}")
+            net_yards, note = apply_post_play_penalty_for_spot_and_note(gained, post_pen, st.offense, st.defense, st.penalty_totals)
+            replay_down = post_pen.enforcement == "previous_spot"
+            if post_pen.automatic_first: after_first_down(st, out)
+
+        reason = (f"Penalty enforced in own end zone{text.suffix} {vs}." if is_pass
+                  else f"{o.player} tackled in own end zone {vs}.")
+        if check_and_award_safety(st, net_yards, reason, out):
+            finish_snap(st, clock_play_type, False, out); return
+
+        gained = cap_gain_to_td(st.ball_on, gained)
+        net_yards = cap_gain_to_td(st.ball_on, max(0, net_yards) if is_pass else net_yards)
+        st.ball_on = clamp_play_spot(st.ball_on + net_yards)
+        if is_pass:
+            player_stats(st.stats, team, o.player).pass_yards += gained
+            if o.receiver:
+                rec = player_stats(st.stats, team, o.receiver)
+                rec.rec_yards += gained
+                rec.receptions += 1
+            if out.pbp: out.emit(f"{text.label}: {o.player} completes to {o.receiver} for {net_yards} yards {vs}{note}.")
+        else:
+            player_stats(st.stats, team, o.player).rush_yards += gained
+            direction = "gains" if net_yards >= 0 else "loses"
+            if out.pbp: out.emit(f"{text.label}: {o.player} {direction} {abs(net_yards)} yards {vs}{note}.")
+
+        if o.fumble_lost:
+            if out.pbp: out.emit(f"FUMBLE after {text.catch}! {recovers} recovers." if is_pass
+                                 else f"FUMBLE! {recovers} recovers.")
+            flip_possession(st, to_receiving_spot(st.ball_on), out)
+            finish_snap(st, clock_play_type, False, out); return
+
+        if st.ball_on >= 100:
+            if out.summary: out.emit(f"TOUCHDOWN {team}!")
+            scorer = o.receiver if is_pass else o.player
+            if scorer:
+                player_stats(st.stats, team, scorer).touchdowns += 1
+            if is_pass:
+                player_stats(st.stats, team, o.player).pass_touchdowns += 1
+            score_touchdown(st, st.offense, out)
+            kick_off(st, st.offense, out)
+            finish_snap(st, clock_play_type, False, out); return
+
+    else:
+        if out.pbp: out.emit(f"{text.label}: {o.player} to {o.receiver} is INCOMPLETE {vs}.")
+
+    if not replay_down and st.ball_on < st.line_to_gain and st.down == 4:
+        clock_running = False  # turnover on downs
+    if advance_clock(st, clock_play_type, clock_running, out): return
+    if replay_down and st.ball_on < st.line_to_gain:
+        return
+    next_down(st, out)
+
+def resolve_punt(st: GameState, out: Narrator) -> None:
+    recv_ball_on, desc = punt_result(st.ball_on)
+    if out.pbp: out.emit(desc)
+    flip_possession(st, recv_ball_on, out)
+    advance_clock(st, "kick", False, out)
+
+def resolve_field_goal(st: GameState, out: Narrator) -> None:
+    prob = field_goal_success_prob(st.ball_on)
+    dist = 100 - st.ball_on + 17
+    if out.pbp: out.emit(f"Field goal attempt from {dist} yards (success ~{int(prob*100)}%).")
+    if chance(prob, "field_goal"):
+        if out.summary: out.emit(f"FIELD GOAL is GOOD! {st.offense.name} +3.")
+        st.scoreboard[st.offense.name] += 3
+        if out.summary: print_score(st.scoreboard, out)
+        overtime_score(st, st.offense, out, field_goal=True)
+        kick_off(st, st.offense, out)
+    else:
+        if out.pbp: out.emit("FIELD GOAL is NO GOOD.")
+        flip_possession(st, to_receiving_spot(st.ball_on), out)
+    advance_clock(st, "kick", False, out)
+
+def resolve_spike(st: GameState, out: Narrator) -> None:
+    qb = canonical_name(st.offense.roster["QB"])
+    if out.pbp: out.emit(f"{qb} spikes the ball to stop the clock.")
+    tally_pass(st, 0, completed=False, sacked=False)
+    if advance_clock(st, "spike", False, out): return
+    next_down(st, out)
+
+def resolve_kneel(st: GameState, out: Narrator) -> None:
+    qb = canonical_name(st.offense.roster["QB"])
+    if out.pbp: out.emit(f"{qb} takes a knee.")
+    tally_play(st, -1)
+    player_stats(st.stats, st.offense.name, qb).rush_yards -= 1
+    st.ball_on = clamp_play_spot(st.ball_on - 1)
+    if advance_clock(st, "kneel", True, out, tempo="milk"): return
+    next_down(st, out)
+
+# Non-scrimmage calls: (st, out) handlers.
+SPECIAL_CALLS: Dict[str, Callable[[GameState, Narrator], None]] = {
+    "punt": lambda st, out: resolve_punt(st, out),
+    "fg": lambda st, out: resolve_field_goal(st, out),
+    "spike": lambda st, out: resolve_spike(st, out),
+    "kneel": lambda st, out: resolve_kneel(st, out),
+}
+
+def resolve_snap(st: GameState, call: str, defense_formation: str, out: Narrator,
+                 user_defending: bool = False, pick_target: bool = True) -> None:
+    """
+    Plays one called snap (any PLAY_TYPES or SPECIAL_CALLS entry) against a formation
+    and applies the result to `st`. `user_defending` only changes the narration
+    ("vs your Nickel"); `pick_target=False` leaves the receiver to the play's own
+    sampler instead of the AI's target choice (the user's pass calls).
+    """
+    if st.in_overtime():
+        st.ot_possessions |= 1 if st.offense is st.user_team else 2
+    pt = PLAY_TYPES.get(call)
+    if pt is not None:
+        apply_play(st, sample_play(st, pt, defense_formation, pick_target), defense_formation, out, user_defending)
+        return
+    special = SPECIAL_CALLS.get(call)
+    if special is None:
+        raise ValueError(f"Unknown offensive call: {call!r}")
+    special(st, out)
+
+def register_play_type(pt: PlayType) -> None:
+    """Adds (or replaces) a scrimmage call. New names are appended to OFFENSE_CALLS."""
+    global OFFENSE_CALLS
+    if pt.kind not in ("run", "pass"):
+        raise ValueError(f"PlayType.kind must be 'run' or 'pass', not {pt.kind!r}")
+    check_penalty_rates(PENALTY_TYPES, {**PLAY_TYPES, pt.name: pt})
+    PLAY_TYPES[pt.name] = pt
+    _PENALTY_TABLES.clear()
+    if pt.name not in _CALL_CODE:
+        OFFENSE_CALLS = OFFENSE_CALLS + (pt.name,)
+        _CALL_CODE[pt.name] = len(OFFENSE_CALLS) - 1
+
+def offense_tendencies(st: GameState) -> Tendencies:
+    return st.tendencies_user if st.offense is st.user_team else st.tendencies_cpu
+
+def ai_snap(st: GameState, out: Narrator, call: Optional[str] = None) -> None:
+    """One snap with the AI on both sides of the ball (optionally forcing the offensive call)."""
+    tendencies = offense_tendencies(st)
+    margin = st.scoreboard[st.offense.name] - st.scoreboard[st.defense.name]
+    defense_formation = ai_choose_defense(st.ball_on, st.distance_to_first(), st.down, st.seconds_left,
+                                          -margin, tendencies.run_ratio())
+    if call is None:
+        # Same arguments game() passes for the CPU offense
+        call = ai_clock_call(st) or ai_choose_offense(st.distance_to_first(), st.down, st.ball_on,
+                                                      st.seconds_left, -margin, st.quarter)
+    tendencies.push(call)
+    if out.pbp: out.emit(f"{st.offense.name} calls {call} vs {defense_formation}")
+    resolve_snap(st, call, defense_formation, out)
+
+# =========================== What-if Explorer ===========================
+
+WHATIF_TRIALS = 2000
+# The menu plays each call out to the end of the drive only: 1000 continuations
+# of all five calls take about a second on one core, where the game horizon
+# takes tens of seconds.
+WHATIF_MENU_TRIALS = 1000
+WHATIF_MENU_HORIZON = "drive"
+
+@dataclass
+class CallOutcome:
+    """Aggregated continuations for one candidate call, from the view of the team with the ball."""
+    call: str
+    trials: int = 0
+    wins: Optional[float] = None      # ties count half; None when only the drive was played
+    drive_points: Dict[int, int] = field(default_factory=dict)  # net points on the drive -> count
+
+    @property
+    def win_prob(self) -> Optional[float]:
+        if self.wins is None or not self.trials:
+            return None
+        return self.wins / self.trials
+
+    @property
+    def mean_drive_points(self) -> float:
+        if not self.trials:
+            return 0.0
+        return sum(pts * n for pts, n in self.drive_points.items()) / self.trials
+
+    def merge(self, other: "CallOutcome") -> None:
+        self.trials += other.trials
+        if self.wins is not None and other.wins is not None:
+            self.wins += other.wins
+        for pts, n in other.drive_points.items():
+            self.drive_points[pts] = self.drive_points.get(pts, 0) + n
+
+_QUIET = silent_narrator()
+
+def run_continuation(st: GameState, call: str, horizon: str = "game") -> Tuple[int, Optional[float]]:
+    """
+    Plays `st` forward in place: `call` on this snap, AI for both teams afterwards.
+    Returns (net points on the drive, win credit) for the team that had the ball.
+    The drive ends on a change of possession, the second-half kickoff, or the end of the game.
+    With horizon="drive" play stops there and the win credit is None.
+    """
+    st.user_controlled = False  # the AI plays both sides, timeouts included
+    team, opp = st.offense.name, st.defense.name
+    start_offense, start_half = st.offense, st.halftime_done
+    margin0 = st.scoreboard[team] - st.scoreboard[opp]
+    drive_pts = None
+    ai_snap(st, _QUIET, call)
+    while True:
+        if drive_pts is None and (st.offense is not start_offense or st.halftime_done != start_half or st.game_over()):
+            drive_pts = st.scoreboard[team] - st.scoreboard[opp] - margin0
+            if horizon == "drive":
+                return drive_pts, None
+        if st.game_over():
+            break
+        ai_snap(st, _QUIET)
+    final = st.scoreboard[team] - st.scoreboard[opp]
+    return drive_pts, 1.0 if final > 0 else (0.5 if final == 0 else 0.0)
+
+def _explore_chunk(state_bytes: bytes, call: str, trials: int, seed: str, horizon: str) -> CallOutcome:
+    base = GameState.from_bytes(state_bytes)
+    base.stats = {}  # box scores never feed back into play outcomes
+    random.seed(seed)
+    res = CallOutcome(call, wins=0.0 if horizon == "game" else None)
+    hist = res.drive_points
+    wins = 0.0
+    for _ in range(trials):
+        pts, win = run_continuation(base.copy(), call, horizon)
+        hist[pts] = hist.get(pts, 0) + 1
+        if win is not None:
+            wins += win
+    res.trials = trials
+    if res.wins is not None:
+        res.wins = wins
+    return res
+
+def explore_calls(state: GameState, calls: Optional[List[str]] = None, k: int = WHATIF_TRIALS,
+                  seed=None, workers: Optional[int] = None, horizon: str = "game") -> Dict[str, CallOutcome]:
+    """
+    Forks `k` continuations of `state` for each candidate call and returns their outcome
+    distributions. Chunks run in worker processes, each with its own RNG stream; chunk i
+    uses the same seed for every call (common random numbers) so the choices are compared
+    on matched luck. The caller's global RNG state is left untouched.
+    """
+    if horizon not in ("game", "drive"):
+        raise ValueError(f"horizon must be 'game' or 'drive', not {horizon!r}")
+    calls = list(calls) if calls is not None else list(OFFENSE_CALLS)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    base = state.copy()
+    base.rng_state = None
+    data = base.to_bytes()
+    n_chunks = max(1, min(k, workers * 4))
+    sizes = [k // n_chunks + (1 if i < k % n_chunks else 0) for i in range(n_chunks)]
+    jobs = [(data, call, n, f"{seed}/{i}", horizon) for call in calls for i, n in enumerate(sizes)]
+
+    results = {call: CallOutcome(call, wins=0.0 if horizon == "game" else None) for call in calls}
+    if workers <= 1:
+        saved = random.getstate()
+        try:
+            chunks = [_explore_chunk(*job) for job in jobs]
+        finally:
+            random.setstate(saved)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_explore_chunk, *zip(*jobs)))
+    for chunk in chunks:
+        results[chunk.call].merge(chunk)
+    return results
+
+def print_whatif(results: Dict[str, CallOutcome], horizon: str = "game") -> None:
+    k = max((res.trials for res in results.values()), default=0)
+    print(f"\n=== What-if (AI plays out the {horizon}, k={k} per call) ===")
+    for call, res in results.items():
+        wp = res.win_prob
+        wp_txt = f"win {wp * 100:5.1f}%" if wp is not None else "win   n/a"
+        print(f"{call:5s} | {wp_txt} | drive pts {res.mean_drive_points:+.2f} | n={res.trials}")
+    print("=" * 22 + "\n")
+
+# =========================== Game Loop ===========================
+
+def run_menu_command(st: GameState, selection: str, team: Team, out: Narrator, menus: bool = True) -> bool:
+    """Handles a non-play menu answer for `team`. Returns True when the player quits."""
+    if selection == "timeout":
+        call_timeout(st, team, out)
+    elif not menus:
+        pass  # display-only commands have no effect on the game; skipped on replay
+    elif selection == "stats":
+        print_stats(st.stats, st.penalty_totals)
+    elif selection == "score":
+        print_score(st.scoreboard)
+    elif selection == "clock":
+        print(f"{period_label(st.quarter)} — {mmss(st.seconds_left)}")
+    elif selection == "save":
+        save_game(st)
+    elif selection == "whatif":
+        print_whatif(explore_calls(st, k=WHATIF_MENU_TRIALS, horizon=WHATIF_MENU_HORIZON), WHATIF_MENU_HORIZON)
+    elif selection == "quit":
+        print("\nThanks for playing!")
+        print_score(st.scoreboard)
+        print_stats(st.stats, st.penalty_totals)
+    return selection == "quit"
+
+def game(narrator: Optional[Narrator] = None, state: Optional[GameState] = None, seed: Optional[int] = None,
+         ask: Optional[Callable[[str], str]] = None, menus: bool = True,
+         overtime: Optional[str] = "regular") -> GameState:
+    """
+    Interactive game. Menus and prompts print (unless `menus` is False); everything
+    the engine narrates goes through `narrator` (play-by-play to stdout by default).
+    Pass a saved `state` (see save_game/load_game) to resume mid-game.
+    `seed` fixes the RNG stream and `ask` replaces input(), which together make a
+    game reproducible (see record_game/replay_game). `overtime` picks the OVERTIME_RULES
+    for a new game (None: ties stand). Returns the final GameState.
+    """
+    out = narrator if narrator is not None else Narrator()
+    ask = ask if ask is not None else input
+    show = print if menus else _mute
+    if state is not None:
+        st = state
+        if st.rng_state is not None:
+            st.restore_rng()
+        else:
+            random.seed(seed)
+        show("Welcome back to the Football Simulator. Resuming your saved game.\n")
+    else:
+        random.seed(seed)
+        show("Welcome to the Football Simulator. Good Luck!\n")
+        user_team = select_team(TEAMS, "Select YOUR TEAM:", ask, show)
+        cpu_team = select_team(TEAMS, "Select the COMPUTER TEAM:", ask, show)
+
+        show("\nWho receives the opening kickoff?")
+        show("1. Your team")
+        show("2. Computer team")
+        user_receives = (ask("Enter 1 or 2: ").strip() == "1")
+
+        st = GameState.new(user_team, cpu_team, user_receives, overtime)
+        if out.pbp: out.emit("\nKickoff!")
+        kick_off(st, st.defense, out)
+        if out.pbp: out.emit(f"Quarter {st.quarter} — {mmss(st.seconds_left)}")
+    st.user_controlled = True
+    user_team, cpu_team = st.user_team, st.cpu_team
 
     # ========== Main Game Loop ==========
-    while quarter <= QUARTERS and seconds_left > 0:
-        situation()
-        user_is_offense = (offense is user_team)
+    while not st.game_over():
+        situation(st, out)
+        user_is_offense = (st.offense is user_team)
 
         if user_is_offense:
-            selection = user_offense_choice()
-            if selection in ["stats", "score", "clock", "timeout", "quit"]:
-                if selection == "stats": print_stats(stats, penalty_totals); continue
-                if selection == "score": print_score(scoreboard); continue
-                if selection == "clock": print(f"Quarter {quarter} — {mmss(seconds_left)}"); continue
-                if selection == "timeout": call_timeout(offense); continue
-                if selection == "quit": print("\nThanks for playing!"); print_score(scoreboard); print_stats(stats, penalty_totals); return
-
-            pre_pen = maybe_penalty(offense, defense, is_pass=(selection in ("pass","deep")))
-            if pre_pen and pre_pen.pre_snap:
-                enforce_penalty_pre(pre_pen)
-                continue
-
-            defense_formation = ai_choose_defense(
-                ball_on, distance_to_first(), down, seconds_left,
-                scoreboard[defense.name] - scoreboard[offense.name],
-                tendencies_user.run_ratio()
-            )
-            print(f"Computer defense shows: {defense_formation}")
-
-            clock_play_type = "run"; clock_completed = True
-
-            if selection == "run":
-                tendencies_user.push("run")
-                runner, play_yards, _, fumble_lost = simulate_run(offense, defense_formation)
-                post_pen = maybe_penalty(offense, defense, is_pass=False)
-                note = ""
-                net_yards = play_yards
-                if post_pen and not post_pen.pre_snap:
-                    print(f"Penalty after play: {post_pen.description}")
-                    net_yards, note = apply_post_play_penalty_for_spot_and_note(play_yards, post_pen, offense, defense, penalty_totals)
-                    if post_pen.automatic_first: after_first_down()
-
-                # SAFETY check (run)
-                if check_and_award_safety(net_yards, f"{canonical_name(runner)} tackled in own end zone vs {defense_formation}."):
-                    if consume_clock(clock_play_type, clock_completed): continue
-                    ai_maybe_timeout(); continue
-
-                play_yards = cap_gain_to_td(ball_on, play_yards)
-                net_yards = cap_gain_to_td(ball_on, net_yards)
-                ball_on = clamp_play_spot(ball_on + net_yards)
-                update_run_stats(stats, offense.name, runner, play_yards, False)
-                direction = "gains" if net_yards >= 0 else "loses"
-                print(f"RUN: {canonical_name(runner)} {direction} {abs(net_yards)} yards vs {defense_formation}{note}.")
-                clock_play_type, clock_completed = "run", True
-
-                if fumble_lost:
-                    print("FUMBLE! Defense recovers.")
-                    flip_possession(to_receiving_spot(ball_on))
-                    if consume_clock(clock_play_type, clock_completed): continue
-                    ai_maybe_timeout(); continue
-
-                if ball_on >= 100:
-                    print(f"TOUCHDOWN {offense.name}!")
-                    ensure_player(stats, offense.name, runner)
-                    stats[offense.name][canonical_name(runner)].touchdowns += 1
-                    scoreboard[offense.name] += 7
-                    print_score(scoreboard)
-                    offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                    consume_clock(clock_play_type, clock_completed)
-                    ai_maybe_timeout(); continue
-
-            elif selection == "pass":
-                tendencies_user.push("pass")
-                qb, receiver, play_yards, completed, intercepted, sacked, fumble_lost = simulate_pass(offense, defense_formation, None)
-                clock_play_type, clock_completed = "pass", completed
-                note = ""
-
-                if sacked:
-                    # SAFETY check (sack)
-                    if check_and_award_safety(play_yards, f"Sack in the end zone vs {defense_formation}."):
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                    ball_on = clamp_play_spot(ball_on + play_yards)
-                    print(f"SACK: {canonical_name(qb)} sacked for {abs(play_yards)} yards vs {defense_formation}.")
-                    if fumble_lost:
-                        print("FUMBLE on the sack! Defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                elif intercepted:
-                    ensure_player(stats, offense.name, qb)
-                    stats[offense.name][canonical_name(qb)].interceptions_thrown += 1
-                    print(f"PASS: {canonical_name(qb)} throws an INTERCEPTION vs {defense_formation}!")
-                    flip_possession(to_receiving_spot(ball_on))
-                    if consume_clock(clock_play_type, False): continue
-                    ai_maybe_timeout(); continue
-
-                elif completed:
-                    post_pen = maybe_penalty(offense, defense, is_pass=True)
-                    net_yards = max(0, play_yards)
-                    if post_pen and not post_pen.pre_snap:
-                        print(f"Penalty after play: {post_pen.description}")
-                        net_yards, note = apply_post_play_penalty_for_spot_and_note(net_yards, post_pen, offense, defense, penalty_totals)
-                        if post_pen.automatic_first: after_first_down()
-
-                    # SAFETY check (post-play penalty could create safety)
-                    if check_and_award_safety(net_yards, f"Penalty enforced in own end zone vs {defense_formation}."):
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-
-                    play_yards = cap_gain_to_td(ball_on, max(0, play_yards))
-                    net_yards = cap_gain_to_td(ball_on, max(0, net_yards))
-                    ball_on = clamp_play_spot(ball_on + net_yards)
-                    update_pass_stats(stats, offense.name, qb, receiver, play_yards, True, False, False)
-                    print(f"PASS: {canonical_name(qb)} completes to {canonical_name(receiver)} for {net_yards} yards vs {defense_formation}{note}.")
-                    if fumble_lost:
-                        print("FUMBLE after the catch! Defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-                    if ball_on >= 100:
-                        print(f"TOUCHDOWN {offense.name}!")
-                        if receiver:
-                            ensure_player(stats, offense.name, receiver)
-                            stats[offense.name][canonical_name(receiver)].touchdowns += 1
-                        scoreboard[offense.name] += 7
-                        print_score(scoreboard)
-                        offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                        consume_clock(clock_play_type, True)
-                        ai_maybe_timeout(); continue
-                else:
-                    print(f"PASS: {canonical_name(qb)} to {canonical_name(receiver)} is INCOMPLETE vs {defense_formation}.")
-
-            elif selection == "deep":
-                tendencies_user.push("pass")
-                target = ai_choose_deep_target(offense, defense_formation)
-                qb, receiver, play_yards, completed, intercepted, sacked, fumble_lost = simulate_deep_pass(offense, defense_formation, target)
-                clock_play_type, clock_completed = "pass", completed
-                note = ""
-
-                if sacked:
-                    # SAFETY check (deep sack)
-                    if check_and_award_safety(play_yards, f"Sack in the end zone (deep) vs {defense_formation}."):
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                    net_yards = play_yards
-                    ball_on = clamp_play_spot(ball_on + net_yards)
-                    print(f"SACK (deep): {canonical_name(qb)} sacked for {abs(net_yards)} yards vs {defense_formation}.")
-                    if fumble_lost:
-                        print("FUMBLE on the sack! Defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                elif intercepted:
-                    ensure_player(stats, offense.name, qb)
-                    stats[offense.name][canonical_name(qb)].interceptions_thrown += 1
-                    print(f"DEEP PASS: {canonical_name(qb)} throws an INTERCEPTION vs {defense_formation}!")
-                    flip_possession(to_receiving_spot(ball_on))
-                    if consume_clock(clock_play_type, False): continue
-                    ai_maybe_timeout(); continue
-
-                elif completed:
-                    post_pen = maybe_penalty(offense, defense, is_pass=True)
-                    net_yards = max(0, play_yards)
-                    if post_pen and not post_pen.pre_snap:
-                        print(f"Penalty after play: {post_pen.description}")
-                        net_yards, note = apply_post_play_penalty_for_spot_and_note(net_yards, post_pen, offense, defense, penalty_totals)
-                        if post_pen.automatic_first: after_first_down()
-
-                    # SAFETY check (deep, post-play penalty could force safety)
-                    if check_and_award_safety(net_yards, f"Penalty enforced in own end zone (deep) vs {defense_formation}."):
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-
-                    play_yards = cap_gain_to_td(ball_on, max(0, play_yards))
-                    net_yards = cap_gain_to_td(ball_on, max(0, net_yards))
-                    ball_on = clamp_play_spot(ball_on + net_yards)
-                    update_pass_stats(stats, offense.name, qb, receiver, play_yards, True, False, False)
-                    print(f"DEEP PASS: {canonical_name(qb)} hits {canonical_name(receiver)} for {net_yards} yards vs {defense_formation}{note}.")
-                    if fumble_lost:
-                        print("FUMBLE after the deep catch! Defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-                    if ball_on >= 100:
-                        print(f"TOUCHDOWN {offense.name}!")
-                        if receiver:
-                            ensure_player(stats, offense.name, receiver)
-                            stats[offense.name][canonical_name(receiver)].touchdowns += 1
-                        scoreboard[offense.name] += 7
-                        print_score(scoreboard)
-                        offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                        consume_clock(clock_play_type, True)
-                        ai_maybe_timeout(); continue
-                else:
-                    print(f"DEEP PASS: {canonical_name(qb)} to {canonical_name(receiver)} is INCOMPLETE vs {defense_formation}.")
-
-            elif selection == "punt":
-                recv_ball_on, desc = punt_result(ball_on)
-                print(desc)
-                flip_possession(recv_ball_on)
-                if consume_clock("kick", True): continue
+            selection = user_offense_choice(ask, show)
+            if selection in MENU_COMMANDS:
+                if run_menu_command(st, selection, st.offense, out, menus): return st
                 continue
 
-            elif selection == "fg":
-                prob = field_goal_success_prob(ball_on)
-                dist = 100 - ball_on + 17
-                print(f"Field goal attempt from {dist} yards.")
-                if random.random() < prob:
-                    print(f"FIELD GOAL is GOOD! {offense.name} +3.")
-                    scoreboard[offense.name] += 3
-                    print_score(scoreboard)
-                    offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                else:
-                    print("FIELD GOAL is NO GOOD.")
-                    flip_possession(to_receiving_spot(ball_on))
-                if consume_clock("kick", True): continue
+            pt = PLAY_TYPES.get(selection)
+            pre_pen = maybe_penalty(st.offense, st.defense, is_pass=(pt is not None and pt.kind == "pass"),
+                                    pre_snap=True, call=pt.name if pt is not None else None)
+            if pre_pen:
+                enforce_penalty_pre(st, pre_pen, out)
                 continue
 
-            if consume_clock(clock_play_type, clock_completed): continue
-            ai_maybe_timeout()
+            defense_formation = ai_choose_defense(
+                st.ball_on, st.distance_to_first(), st.down, st.seconds_left,
+                st.scoreboard[st.defense.name] - st.scoreboard[st.offense.name],
+                st.tendencies_user.run_ratio()
+            )
+            if out.pbp: out.emit(f"Computer defense shows: {defense_formation}")
+            if out.debug: out.emit(debug_pass_probs(st.offense.name, defense_formation))
 
-            if ball_on >= line_to_gain:
-                after_first_down()
-            else:
-                if down == 4:
-                    print("Turnover on downs!")
-                    flip_possession(to_receiving_spot(ball_on))
-                else:
-                    down += 1
+            if pt is not None:
+                st.tendencies_user.push(pt.kind)
+            resolve_snap(st, selection, defense_formation, out, pick_target=False)
 
         else:
             # ===== CPU Offense =====
-            selection = user_defense_choice()
-            if selection in ["stats", "score", "clock", "timeout", "quit"]:
-                if selection == "stats": print_stats(stats, penalty_totals); continue
-                if selection == "score": print_score(scoreboard); continue
-                if selection == "clock": print(f"Quarter {quarter} — {mmss(seconds_left)}"); continue
-                if selection == "timeout": call_timeout(defense); continue
-                if selection == "quit": print("\nThanks for playing!"); print_score(scoreboard); print_stats(stats, penalty_totals); return
+            selection = user_defense_choice(ask, show)
+            if selection in MENU_COMMANDS:
+                if run_menu_command(st, selection, st.defense, out, menus): return st
+                continue
 
             defense_formation = selection
-            cpu_call = ai_choose_offense(distance_to_first(), down, ball_on,
-                                         seconds_left,
-                                         scoreboard[offense.name] - scoreboard[defense.name])
-            tendencies_cpu.push(cpu_call)
-            print(f"Computer offense calls: {cpu_call}")
-
-            clock_play_type = "run"; clock_completed = True
-
-            if cpu_call == "run":
-                runner, play_yards, _, fumble_lost = simulate_run(offense, defense_formation)
-                post_pen = maybe_penalty(offense, defense, is_pass=False)
-                note = ""
-                net_yards = play_yards
-                if post_pen and not post_pen.pre_snap:
-                    print(f"Penalty after play: {post_pen.description}")
-                    net_yards, note = apply_post_play_penalty_for_spot_and_note(play_yards, post_pen, offense, defense, penalty_totals)
-                    if post_pen.automatic_first: after_first_down()
-
-                # SAFETY check (CPU run)
-                if check_and_award_safety(net_yards, f"{canonical_name(runner)} tackled in own end zone vs your {defense_formation}."):
-                    if consume_clock(clock_play_type, clock_completed): continue
-                    ai_maybe_timeout(); continue
-
-                play_yards = cap_gain_to_td(ball_on, play_yards)
-                net_yards = cap_gain_to_td(ball_on, net_yards)
-                ball_on = clamp_play_spot(ball_on + net_yards)
-                update_run_stats(stats, offense.name, runner, play_yards, False)
-                direction = "gains" if net_yards >= 0 else "loses"
-                print(f"RUN: {canonical_name(runner)} {direction} {abs(net_yards)} yards vs your {defense_formation}{note}.")
-                clock_play_type, clock_completed = "run", True
-
-                if fumble_lost:
-                    print("FUMBLE! Your defense recovers.")
-                    flip_possession(to_receiving_spot(ball_on))
-                    if consume_clock(clock_play_type, clock_completed): continue
-                    ai_maybe_timeout(); continue
-
-                if ball_on >= 100:
-                    print(f"TOUCHDOWN {offense.name}!")
-                    ensure_player(stats, offense.name, runner)
-                    stats[offense.name][canonical_name(runner)].touchdowns += 1
-                    scoreboard[offense.name] += 7
-                    print_score(scoreboard)
-                    offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                    consume_clock(clock_play_type, clock_completed)
-                    ai_maybe_timeout(); continue
-
-            elif cpu_call == "pass":
-                target = ai_choose_target(offense, defense_formation)
-                qb, receiver, play_yards, completed, intercepted, sacked, fumble_lost = simulate_pass(offense, defense_formation, target)
-                clock_play_type, clock_completed = "pass", completed
-                note = ""
-
-                if sacked:
-                    # SAFETY check (CPU sack)
-                    if check_and_award_safety(play_yards, f"Sack in the end zone vs your {defense_formation}."):
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                    ball_on = clamp_play_spot(ball_on + play_yards)
-                    print(f"SACK: {canonical_name(qb)} sacked for {abs(play_yards)} yards vs your {defense_formation}.")
-                    if fumble_lost:
-                        print("FUMBLE on the sack! Your defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                elif intercepted:
-                    ensure_player(stats, offense.name, qb)
-                    stats[offense.name][canonical_name(qb)].interceptions_thrown += 1
-                    print(f"PASS: {canonical_name(qb)} throws an INTERCEPTION vs your {defense_formation}!")
-                    flip_possession(to_receiving_spot(ball_on))
-                    if consume_clock(clock_play_type, False): continue
-                    ai_maybe_timeout(); continue
-
-                elif completed:
-                    post_pen = maybe_penalty(offense, defense, is_pass=True)
-                    net_yards = max(0, play_yards)
-                    if post_pen and not post_pen.pre_snap:
-                        print(f"Penalty after play: {post_pen.description}")
-                        net_yards, note = apply_post_play_penalty_for_spot_and_note(net_yards, post_pen, offense, defense, penalty_totals)
-                        if post_pen.automatic_first: after_first_down()
-
-                    # SAFETY check (CPU pass + penalty)
-                    if check_and_award_safety(net_yards, f"Penalty enforced in own end zone vs your {defense_formation}."):
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-
-                    play_yards = cap_gain_to_td(ball_on, max(0, play_yards))
-                    net_yards = cap_gain_to_td(ball_on, max(0, net_yards))
-                    ball_on = clamp_play_spot(ball_on + net_yards)
-                    update_pass_stats(stats, offense.name, qb, receiver, play_yards, True, False, False)
-                    print(f"PASS: {canonical_name(qb)} completes to {canonical_name(receiver)} for {net_yards} yards vs your {defense_formation}{note}.")
-                    if fumble_lost:
-                        print("FUMBLE after the catch! Your defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-                    if ball_on >= 100:
-                        print(f"TOUCHDOWN {offense.name}!")
-                        if receiver:
-                            ensure_player(stats, offense.name, receiver)
-                            stats[offense.name][canonical_name(receiver)].touchdowns += 1
-                        scoreboard[offense.name] += 7
-                        print_score(scoreboard)
-                        offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                        consume_clock(clock_play_type, True)
-                        ai_maybe_timeout(); continue
-                else:
-                    print(f"PASS: {canonical_name(qb)} to {canonical_name(receiver)} is INCOMPLETE vs your {defense_formation}.")
-
-            elif cpu_call == "deep":
-                target = ai_choose_deep_target(offense, defense_formation)
-                qb, receiver, play_yards, completed, intercepted, sacked, fumble_lost = simulate_deep_pass(offense, defense_formation, target)
-                clock_play_type, clock_completed = "pass", completed
-                note = ""
-
-                if sacked:
-                    # SAFETY check (CPU deep sack)
-                    if check_and_award_safety(play_yards, f"Sack in the end zone (deep) vs your {defense_formation}."):
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                    net_yards = play_yards
-                    ball_on = clamp_play_spot(ball_on + net_yards)
-                    print(f"SACK (deep): {canonical_name(qb)} sacked for {abs(net_yards)} yards vs your {defense_formation}.")
-                    if fumble_lost:
-                        print("FUMBLE on the sack! Your defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, False): continue
-                        ai_maybe_timeout(); continue
-
-                elif intercepted:
-                    ensure_player(stats, offense.name, qb)
-                    stats[offense.name][canonical_name(qb)].interceptions_thrown += 1
-                    print(f"DEEP PASS: {canonical_name(qb)} throws an INTERCEPTION vs your {defense_formation}!")
-                    flip_possession(to_receiving_spot(ball_on))
-                    if consume_clock(clock_play_type, False): continue
-                    ai_maybe_timeout(); continue
-
-                elif completed:
-                    post_pen = maybe_penalty(offense, defense, is_pass=True)
-                    net_yards = max(0, play_yards)
-                    if post_pen and not post_pen.pre_snap:
-                        print(f"Penalty after play: {post_pen.description}")
-                        net_yards, note = apply_post_play_penalty_for_spot_and_note(net_yards, post_pen, offense, defense, penalty_totals)
-                        if post_pen.automatic_first: after_first_down()
-
-                    # SAFETY check (CPU deep pass + penalty)
-                    if check_and_award_safety(net_yards, f"Penalty enforced in own end zone (deep) vs your {defense_formation}."):
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-
-                    play_yards = cap_gain_to_td(ball_on, max(0, play_yards))
-                    net_yards = cap_gain_to_td(ball_on, max(0, net_yards))
-                    ball_on = clamp_play_spot(ball_on + net_yards)
-                    update_pass_stats(stats, offense.name, qb, receiver, play_yards, True, False, False)
-                    print(f"DEEP PASS: {canonical_name(qb)} completes to {canonical_name(receiver)} for {net_yards} yards vs your {defense_formation}{note}.")
-                    if fumble_lost:
-                        print("FUMBLE after the deep catch! Your defense recovers.")
-                        flip_possession(to_receiving_spot(ball_on))
-                        if consume_clock(clock_play_type, True): continue
-                        ai_maybe_timeout(); continue
-                    if ball_on >= 100:
-                        print(f"TOUCHDOWN {offense.name}!")
-                        if receiver:
-                            ensure_player(stats, offense.name, receiver)
-                            stats[offense.name][canonical_name(receiver)].touchdowns += 1
-                        scoreboard[offense.name] += 7
-                        print_score(scoreboard)
-                        offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                        consume_clock(clock_play_type, True)
-                        ai_maybe_timeout(); continue
-
-                else:
-                    print(f"DEEP PASS: {canonical_name(qb)} to {canonical_name(receiver)} is INCOMPLETE vs your {defense_formation}.")
-
-            elif cpu_call == "punt":
-                recv_ball_on, desc = punt_result(ball_on)
-                print(desc)
-                flip_possession(recv_ball_on)
-                if consume_clock("kick", True): continue
-                continue
+            cpu_call = ai_clock_call(st) or ai_choose_offense(
+                st.distance_to_first(), st.down, st.ball_on, st.seconds_left,
+                st.scoreboard[st.defense.name] - st.scoreboard[st.offense.name], st.quarter)
+            st.tendencies_cpu.push(cpu_call)
+            if out.pbp: out.emit(f"Computer offense calls: {cpu_call}")
+            if out.debug: out.emit(debug_pass_probs(st.offense.name, defense_formation))
+
+            resolve_snap(st, cpu_call, defense_formation, out, user_defending=True)
+
+    if out.summary:
+        out.emit(f"\n=== Game Over (End of {'overtime' if st.in_overtime() else '4th'}) ===")
+        print_score(st.scoreboard, out)
+        print_stats(st.stats, st.penalty_totals, out)
+        if st.scoreboard[user_team.name] > st.scoreboard[cpu_team.name]:
+            out.emit(f"{user_team.name} win! Congratulations on the victory!")
+        elif st.scoreboard[user_team.name] < st.scoreboard[cpu_team.name]:
+            out.emit(f"{cpu_team.name} win! Better luck next time.")
+        else:
+            out.emit("It's a tie.")
+    return st
 
-            elif cpu_call == "fg":
-                prob = field_goal_success_prob(ball_on)
-                dist = 100 - ball_on + 17
-                print(f"Field goal attempt from {dist} yards (success ~{int(prob*100)}%).")
-                if random.random() < prob:
-                    print(f"FIELD GOAL is GOOD! {offense.name} +3.")
-                    scoreboard[offense.name] += 3
-                    print_score(scoreboard)
-                    offense, defense, ball_on, line_to_gain, down = kickoff_to(defense)
-                else:
-                    print("FIELD GOAL is NO GOOD.")
-                    flip_possession(to_receiving_spot(ball_on))
-                if consume_clock("kick", True): continue
-                continue
+# =========================== Headless Simulation ===========================
+
+def simulate_game(user_team: Team, cpu_team: Team, seed=None, narrator: Optional[Narrator] = None,
+                  user_receives: Optional[bool] = None, overtime: Optional[str] = "regular") -> GameState:
+    """
+    Plays a full game with the AI calling both sides. With a seed the whole game
+    (including who receives, if not given) is reproducible. Silent by default.
+    Ties go to `overtime` (an OVERTIME_RULES key, or None to let them stand).
+    """
+    out = narrator if narrator is not None else _QUIET
+    random.seed(seed)
+    if user_receives is None:
+        user_receives = random.random() < 0.5
+    st = GameState.new(user_team, cpu_team, user_receives, overtime)
+    if out.pbp: out.emit("\nKickoff!")
+    kick_off(st, st.defense, out)
+    while not st.game_over():
+        ai_snap(st, out)
+    if out.summary:
+        out.emit("\n=== Final ===")
+        print_score(st.scoreboard, out)
+        print_stats(st.stats, st.penalty_totals, out)
+    return st
+
+# =========================== Profiling ===========================
+# Opt-in: while a PhaseProfiler is enabled, the functions listed in PROFILE_PHASES
+# are swapped for timed wrappers in this module's namespace (every call site looks
+# them up there). Disabled, the originals are back in place, so the cost is zero.
+
+PROFILE_PHASES: Dict[str, Tuple[str, ...]] = {
+    "input": ("select_team", "user_offense_choice", "user_defense_choice"),
+    "policy": ("ai_choose_offense", "ai_choose_defense", "ai_choose_target", "ai_choose_deep_target", "ai_go_for_two"),
+    "penalty": ("maybe_penalty", "penalty_accepted", "apply_post_play_penalty_for_spot_and_note", "enforce_penalty_pre"),
+    "play": ("sample_play", "punt_result", "sample_kickoff", "sample_pat", "sample_two_point",
+             "field_goal_success_prob", "safety_free_kick_result"),
+    "stats": ("update_run_stats", "update_pass_stats", "ensure_player", "player_stats", "tally_play", "tally_pass"),
+    "clock": ("advance_clock", "ai_maybe_timeout", "ai_clock_call", "call_timeout"),
+    "narration": ("print_score", "print_stats", "Narrator.emit"),
+}
+PROFILE_ROOT = "game"
+
+class PhaseProfiler:
+    """
+    Records call counts and time per phase, keyed by the stack of phases that were
+    active (a field-goal probability looked up by the AI is "policy;play").
+
+        with PhaseProfiler() as prof:
+            simulate_game(TEAMS[0], TEAMS[1], seed=1)
+        prof.write_json("profile.json"); prof.write_collapsed("profile.folded")
+    """
+    _active: Optional["PhaseProfiler"] = None
+
+    def __init__(self, phases: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self.phases = phases if phases is not None else PROFILE_PHASES
+        self.calls: Dict[Tuple[str, ...], int] = {}
+        self.inclusive_ns: Dict[Tuple[str, ...], int] = {}
+        self.wall_ns = 0
+        self._stack: List[str] = [PROFILE_ROOT]
+        self._saved: List[Tuple[object, str, object]] = []
+        self._started = 0
+
+    def _wrap(self, phase: str, fn: Callable) -> Callable:
+        stack, calls, inclusive, clock = self._stack, self.calls, self.inclusive_ns, time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            if stack[-1] == phase:  # already inside this phase (e.g. ensure_player in update_run_stats)
+                return fn(*args, **kwargs)
+            stack.append(phase)
+            key = tuple(stack)
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                dt = clock() - t0
+                stack.pop()
+                calls[key] = calls.get(key, 0) + 1
+                inclusive[key] = inclusive.get(key, 0) + dt
+        timed.__wrapped__ = fn
+        return timed
+
+    def enable(self) -> None:
+        if PhaseProfiler._active is not None:
+            raise RuntimeError("A PhaseProfiler is already enabled")
+        module = sys.modules[__name__]
+        for phase, names in self.phases.items():
+            for name in names:
+                owner, _, attr = name.rpartition(".")
+                target = getattr(module, owner) if owner else module
+                original = getattr(target, attr)
+                self._saved.append((target, attr, original))
+                setattr(target, attr, self._wrap(phase, original))
+        PhaseProfiler._active = self
+        self._started = time.perf_counter_ns()
+
+    def disable(self) -> None:
+        if PhaseProfiler._active is not self:
+            return
+        self.wall_ns += time.perf_counter_ns() - self._started
+        for target, attr, original in reversed(self._saved):
+            setattr(target, attr, original)
+        self._saved.clear()
+        PhaseProfiler._active = None
+
+    def __enter__(self) -> "PhaseProfiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disable()
+
+    def self_ns(self) -> Dict[Tuple[str, ...], int]:
+        """Time spent in each stack excluding nested phases; the root gets everything unattributed."""
+        own = dict(self.inclusive_ns)
+        for key, ns in self.inclusive_ns.items():
+            parent = key[:-1]
+            if parent in own:
+                own[parent] -= ns
+        root = (PROFILE_ROOT,)
+        own[root] = self.wall_ns - sum(ns for key, ns in self.inclusive_ns.items() if len(key) == 2)
+        return own
+
+    def report(self) -> dict:
+        phases: Dict[str, Dict[str, int]] = {}
+        for key, ns in self.self_ns().items():
+            row = phases.setdefault(key[-1], {"calls": 0, "self_ns": 0, "total_ns": 0})
+            row["self_ns"] += ns
+        for key, ns in self.inclusive_ns.items():
+            row = phases[key[-1]]
+            row["calls"] += self.calls[key]
+            if key[-1] not in key[:-1]:
+                row["total_ns"] += ns
+        phases[PROFILE_ROOT]["total_ns"] = self.wall_ns
+        return {
+            "wall_ns": self.wall_ns,
+            "phases": phases,
+            "stacks": {";".join(key): {"calls": self.calls.get(key, 0), "self_ns": ns}
+                       for key, ns in self.self_ns().items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), indent=2)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format ("game;policy;play 42"), self time in microseconds."""
+        return "\n".join(f"{';'.join(key)} {ns // 1000}"
+                         for key, ns in sorted(self.self_ns().items()) if ns >= 1000)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed() + "\n")
+
+    def summary(self) -> str:
+        rep = self.report()
+        wall = rep["wall_ns"] or 1
+        lines = [f"{'phase':10s} {'calls':>8s} {'self ms':>9s} {'self %':>7s}"]
+        for phase, row in sorted(rep["phases"].items(), key=lambda kv: -kv[1]["self_ns"]):
+            lines.append(f"{phase:10s} {row['calls']:8d} {row['self_ns'] / 1e6:9.2f} {100 * row['self_ns'] / wall:6.1f}%")
+        return "\n".join(lines)
+
+# =========================== Variance Reduction ===========================
+# Hooks for the variance-reduced runners in montecarlo.py. Like the profiler, they
+# swap names in this module's namespace while enabled and cost nothing otherwise.
+
+@contextmanager
+def draws_from(rng):
+    """
+    Routes every draw the engine makes through `rng`, any object with the parts of
+    the `random` module's interface used here (see AntitheticRandom).
+    """
+    global random
+    saved, random = random, rng
+    try:
+        yield rng
+    finally:
+        random = saved
+
+class AntitheticRandom:
+    """
+    Mirror image of a seeded stream: random() is 1 - u, gauss() is reflected about
+    its mean, randint() about its midpoint, and choice() picks from the other end.
+    A game seeded the same way under draws_from(AntitheticRandom()) starts out as
+    the mirror of the plain game (runs stuffed where they broke, and so on) until
+    the two paths diverge.
+    """
+    SystemRandom = random.SystemRandom
+    choices = random.Random.choices  # only draws through self.random()
+
+    def __init__(self, seed=None):
+        self._base = random.Random(seed)
+
+    def seed(self, a=None) -> None:
+        self._base.seed(a)
+
+    def getstate(self):
+        return self._base.getstate()
+
+    def setstate(self, state) -> None:
+        self._base.setstate(state)
+
+    def random(self) -> float:
+        u = self._base.random()
+        return 1.0 - u if u else 0.0  # stays in [0, 1)
+
+    def gauss(self, mu: float = 0.0, sigma: float = 1.0) -> float:
+        return 2 * mu - self._base.gauss(mu, sigma)
 
-            if consume_clock(clock_play_type, clock_completed): continue
-            ai_maybe_timeout()
+    def randint(self, a: int, b: int) -> int:
+        return a + b - self._base.randint(a, b)
 
-            if ball_on >= line_to_gain:
-                after_first_down()
+    def choice(self, seq):
+        return seq[len(seq) - 1 - self._base.randrange(len(seq))]
+
+class SnapControl:
+    """
+    Control variates for headless runs. While enabled, sample_play is wrapped so each
+    scrimmage snap adds its yards and turnover (0 or 1) minus the play type's analytic
+    `expected` pair to `residuals[offense name]`. Each term has mean zero given the
+    game so far, so a game's totals have mean zero too and can be regressed out of
+    any game metric.
+
+        with SnapControl() as control:
+            control.reset(); st = simulate_game(...); control.residuals["Packers"]
+    """
+    _active: Optional["SnapControl"] = None
+
+    def __init__(self):
+        self.residuals: Dict[str, List[float]] = {}
+        self._original: Optional[Callable] = None
+
+    def reset(self) -> None:
+        self.residuals = {}
+
+    def enable(self) -> None:
+        global sample_play
+        if SnapControl._active is not None:
+            raise RuntimeError("A SnapControl is already enabled")
+        original = self._original = sample_play
+
+        def controlled(st: GameState, pt: PlayType, defense_formation: str, pick_target: bool = True) -> PlayOutcome:
+            o = original(st, pt, defense_formation, pick_target)
+            if pt.expected is not None:
+                yards, turnover = pt.expected(pt.params(st.offense, defense_formation))
+                row = self.residuals.get(st.offense.name)
+                if row is None:
+                    row = self.residuals[st.offense.name] = [0.0, 0.0]
+                row[0] += o.yards - yards
+                row[1] += (o.intercepted or o.fumble_lost) - turnover
+            return o
+        controlled.__wrapped__ = original
+        sample_play = controlled
+        SnapControl._active = self
+
+    def disable(self) -> None:
+        global sample_play
+        if SnapControl._active is not self:
+            return
+        sample_play = self._original
+        self._original = None
+        SnapControl._active = None
+
+    def __enter__(self) -> "SnapControl":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disable()
+
+# =========================== Importance Sampling ===========================
+# Safeties and long field goals turn on a few draws in rare spots. ImportanceSampler
+# makes those draws likelier (a Tilt per chance()/normal() event) and keeps the
+# likelihood ratio of the game it produced, so weighted counts stay unbiased.
+
+CHANCE_EVENTS = ("sack", "tfl", "field_goal", "touchback")
+NORMAL_EVENTS = ("punt", "kick_return")
+LONG_FIELD_GOAL = 52  # yards; the AI's longest try, made in about one game in twelve
+
+@dataclass(frozen=True)
+class Tilt:
+    """
+    How one event is skewed. chance() events have their probability multiplied by
+    `factor` (up to `cap`, never below the true probability's own cap); normal()
+    events have their mean moved by `shift`. Scrimmage, punt and field goal draws
+    are only tilted when the offense's ball_on is in [min_ball_on, max_ball_on];
+    kickoff draws ("touchback", "kick_return") always are.
+    """
+    factor: float = 1.0
+    shift: float = 0.0
+    min_ball_on: int = 0
+    max_ball_on: int = 100
+    cap: float = 0.9
+
+# Nine in ten safeties are sacks in the end zone, nearly all from inside the 8.
+# Tilting more snaps, or field position, inflates the weights faster than the hits.
+SAFETY_TILTS: Dict[str, Tilt] = {
+    "sack": Tilt(factor=3.0, max_ball_on=8),
+    "tfl": Tilt(factor=2.0, max_ball_on=4),
+}
+# The AI decides when to try from LONG_FIELD_GOAL out; only the make is tilted (55% -> 88%).
+LONG_FIELD_GOAL_TILTS: Dict[str, Tilt] = {
+    "field_goal": Tilt(factor=1.6, max_ball_on=100 + 17 - LONG_FIELD_GOAL, cap=0.95),
+}
+
+class ImportanceSampler:
+    """
+    While enabled, chance() and normal() draw from the tilted distributions and
+    `log_weight` accumulates log(true / tilted likelihood) of every draw, so a
+    game's `weight` times any indicator of it is an unbiased estimate under the
+    untilted engine. `counts` tallies "safety" and made "long_field_goal" kicks.
+
+        with ImportanceSampler(SAFETY_TILTS) as sampler:
+            sampler.reset(); simulate_game(...); sampler.weight * (sampler.counts["safety"] >= 2)
+    """
+    _active: Optional["ImportanceSampler"] = None
+    _HOOKED = ("chance", "normal", "resolve_snap", "handle_safety", "resolve_field_goal")
+
+    def __init__(self, tilts: Dict[str, Tilt]):
+        unknown = set(tilts) - set(CHANCE_EVENTS) - set(NORMAL_EVENTS)
+        if unknown:
+            raise ValueError(f"Unknown tilted events: {sorted(unknown)}")
+        self.tilts = dict(tilts)
+        self.log_weight = 0.0
+        self.counts: Dict[str, int] = {"safety": 0, "long_field_goal": 0}
+        self._st: Optional[GameState] = None
+        self._originals: Dict[str, Callable] = {}
+
+    def reset(self) -> None:
+        self.log_weight = 0.0
+        self.counts = {"safety": 0, "long_field_goal": 0}
+        self._st = None
+
+    @property
+    def weight(self) -> float:
+        return math.exp(self.log_weight)
+
+    def _tilt(self, event: str) -> Optional[Tilt]:
+        t = self.tilts.get(event)
+        if t is None or event in ("touchback", "kick_return"):
+            return t
+        st = self._st
+        return t if st is not None and t.min_ball_on <= st.ball_on <= t.max_ball_on else None
+
+    def enable(self) -> None:
+        global chance, normal, resolve_snap, handle_safety, resolve_field_goal
+        if ImportanceSampler._active is not None:
+            raise RuntimeError("An ImportanceSampler is already enabled")
+        g = globals()
+        self._originals = {name: g[name] for name in self._HOOKED}
+        original_snap = self._originals["resolve_snap"]
+        original_safety = self._originals["handle_safety"]
+        original_fg = self._originals["resolve_field_goal"]
+
+        def tilted_chance(p: float, event: str) -> bool:
+            t = self._tilt(event)
+            if t is None:
+                return random.random() < p
+            q = clamp(p * t.factor, 0.0, max(t.cap, p))
+            hit = random.random() < q
+            self.log_weight += math.log(p / q) if hit else math.log((1 - p) / (1 - q))
+            return hit
+
+        def tilted_normal(mu: float, sigma: float, event: str) -> float:
+            t = self._tilt(event)
+            if t is None or not t.shift:
+                return random.gauss(mu, sigma)
+            x = random.gauss(mu + t.shift, sigma)
+            self.log_weight += ((x - mu - t.shift) ** 2 - (x - mu) ** 2) / (2 * sigma * sigma)
+            return x
+
+        def tracked_snap(st: GameState, *args, **kwargs) -> None:
+            self._st = st
+            try:
+                original_snap(st, *args, **kwargs)
+            finally:
+                self._st = None
+
+        def counted_safety(st: GameState, reason: str, out: Narrator) -> None:
+            self.counts["safety"] += 1
+            original_safety(st, reason, out)
+
+        def counted_field_goal(st: GameState, out: Narrator) -> None:
+            kicker, points = st.offense.name, st.scoreboard[st.offense.name]
+            long_kick = 100 - st.ball_on + 17 >= LONG_FIELD_GOAL
+            original_fg(st, out)
+            if long_kick and st.scoreboard[kicker] > points:
+                self.counts["long_field_goal"] += 1
+
+        chance, normal = tilted_chance, tilted_normal
+        resolve_snap, handle_safety, resolve_field_goal = tracked_snap, counted_safety, counted_field_goal
+        ImportanceSampler._active = self
+
+    def disable(self) -> None:
+        if ImportanceSampler._active is not self:
+            return
+        globals().update(self._originals)
+        self._originals = {}
+        self._st = None
+        ImportanceSampler._active = None
+
+    def __enter__(self) -> "ImportanceSampler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.disable()
+
+# =========================== Record & Replay ===========================
+# A game is fully determined by (seed, engine version, the user's answers): the
+# AI's decisions are re-derived from the seed, so they are not stored. Bump
+# ENGINE_VERSION whenever a change alters the sequence of random draws (or the
+# state encoding the checksum covers).
+
+ENGINE_VERSION = "1.8"
+
+RECORD_INTERACTIVE = 0
+RECORD_SIMULATED = 1
+
+_RECORD_MAGIC = b"FSGR"
+_RECORD_FORMAT_VERSION = 1
+_RECORD_HEADER = struct.Struct("<4sBBQ?IB")
+# Common answers are stored as one byte; anything else as 0xFF, length, UTF-8.
+# Append-only: reordering would change the meaning of archived records.
+_DECISION_TOKENS = tuple(str(i) for i in range(1, 33)) + (
+    "run", "pass", "deep", "punt", "fg", "stats", "score", "clock", "timeout", "save", "whatif", "quit",
+    "screen", "playaction", "sneak", "draw", "spike", "kneel",
+)
+_DECISION_CODE = {t: i for i, t in enumerate(_DECISION_TOKENS)}
+
+@dataclass
+class GameRecord:
+    seed: int
+    engine_version: str = ENGINE_VERSION
+    decisions: List[str] = field(default_factory=list)
+    mode: int = RECORD_INTERACTIVE
+    checksum: Optional[int] = None   # crc32 of the final GameState, verified on replay
+
+    def to_bytes(self) -> bytes:
+        version = self.engine_version.encode("utf-8")
+        parts = [_RECORD_HEADER.pack(_RECORD_MAGIC, _RECORD_FORMAT_VERSION, self.mode, self.seed,
+                                     self.checksum is not None, self.checksum or 0, len(version)),
+                 version, struct.pack("<I", len(self.decisions))]
+        for d in self.decisions:
+            code = _DECISION_CODE.get(d)
+            if code is not None:
+                parts.append(bytes((code,)))
+            else:
+                raw = d.encode("utf-8")[:255]
+                parts.append(bytes((0xFF, len(raw))) + raw)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "GameRecord":
+        magic, fmt, mode, seed, has_crc, crc, vlen = _RECORD_HEADER.unpack_from(data, 0)
+        if magic != _RECORD_MAGIC or fmt != _RECORD_FORMAT_VERSION:
+            raise ValueError("Not a footballsim game record")
+        offset = _RECORD_HEADER.size
+        version = data[offset:offset + vlen].decode("utf-8")
+        offset += vlen
+        (n,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        decisions = []
+        for _ in range(n):
+            code = data[offset]
+            if code == 0xFF:
+                size = data[offset + 1]
+                decisions.append(data[offset + 2:offset + 2 + size].decode("utf-8"))
+                offset += 2 + size
             else:
-                if down == 4:
-                    print("Turnover on downs!")
-                    flip_possession(to_receiving_spot(ball_on))
-                else:
-                    down += 1
-
-    print("\n=== Game Over (End of 4th) ===")
-    print_score(scoreboard)
-    print_stats(stats, penalty_totals)
-    if scoreboard[user_team.name] > scoreboard[cpu_team.name]:
-        print(f"{user_team.name} win! Congratulations on the victory!")
-    elif scoreboard[user_team.name] < scoreboard[cpu_team.name]:
-        print(f"{cpu_team.name} win! Better luck next time.")
+                decisions.append(_DECISION_TOKENS[code])
+                offset += 1
+        return cls(seed=seed, engine_version=version, decisions=decisions, mode=mode,
+                   checksum=crc if has_crc else None)
+
+def state_checksum(st: GameState) -> int:
+    cp = copy.copy(st)
+    cp.rng_state = None
+    return zlib.crc32(cp.to_bytes())
+
+def _fresh_seed() -> int:
+    return random.SystemRandom().getrandbits(64)
+
+def record_game(narrator: Optional[Narrator] = None, seed: Optional[int] = None) -> Tuple[GameState, GameRecord]:
+    """Plays an interactive game while logging every answer; returns the final state and its record."""
+    rec = GameRecord(seed=_fresh_seed() if seed is None else seed)
+
+    def ask(prompt: str) -> str:
+        answer = input(prompt).strip().lower()
+        rec.decisions.append(answer)
+        return answer
+
+    st = game(narrator, seed=rec.seed, ask=ask)
+    rec.checksum = state_checksum(st)
+    return st, rec
+
+def record_simulated_game(user_team: Team, cpu_team: Team, seed: Optional[int] = None,
+                          narrator: Optional[Narrator] = None) -> Tuple[GameState, GameRecord]:
+    rec = GameRecord(seed=_fresh_seed() if seed is None else seed, mode=RECORD_SIMULATED,
+                     decisions=[str(_team_index(user_team) + 1), str(_team_index(cpu_team) + 1)])
+    st = simulate_game(user_team, cpu_team, rec.seed, narrator)
+    rec.checksum = state_checksum(st)
+    return st, rec
+
+def replay_game(rec: GameRecord, narrator: Optional[Narrator] = None) -> GameState:
+    """
+    Re-runs a recorded game and returns its final state; the play-by-play goes to
+    `narrator` (silent by default). Raises ValueError if the record was made by a
+    different engine version or the replay does not reproduce the recorded result.
+    """
+    if rec.engine_version != ENGINE_VERSION:
+        raise ValueError(f"Record is from engine {rec.engine_version}; this is {ENGINE_VERSION}")
+    out = narrator if narrator is not None else _QUIET
+    if rec.mode == RECORD_SIMULATED:
+        user_team, cpu_team = (TEAMS[int(d) - 1] for d in rec.decisions[:2])
+        st = simulate_game(user_team, cpu_team, rec.seed, out)
     else:
-        print("It's a tie.")
+        answers = iter(rec.decisions)
+
+        def ask(prompt: str) -> str:
+            try:
+                return next(answers)
+            except StopIteration:
+                raise ValueError("Decision log ended before the game did") from None
+
+        st = game(out, seed=rec.seed, ask=ask, menus=False)
+    if rec.checksum is not None and state_checksum(st) != rec.checksum:
+        raise ValueError("Replay diverged from the recorded game")
+    return st
 
 if __name__ == "__main__":
-    game()
\ No newline at end of file
+    # `python footballsim.py <savefile>` resumes a saved game
+    if os.environ.get("FOOTBALLSIM_CONFIG"):
+        load_config(os.environ["FOOTBALLSIM_CONFIG"])
+    # FOOTBALLSIM_PROFILE=prefix writes prefix.json and prefix.folded after the game
+    profile_prefix = os.environ.get("FOOTBALLSIM_PROFILE")
+    with PhaseProfiler() if profile_prefix else nullcontext() as prof:
+        game(state=load_game(sys.argv[1]) if len(sys.argv) > 1 else None)
+    if prof is not None:
+        prof.write_json(profile_prefix + ".json")
+        prof.write_collapsed(profile_prefix + ".folded")
+        print(prof.summary())
\ No newline at end of file
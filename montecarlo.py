@@ -0,0 +1,381 @@
+"""
+Sequential Monte Carlo: simulate a matchup until every metric is precise enough.
+
+A Metric reads one number from each finished game:
+- "win": 1 for a win of `team`, 0.5 for a tie;
+- "points": `team`'s final score;
+- "yards": one PlayerStats field of `player`.
+Each metric has a `target`, the confidence-interval half-width it must reach.
+
+run_sequential() plays seeded games in fixed-size chunks. Each chunk returns
+one projections.RunningStats per metric. Chunks are merged in index order, and
+the run stops at the first chunk after which every interval is narrow enough
+(and at least `min_games` have been played). Win intervals use the Wilson
+score, so a lopsided matchup cannot stop on a spurious zero variance but still
+stops early. With workers, up to `workers` chunks run ahead; chunks past the
+stopping point are dropped, so the result does not depend on the worker count.
+
+run_reduced() estimates one metric from a fixed number of units with optional
+variance reduction: antithetic game pairs, control variates from the engine's
+analytic expected yards and turnovers (footballsim.SnapControl), and
+stratification on who receives the opening kickoff. It reports the effective
+sample-size gain over plain Monte Carlo for the same games.
+
+run_importance() estimates the probability of a rare event (at least N
+safeties, or N made field goals from LONG_FIELD_GOAL yards or more) by playing
+games under a footballsim.ImportanceSampler and averaging the likelihood-ratio
+weights of the games where it happened.
+
+    python montecarlo.py Packers Bears --win 0.02 --points 0.5
+"""
+import argparse
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from itertools import islice
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import footballsim as fs
+import projections
+import sweep
+
+DEFAULT_CONFIDENCE = 0.95
+CHUNK_GAMES = 32
+MIN_GAMES = 64
+MAX_GAMES = 20000
+METRIC_KINDS = ("win", "points", "yards")
+N_CONTROLS = 4  # SnapControl's yards and turnover residuals, home team then away team
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    kind: str                  # one of METRIC_KINDS
+    team: str
+    target: float              # confidence-interval half-width to reach
+    player: str = ""           # "yards" only
+    stat: str = "rush_yards"   # "yards" only: a PlayerStats field
+
+    def __post_init__(self):
+        if self.kind not in METRIC_KINDS:
+            raise ValueError(f"Unknown metric kind {self.kind!r}; expected one of {METRIC_KINDS}")
+        if self.target <= 0:
+            raise ValueError(f"target must be positive, got {self.target}")
+        if self.kind == "yards" and self.stat not in projections.STAT_FIELDS:
+            raise ValueError(f"Unknown PlayerStats field {self.stat!r}")
+
+    def value(self, st: fs.GameState) -> float:
+        if self.kind == "points":
+            return st.scoreboard[self.team]
+        if self.kind == "win":
+            mine = st.scoreboard[self.team]
+            other = sum(v for k, v in st.scoreboard.items() if k != self.team)
+            return 1.0 if mine > other else 0.5 if mine == other else 0.0
+        row = fs.coalesce(st.stats.get(self.team, {})).get(fs.canonical_name(self.player))
+        return getattr(row, self.stat) if row is not None else 0
+
+def win_prob(team: str, target: float = 0.02) -> Metric:
+    return Metric(f"{team} win", "win", team, target)
+
+def mean_points(team: str, target: float = 0.5) -> Metric:
+    return Metric(f"{team} points", "points", team, target)
+
+def player_yards(team: str, player: str, stat: str = "rush_yards", target: float = 2.0) -> Metric:
+    return Metric(f"{player} {stat}", "yards", team, target, player, stat)
+
+def half_width(metric: Metric, stats: projections.RunningStats, z: float) -> float:
+    """Confidence-interval half-width for `metric` after `stats.n` games."""
+    n = stats.n
+    if n < 2:
+        return math.inf
+    if metric.kind == "win":
+        p = stats.mean
+        return z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return z * stats.std / math.sqrt(n)
+
+@dataclass
+class SequentialResult:
+    games: int
+    converged: bool
+    estimates: Dict[str, Tuple[float, float]]  # metric name -> (mean, half-width)
+
+def _run_chunk(overrides: sweep.Config, home: int, away: int, metrics: Sequence[Metric], games: range,
+               seed) -> List[projections.RunningStats]:
+    saved = random.getstate()
+    stats = [projections.RunningStats() for _ in metrics]
+    try:
+        with fs.config_overridden(overrides):
+            h, a = fs.TEAMS[home], fs.TEAMS[away]
+            for i in games:
+                st = fs.simulate_game(h, a, seed=f"{seed}/{home}/{away}/{i}")
+                for m, s in zip(metrics, stats):
+                    s.push(m.value(st))
+    finally:
+        random.setstate(saved)
+    return stats
+
+def run_sequential(home: int, away: int, metrics: Sequence[Metric], confidence: float = DEFAULT_CONFIDENCE,
+                   seed=0, workers: Optional[int] = None, chunk: int = CHUNK_GAMES, min_games: int = MIN_GAMES,
+                   max_games: int = MAX_GAMES) -> SequentialResult:
+    """Plays TEAMS[home] hosting TEAMS[away] until every metric's interval is within its target."""
+    if not metrics:
+        raise ValueError("run_sequential needs at least one metric")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    overrides = sweep.effective_overrides({})
+    totals = [projections.RunningStats() for _ in metrics]
+    chunks = (range(lo, min(lo + chunk, max_games)) for lo in range(0, max_games, chunk))
+
+    def done() -> bool:
+        return totals[0].n >= min_games and all(half_width(m, s, z) <= m.target for m, s in zip(metrics, totals))
+
+    def fold(part: List[projections.RunningStats]) -> None:
+        for total, s in zip(totals, part):
+            total.merge(s)
+
+    converged = False
+    if workers <= 1:
+        for games in chunks:
+            fold(_run_chunk(overrides, home, away, metrics, games, seed))
+            if done():
+                converged = True
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            submit = lambda games: pool.submit(_run_chunk, overrides, home, away, metrics, games, seed)
+            pending = deque(submit(games) for games in islice(chunks, workers))
+            while pending:
+                fold(pending.popleft().result())
+                if done():
+                    converged = True
+                    break
+                games = next(chunks, None)
+                if games is not None:
+                    pending.append(submit(games))
+            for f in pending:
+                f.cancel()
+    return SequentialResult(totals[0].n, converged,
+                            {m.name: (s.mean, half_width(m, s, z)) for m, s in zip(metrics, totals)})
+
+# =========================== Variance reduction ===========================
+
+@dataclass
+class ReducedEstimate:
+    games: int
+    mean: float
+    stderr: float
+    plain_stderr: float  # plain Monte Carlo's standard error for the same number of games
+
+    @property
+    def gain(self) -> float:
+        """How many times fewer games than plain Monte Carlo this precision took."""
+        return (self.plain_stderr / self.stderr) ** 2 if self.stderr > 0 else math.inf
+
+    @property
+    def effective_games(self) -> float:
+        return self.games * self.gain
+
+def _run_units(overrides: sweep.Config, home: int, away: int, metric: Metric, units: range, seed,
+               antithetic: bool, control: bool, stratify: bool) -> List[Tuple[int, float, List[float], List[float]]]:
+    """Per unit: (stratum, metric value, control residuals, each game's value)."""
+    saved = random.getstate()
+    h, a = fs.TEAMS[home], fs.TEAMS[away]
+    snaps = fs.SnapControl() if control else None
+    rows = []
+    try:
+        with fs.config_overridden(overrides), (snaps or nullcontext()):
+            for i in units:
+                receives = i % 2 == 0 if stratify else None
+                values, controls = [], [0.0] * N_CONTROLS
+                for draws in ((None, fs.AntitheticRandom()) if antithetic else (None,)):
+                    if snaps:
+                        snaps.reset()
+                    with (fs.draws_from(draws) if draws else nullcontext()):
+                        st = fs.simulate_game(h, a, seed=f"{seed}/{home}/{away}/{i}", user_receives=receives)
+                    values.append(metric.value(st))
+                    if snaps:
+                        game = snaps.residuals.get(h.name, [0.0, 0.0]) + snaps.residuals.get(a.name, [0.0, 0.0])
+                        controls = [c + g for c, g in zip(controls, game)]
+                k = len(values)
+                rows.append((i % 2 if stratify else 0, sum(values) / k, [c / k for c in controls], values))
+    finally:
+        random.setstate(saved)
+    return rows
+
+def _solve(a: List[List[float]], b: List[float]) -> Optional[List[float]]:
+    """Gauss-Jordan with partial pivoting; None when `a` is (nearly) singular."""
+    n = len(b)
+    m = [row[:] + [v] for row, v in zip(a, b)]
+    scale = max((abs(x) for row in a for x in row), default=0.0)
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) <= 1e-12 * scale:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(n):
+            if r != col:
+                f = m[r][col] / m[col][col]
+                for c in range(col, n + 1):
+                    m[r][c] -= f * m[col][c]
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+def _control_coefficients(rows) -> List[float]:
+    """Least-squares slopes of the metric on the control residuals, within strata."""
+    sxx = [[0.0] * N_CONTROLS for _ in range(N_CONTROLS)]
+    sxy = [0.0] * N_CONTROLS
+    groups: Dict[int, list] = {}
+    for r in rows:
+        groups.setdefault(r[0], []).append(r)
+    for group in groups.values():
+        n = len(group)
+        my = sum(r[1] for r in group) / n
+        mx = [sum(r[2][j] for r in group) / n for j in range(N_CONTROLS)]
+        for _, y, xs, _ in group:
+            dx = [x - m for x, m in zip(xs, mx)]
+            for i in range(N_CONTROLS):
+                sxy[i] += dx[i] * (y - my)
+                for j in range(N_CONTROLS):
+                    sxx[i][j] += dx[i] * dx[j]
+    return _solve(sxx, sxy) or [0.0] * N_CONTROLS
+
+def run_reduced(home: int, away: int, metric: Metric, units: int, seed=0, workers: Optional[int] = None,
+                antithetic: bool = False, control: bool = False, stratify: bool = False,
+                chunk: int = CHUNK_GAMES) -> ReducedEstimate:
+    """
+    Estimates `metric` for TEAMS[home] hosting TEAMS[away] from `units` seeded units
+    with any mix of:
+    - antithetic: each unit is a game plus its mirror (AntitheticRandom), averaged;
+    - control: the SnapControl residuals (yards and turnovers for each team),
+      which have mean zero, are regressed out of the metric;
+    - stratify: even units have the home team receive the opening kickoff and odd
+      units the away team, and the two strata are weighted equally.
+    The plain standard error comes from the spread of the individual games, so
+    `gain` is the variance ratio against plain Monte Carlo for the same games.
+    """
+    if units < 4:
+        raise ValueError(f"need at least 4 units, got {units}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    overrides = sweep.effective_overrides({})
+    chunks = [range(lo, min(lo + chunk, units)) for lo in range(0, units, chunk)]
+    args = (home, away, metric)
+    flags = (antithetic, control, stratify)
+    if workers <= 1:
+        parts = [_run_units(overrides, *args, c, seed, *flags) for c in chunks]
+    else:
+        n = len(chunks)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_units, [overrides] * n, [home] * n, [away] * n, [metric] * n, chunks,
+                                  [seed] * n, *([f] * n for f in flags)))
+    rows = [r for part in parts for r in part]
+    beta = _control_coefficients(rows) if control else [0.0] * N_CONTROLS
+    strata: Dict[int, projections.RunningStats] = {}
+    games = projections.RunningStats()
+    for stratum, value, controls, values in rows:
+        adjusted = value - sum(b * c for b, c in zip(beta, controls))
+        strata.setdefault(stratum, projections.RunningStats()).push(adjusted)
+        for v in values:
+            games.push(v)
+    w = 1.0 / len(strata)
+    mean = sum(w * s.mean for s in strata.values())
+    stderr = math.sqrt(sum(w * w * s.variance / s.n for s in strata.values()))
+    return ReducedEstimate(games.n, mean, stderr, games.std / math.sqrt(games.n))
+
+# =========================== Importance sampling ===========================
+
+RARE_EVENTS: Dict[str, Dict[str, fs.Tilt]] = {  # event -> default tilts
+    "safety": fs.SAFETY_TILTS,
+    "long_field_goal": fs.LONG_FIELD_GOAL_TILTS,
+}
+
+@dataclass
+class ImportanceEstimate(ReducedEstimate):
+    hits: int           # tilted games where the event happened
+    weight_ess: float   # Kish effective sample size of the hit weights
+
+def _run_weighted(overrides: sweep.Config, home: int, away: int, event: str, at_least: int,
+                  tilts: Dict[str, fs.Tilt], games: range, seed) -> List[float]:
+    """Each game's likelihood-ratio weight, or 0.0 when the event did not happen."""
+    saved = random.getstate()
+    h, a = fs.TEAMS[home], fs.TEAMS[away]
+    weights = []
+    try:
+        with fs.config_overridden(overrides), fs.ImportanceSampler(tilts) as sampler:
+            for i in games:
+                sampler.reset()
+                fs.simulate_game(h, a, seed=f"{seed}/{home}/{away}/{i}")
+                weights.append(sampler.weight if sampler.counts[event] >= at_least else 0.0)
+    finally:
+        random.setstate(saved)
+    return weights
+
+def run_importance(home: int, away: int, games: int, event: str = "safety", at_least: int = 2,
+                   tilts: Optional[Dict[str, fs.Tilt]] = None, seed=0, workers: Optional[int] = None,
+                   chunk: int = CHUNK_GAMES) -> ImportanceEstimate:
+    """
+    Probability that TEAMS[home] hosting TEAMS[away] has at least `at_least` of
+    `event` (RARE_EVENTS) in a game, from `games` games played under `tilts`
+    (the event's RARE_EVENTS entry by default). `plain_stderr` is the
+    binomial standard error plain Monte Carlo would have at the estimated
+    probability with the same number of games.
+    """
+    if event not in RARE_EVENTS:
+        raise ValueError(f"event must be one of {sorted(RARE_EVENTS)}, got {event!r}")
+    if games < 2:
+        raise ValueError(f"need at least 2 games, got {games}")
+    if tilts is None:
+        tilts = RARE_EVENTS[event]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    overrides = sweep.effective_overrides({})
+    chunks = [range(lo, min(lo + chunk, games)) for lo in range(0, games, chunk)]
+    if workers <= 1:
+        parts = [_run_weighted(overrides, home, away, event, at_least, tilts, c, seed) for c in chunks]
+    else:
+        n = len(chunks)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_run_weighted, [overrides] * n, [home] * n, [away] * n, [event] * n,
+                                  [at_least] * n, [tilts] * n, chunks, [seed] * n))
+    moments = projections.RunningStats()
+    hits, total, squares = 0, 0.0, 0.0
+    for w in (w for part in parts for w in part):
+        moments.push(w)
+        if w:
+            hits, total, squares = hits + 1, total + w, squares + w * w
+    p = fs.clamp(moments.mean, 0.0, 1.0)
+    return ImportanceEstimate(moments.n, moments.mean, moments.std / math.sqrt(moments.n),
+                              math.sqrt(p * (1 - p) / moments.n), hits,
+                              total * total / squares if squares else 0.0)
+
+# =========================== CLI ===========================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    names = sorted(t.name for t in fs.TEAMS)
+    ap = argparse.ArgumentParser(description="Simulate a matchup until every metric reaches its precision.")
+    ap.add_argument("home", choices=names)
+    ap.add_argument("away", choices=names)
+    ap.add_argument("--win", type=float, default=0.02, help="half-width target for the home win probability")
+    ap.add_argument("--points", type=float, default=None, help="half-width target for each team's mean points")
+    ap.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE)
+    ap.add_argument("--max-games", type=int, default=MAX_GAMES)
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    metrics = [win_prob(args.home, args.win)]
+    if args.points is not None:
+        metrics += [mean_points(args.home, args.points), mean_points(args.away, args.points)]
+    index = {t.name: i for i, t in enumerate(fs.TEAMS)}
+    result = run_sequential(index[args.home], index[args.away], metrics, args.confidence, args.seed,
+                            args.workers, max_games=args.max_games)
+    print(f"{result.games} games ({'converged' if result.converged else 'hit --max-games'})")
+    for name, (mean, hw) in result.estimates.items():
+        print(f"{name:24s} {mean:8.3f} ± {hw:.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Fair spread, total and moneyline prices from simulated score distributions.
+
+PricingService.price(home, away) returns a Price built from the simulated
+final scores of that matchup:
+- the fair spread and total (medians of the margin and of the combined score);
+- the home win probability with ties pushing, and the matching American
+  moneylines;
+- how often the game lands exactly on each key number.
+
+Prices are kept in a size-bounded LRU cache keyed by (home, away, config hash).
+The config hash is the sweep.py key of the effective engine config. It is only
+recomputed when footballsim.config_generation() moves, so a cache hit is a dict
+lookup. On a miss, games are simulated in rounds (spread over worker processes
+when `workers` > 1) until the standard error of the home win probability is
+under `target_se`. Every game is seeded by its index and rounds have a fixed
+size, so a price does not depend on the worker count.
+
+At the default target a miss takes 320-450 games (fewer for lopsided
+matchups), about 2-2.5 s of engine time. Used as a context manager the service
+starts its worker pool on entry (warm()), so the first miss does not pay for
+process start-up and a new matchup prices in well under a second on four or
+more workers. Game counts grow as 1 / target_se**2.
+
+    python pricing.py Packers Bears --target-se 0.02
+"""
+import argparse
+import math
+import os
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import footballsim as fs
+import sweep
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_TARGET_SE = 0.025      # on the home win probability; a 60% favorite then prices -135 to -167
+MIN_GAMES = 64
+MAX_GAMES = 4000
+ROUND_GAMES = 64               # after the first MIN_GAMES; split over the workers
+KEY_NUMBERS = (3, 7, 10, 14, 6, 4, 1)
+
+_TEAM_BY_NAME = {t.name: i for i, t in enumerate(fs.TEAMS)}
+
+@dataclass(frozen=True)
+class Price:
+    home: str
+    away: str
+    games: int
+    spread: float                  # home line: negative when the home team is favored
+    total: float
+    home_win_prob: float           # ties push
+    tie_prob: float
+    home_moneyline: int
+    away_moneyline: int
+    key_numbers: Dict[int, float]  # share of games decided by exactly that many points
+    se: float                      # standard error of home_win_prob
+
+def american_odds(p: float) -> int:
+    """Fair American moneyline for win probability `p` (no vig)."""
+    p = fs.clamp(p, 1e-4, 1 - 1e-4)
+    return -round(100 * p / (1 - p)) if p >= 0.5 else round(100 * (1 - p) / p)
+
+def _median(sorted_vals: List[int]) -> float:
+    n = len(sorted_vals)
+    mid = n // 2
+    return float(sorted_vals[mid]) if n % 2 else (sorted_vals[mid - 1] + sorted_vals[mid]) / 2
+
+def _win_se(wins: int, losses: int) -> float:
+    decided = wins + losses
+    if not decided:
+        return math.inf
+    p = wins / decided
+    # Never report zero error from a lopsided sample: floor p(1-p) at one game's worth
+    return math.sqrt(max(p * (1 - p), 1.0 / decided) / decided)
+
+def make_price(home: str, away: str, scores: List[Tuple[int, int]]) -> Price:
+    margins = sorted(h - a for h, a in scores)
+    totals = sorted(h + a for h, a in scores)
+    n = len(scores)
+    wins = sum(1 for m in margins if m > 0)
+    losses = sum(1 for m in margins if m < 0)
+    p = wins / (wins + losses) if wins + losses else 0.5
+    return Price(
+        home=home, away=away, games=n,
+        spread=-_median(margins), total=_median(totals),
+        home_win_prob=p, tie_prob=(n - wins - losses) / n,
+        home_moneyline=american_odds(p), away_moneyline=american_odds(1 - p),
+        key_numbers={k: sum(1 for m in margins if abs(m) == k) / n for k in KEY_NUMBERS},
+        se=_win_se(wins, losses),
+    )
+
+def _ready(_: int) -> int:
+    return len(fs.TEAMS)
+
+def _play_games(overrides: sweep.Config, home: int, away: int, games: range, seed) -> List[Tuple[int, int]]:
+    saved = random.getstate()
+    scores = []
+    try:
+        with fs.config_overridden(overrides):
+            h, a = fs.TEAMS[home], fs.TEAMS[away]
+            for i in games:
+                st = fs.simulate_game(h, a, seed=f"{seed}/{home}/{away}/{i}")
+                scores.append((st.scoreboard[h.name], st.scoreboard[a.name]))
+    finally:
+        random.setstate(saved)
+    return scores
+
+class PricingService:
+    """
+    Prices matchups from the engine, with an LRU cache of `cache_size` prices.
+    Use as a context manager (or call warm() and close()) when `workers` > 1, to
+    start the worker pool up front and shut it down.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE, target_se: float = DEFAULT_TARGET_SE,
+                 workers: Optional[int] = None, seed=0, min_games: int = MIN_GAMES, max_games: int = MAX_GAMES):
+        if cache_size < 1:
+            raise ValueError(f"cache_size must be at least 1, got {cache_size}")
+        self.cache_size, self.target_se, self.seed = cache_size, target_se, seed
+        self.min_games, self.max_games = min_games, max_games
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.cache: "OrderedDict[Tuple[int, int, str], Price]" = OrderedDict()
+        self.hits = self.misses = 0
+        self._generation: Optional[int] = None
+        self._config_key = ""
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "PricingService":
+        self.warm()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def warm(self) -> None:
+        """Starts every worker process now, ahead of the first miss."""
+        if self.workers > 1 and self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            list(self._pool.map(_ready, range(self.workers)))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def config_key(self) -> str:
+        generation = fs.config_generation()
+        if generation != self._generation:
+            self._config_key = sweep.config_key(sweep.effective_overrides({}), self.target_se, f"price/{self.seed}")
+            self._generation = generation
+        return self._config_key
+
+    def price(self, home: str, away: str) -> Price:
+        key = (_TEAM_BY_NAME[home], _TEAM_BY_NAME[away], self.config_key())
+        cache = self.cache
+        hit = cache.get(key)
+        if hit is not None:
+            cache.move_to_end(key)
+            self.hits += 1
+            return hit
+        self.misses += 1
+        price = make_price(home, away, self._simulate(key[0], key[1]))
+        cache[key] = price
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return price
+
+    def _simulate(self, home: int, away: int) -> List[Tuple[int, int]]:
+        """Seeded games in rounds until the win probability's standard error reaches the target."""
+        overrides = sweep.effective_overrides({})
+        scores: List[Tuple[int, int]] = []
+        while len(scores) < self.max_games:
+            n = len(scores)
+            size = min(self.min_games - n if n < self.min_games else ROUND_GAMES,
+                       self.max_games - n)
+            if self.workers <= 1:
+                scores.extend(_play_games(overrides, home, away, range(n, n + size), self.seed))
+            else:
+                self.warm()
+                bounds = [n + size * i // self.workers for i in range(self.workers + 1)]
+                chunks = [range(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+                for part in self._pool.map(_play_games, [overrides] * len(chunks), [home] * len(chunks),
+                                           [away] * len(chunks), chunks, [self.seed] * len(chunks)):
+                    scores.extend(part)
+            wins = sum(1 for h, a in scores if h > a)
+            losses = sum(1 for h, a in scores if h < a)
+            if _win_se(wins, losses) <= self.target_se:
+                break
+        return scores
+
+# =========================== CLI ===========================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Fair spread, total and moneyline for one matchup.")
+    ap.add_argument("home", choices=sorted(_TEAM_BY_NAME))
+    ap.add_argument("away", choices=sorted(_TEAM_BY_NAME))
+    ap.add_argument("--target-se", type=float, default=DEFAULT_TARGET_SE,
+                    help="stop once the home win probability's standard error is below this")
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    with PricingService(target_se=args.target_se, workers=args.workers, seed=args.seed) as service:
+        p = service.price(args.home, args.away)
+    print(f"{p.home} vs {p.away} ({p.games} games, se {p.se:.3f})")
+    print(f"Spread: {p.home} {p.spread:+.1f}   Total: {p.total:.1f}")
+    print(f"Moneyline: {p.home} {p.home_moneyline:+d} / {p.away} {p.away_moneyline:+d} "
+          f"(win {p.home_win_prob * 100:.1f}%, tie {p.tie_prob * 100:.1f}%)")
+    print("Key numbers: " + ", ".join(f"{k}: {v * 100:.1f}%" for k, v in p.key_numbers.items()))
+
+if __name__ == "__main__":
+    main()
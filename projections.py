@@ -0,0 +1,264 @@
+"""
+Streaming per-player stat distributions over many simulated games.
+
+Keeping every PlayerStats row of 100k games costs memory in proportion to the
+games played. Instead, each (team, player, stat) keeps:
+- RunningStats: count, mean and variance, updated one value at a time
+  (Welford) and merged in O(1) (Chan et al.);
+- QuantileSketch: a KLL sketch that holds about 3 * k values however many are
+  pushed, answers quantiles within roughly 1.7 / k rank error, and merges by
+  concatenating its levels.
+
+Both merge cheaply, so every worker process aggregates its own games and the
+parent folds the partial PlayerAggregates together. Raw samples never leave a
+worker. Players on a team's roster who recorded nothing in a game count as a
+zero for that game.
+
+    python projections.py --games 20000 --seed 1
+"""
+import argparse
+import math
+import os
+import random
+import zlib
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import footballsim as fs
+import season
+import sweep
+
+STAT_FIELDS = tuple(f.name for f in fields(fs.PlayerStats))
+SKETCH_K = 200
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+# =========================== Moments ===========================
+
+class RunningStats:
+    """Count, mean and variance of a stream, in O(1) memory."""
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 below two values)."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+# =========================== Quantiles ===========================
+
+class QuantileSketch:
+    """
+    KLL sketch. Level h holds values that each stand for 2**h pushed values; a full
+    level is sorted and every other value (from a coin-flipped offset) moves up.
+    Level capacities shrink by 2/3 going down from the top, so the whole sketch
+    stays near 3 * k values. The coin is a seeded 64-bit LCG, so a sketch fed
+    the same stream gives the same answers.
+    """
+    __slots__ = ("k", "levels", "size", "max_size", "_coin")
+    _DECAY = 2.0 / 3.0
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, k: int = SKETCH_K, seed: int = 0):
+        if k < 8:
+            raise ValueError(f"k must be at least 8, got {k}")
+        self.k, self.levels, self.size, self.max_size = k, [], 0, 0
+        self._coin = seed & self._MASK
+        self._grow()
+
+    def _capacity(self, h: int) -> int:
+        return int(math.ceil(self._DECAY ** (len(self.levels) - h - 1) * self.k)) + 1
+
+    def _grow(self) -> None:
+        self.levels.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _flip(self) -> int:
+        self._coin = (self._coin * 6364136223846793005 + 1442695040888963407) & self._MASK
+        return self._coin >> 63
+
+    def push(self, x: float) -> None:
+        self.levels[0].append(x)
+        self.size += 1
+        if self.size >= self.max_size:
+            self._compress()
+
+    def extend(self, xs: Iterable[float]) -> None:
+        for x in xs:
+            self.push(x)
+
+    def _compress(self) -> None:
+        for h in range(len(self.levels)):
+            level = self.levels[h]
+            if len(level) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self._grow()
+                level.sort()
+                # An odd value out stays behind at this level: the smallest or the largest, by
+                # the coin, so neither end of the range keeps losing weight
+                keep = [level.pop(-self._flip())] if len(level) % 2 else []
+                self.levels[h + 1].extend(level[self._flip()::2])
+                self.levels[h] = keep
+                self.size = sum(len(lv) for lv in self.levels)
+                if self.size < self.max_size:
+                    break
+
+    def merge(self, other: "QuantileSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+        self.size = sum(len(lv) for lv in self.levels)
+        self._coin ^= other._coin
+        while self.size >= self.max_size:
+            self._compress()
+
+    @property
+    def count(self) -> int:
+        """Number of values pushed (compaction keeps the total weight)."""
+        return sum(len(lv) << h for h, lv in enumerate(self.levels))
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Value at each rank fraction in `qs` (nan for an empty sketch)."""
+        weighted = sorted((x, 1 << h) for h, lv in enumerate(self.levels) for x in lv)
+        if not weighted:
+            return [math.nan] * len(qs)
+        cum = list(accumulate(w for _, w in weighted))
+        total = cum[-1]
+        return [weighted[min(bisect_left(cum, q * total), len(weighted) - 1)][0] for q in qs]
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles((q,))[0]
+
+# =========================== Per-player aggregation ===========================
+
+class PlayerAggregate:
+    """RunningStats and a QuantileSketch per (team, player, stat), fed one game at a time."""
+
+    def __init__(self, k: int = SKETCH_K):
+        self.k = k
+        self.games = 0
+        self.players: Dict[Tuple[str, str], Dict[str, Tuple[RunningStats, QuantileSketch]]] = {}
+
+    def _row(self, team: str, player: str) -> Dict[str, Tuple[RunningStats, QuantileSketch]]:
+        row = self.players.get((team, player))
+        if row is None:
+            seed = zlib.crc32(f"{team}/{player}".encode())
+            row = self.players[(team, player)] = {
+                f: (RunningStats(), QuantileSketch(self.k, seed + i)) for i, f in enumerate(STAT_FIELDS)}
+        return row
+
+    def add_game(self, st: fs.GameState) -> None:
+        """Adds every rostered player of both teams, with zeros for players who recorded nothing."""
+        self.games += 1
+        for team in (st.user_team, st.cpu_team):
+            played = fs.coalesce(st.stats.get(team.name, {}))
+            names = dict.fromkeys(fs.canonical_name(p) for p in team.roster.values())
+            names.update(dict.fromkeys(played))
+            for name in names:
+                ps = played.get(name) or fs.PlayerStats()
+                for f, (moments, sketch) in self._row(team.name, name).items():
+                    x = getattr(ps, f)
+                    moments.push(x)
+                    sketch.push(x)
+
+    def merge(self, other: "PlayerAggregate") -> None:
+        self.games += other.games
+        for key, other_row in other.players.items():
+            row = self._row(*key)
+            for f, (moments, sketch) in other_row.items():
+                row[f][0].merge(moments)
+                row[f][1].merge(sketch)
+
+    def summary(self, quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Dict[Tuple[str, str], Dict[str, dict]]:
+        """Per player and stat: n, mean, std and one "pNN" entry per quantile."""
+        out = {}
+        for key, row in self.players.items():
+            out[key] = {}
+            for f, (moments, sketch) in row.items():
+                entry = {"n": moments.n, "mean": moments.mean, "std": moments.std}
+                entry.update(zip((f"p{round(q * 100)}" for q in quantiles), sketch.quantiles(quantiles)))
+                out[key][f] = entry
+        return out
+
+def _aggregate_games(overrides: sweep.Config, matchups: List[Tuple[int, int]], games: range, seed,
+                     k: int) -> PlayerAggregate:
+    saved = random.getstate()
+    agg = PlayerAggregate(k)
+    try:
+        with fs.config_overridden(overrides):
+            for i in games:
+                h, a = matchups[i % len(matchups)]
+                agg.add_game(fs.simulate_game(fs.TEAMS[h], fs.TEAMS[a], seed=f"{seed}/{i}"))
+    finally:
+        random.setstate(saved)
+    return agg
+
+def project_players(n_games: int, seed=0, workers: Optional[int] = None, k: int = SKETCH_K,
+                    matchups: Optional[List[Tuple[int, int]]] = None) -> PlayerAggregate:
+    """
+    Plays `n_games` seeded games, cycling through `matchups` ((home, away) TEAMS
+    indexes; a season.make_schedule() season by default), and returns the merged
+    aggregate. Means and counts do not depend on `workers`; quantiles can shift
+    within the sketch's error, since chunks are merged in a different shape.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if matchups is None:
+        matchups = season.make_schedule(0).games
+    overrides = sweep.effective_overrides({})
+    chunks = season.season_chunks(n_games, workers)
+    if workers <= 1:
+        parts = [_aggregate_games(overrides, matchups, c, seed, k) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_aggregate_games, [overrides] * len(chunks), [matchups] * len(chunks), chunks,
+                                  [seed] * len(chunks), [k] * len(chunks)))
+    total = PlayerAggregate(k)
+    for part in parts:
+        total.merge(part)
+    return total
+
+# =========================== CLI ===========================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Per-player stat projections from seeded AI-vs-AI games.")
+    ap.add_argument("--games", type=int, default=2000)
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--stat", default="rush_yards", choices=STAT_FIELDS, help="stat to rank players by")
+    args = ap.parse_args(argv)
+
+    summary = project_players(args.games, args.seed, args.workers).summary()
+    rows = sorted(summary.items(), key=lambda kv: -kv[1][args.stat]["mean"])
+    print(f"{'team':12s} {'player':22s} {'games':>6s} {'mean':>7s} {'std':>6s} {'p10':>6s} {'p50':>6s} {'p90':>6s}")
+    for (team, player), stats in rows[:40]:
+        s = stats[args.stat]
+        print(f"{team:12s} {player:22s} {s['n']:6d} {s['mean']:7.1f} {s['std']:6.1f} "
+              f"{s['p10']:6.0f} {s['p50']:6.0f} {s['p90']:6.0f}")
+
+if __name__ == "__main__":
+    main()
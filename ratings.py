@@ -0,0 +1,120 @@
+"""
+Elo power ratings for footballsim.TEAMS, updated one game at a time.
+
+Ratings live in an array('d') indexed like TEAMS, so each result is an O(1)
+update of two slots and nothing is ever recomputed from history. update_seasons()
+feeds a whole batch of season results (season.py's one byte per game) straight
+through the same update, so power rankings over millions of simulated games
+cost about a microsecond per game.
+
+Ratings feed back into matchup strength through footballsim.TEAM_ADJUSTMENTS:
+overrides() turns each team's distance from the league mean into completion and
+interception nudges, ready for footballsim.config_overridden() or apply_config().
+
+    python ratings.py --seasons 5 --seed 1
+"""
+import argparse
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import footballsim as fs
+import season
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 48.0          # Elo points added to the home side's expectation
+COMP_PER_100 = 0.01            # completion-rate nudge per 100 points above the mean
+INT_PER_100 = -0.002           # interception-rate nudge per 100 points above the mean
+
+# Home team's score by result byte
+_HOME_SCORE = {season.HOME_WIN: 1.0, season.AWAY_WIN: 0.0, season.TIE: 0.5}
+
+def margin_multiplier(margin: int, rating_diff: float) -> float:
+    """Bigger wins move ratings more, less so when the favorite was expected to win big."""
+    return math.log(abs(margin) + 1) * 2.2 / (rating_diff * 0.001 + 2.2)
+
+class EloRatings:
+    """One rating per TEAMS index; update() is O(1)."""
+    __slots__ = ("ratings", "k", "home_advantage", "games")
+
+    def __init__(self, k: float = K_FACTOR, home_advantage: float = HOME_ADVANTAGE,
+                 initial: Optional[Iterable[float]] = None):
+        self.ratings = array("d", initial if initial is not None else [INITIAL_RATING] * len(fs.TEAMS))
+        if len(self.ratings) != len(fs.TEAMS):
+            raise ValueError(f"expected {len(fs.TEAMS)} ratings, got {len(self.ratings)}")
+        self.k, self.home_advantage, self.games = k, home_advantage, 0
+
+    def expected(self, home: int, away: int) -> float:
+        """Home team's expected score (win = 1, tie = 0.5)."""
+        diff = self.ratings[home] + self.home_advantage - self.ratings[away]
+        return 1.0 / (1.0 + 10.0 ** (-diff / 400.0))
+
+    def update(self, home: int, away: int, score: float, margin: Optional[int] = None) -> float:
+        """
+        Records one game: `score` is the home team's result (1, 0.5 or 0), `margin`
+        the optional point margin. Returns the points moved to the home team.
+        """
+        r = self.ratings
+        diff = r[home] + self.home_advantage - r[away]
+        delta = self.k * (score - 1.0 / (1.0 + 10.0 ** (-diff / 400.0)))
+        if margin:
+            delta *= margin_multiplier(margin, diff if score > 0.5 else -diff)
+        r[home] += delta
+        r[away] -= delta
+        self.games += 1
+        return delta
+
+    def update_game(self, st: fs.GameState) -> float:
+        """Records a finished game, with the user team as the home side (as in season.py)."""
+        home, away = st.scoreboard[st.user_team.name], st.scoreboard[st.cpu_team.name]
+        score = 1.0 if home > away else 0.0 if away > home else 0.5
+        return self.update(season.TEAM_INDEX[st.user_team.name], season.TEAM_INDEX[st.cpu_team.name],
+                           score, home - away)
+
+    def update_seasons(self, schedule: season.Schedule, results: bytes) -> None:
+        """Runs every game of a results batch through update(), season by season in schedule order."""
+        size = len(schedule.games)
+        if len(results) % size:
+            raise ValueError(f"results hold {len(results)} bytes, not a whole number of {size}-game seasons")
+        r, k, hfa = self.ratings, self.k, self.home_advantage
+        games = schedule.games * (len(results) // size)
+        for (home, away), result in zip(games, results):
+            diff = r[home] + hfa - r[away]
+            delta = k * (_HOME_SCORE[result] - 1.0 / (1.0 + 10.0 ** (-diff / 400.0)))
+            r[home] += delta
+            r[away] -= delta
+        self.games += len(results)
+
+    def power_rankings(self) -> List[Tuple[str, float]]:
+        return sorted(((t.name, self.ratings[i]) for i, t in enumerate(fs.TEAMS)), key=lambda x: -x[1])
+
+    def overrides(self, comp_per_100: float = COMP_PER_100, int_per_100: float = INT_PER_100) -> Dict[str, float]:
+        """TEAM_ADJUSTMENTS override keys from each team's distance to the mean rating."""
+        mean = sum(self.ratings) / len(self.ratings)
+        out = {}
+        for i, team in enumerate(fs.TEAMS):
+            above = (self.ratings[i] - mean) / 100.0
+            for key, per_100 in (("comp_adj", comp_per_100), ("int_adj", int_per_100)):
+                lo, hi = fs.TEAM_ADJUSTMENT_RANGES[key]
+                out[f"team.{team.name}.{key}"] = fs.clamp(above * per_100, lo, hi)
+        return out
+
+# =========================== CLI ===========================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Elo power rankings from seeded AI-vs-AI seasons.")
+    ap.add_argument("--seasons", type=int, default=1)
+    ap.add_argument("--year", type=int, default=0, help="schedule rotation year")
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    schedule = season.make_schedule(args.year)
+    elo = EloRatings()
+    elo.update_seasons(schedule, season.play_seasons(schedule, args.seasons, args.seed, args.workers))
+    for rank, (name, rating) in enumerate(elo.power_rankings(), 1):
+        print(f"{rank:2d}. {name:12s} {rating:7.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Schedules, standings and playoff seeding for footballsim.TEAMS.
+
+make_schedule() builds a 17-game season from the league formula:
+- six division games;
+- a full division in the same conference and one in the other conference,
+  rotating by year;
+- two same-place games against the rest of the conference;
+- a 17th same-place game across conferences.
+
+A season's results take one byte per scheduled game (HOME_WIN, AWAY_WIN or
+TIE), so a batch of seasons is one flat bytearray. seed_seasons() turns a batch
+into 7 playoff seeds per conference. Per-team records are computed once per
+season, and the tiebreakers only run for teams that are actually tied. Chunks of
+seasons are spread over worker processes.
+
+Tiebreakers, in order (common games are not used):
+- Division ties: head-to-head, division record, conference record, strength
+  of victory, then a coin toss.
+- Wild-card ties: the same without the division record. Teams from one
+  division are first cut to the best of them.
+Whenever a step separates only part of a multi-team tie, the steps start over
+for the teams still tied. The coin toss is seeded by the season index, so
+seeding is reproducible.
+
+    python season.py --seasons 20 --year 0 --seed 1
+"""
+import argparse
+import os
+import random
+from array import array
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import footballsim as fs
+
+HOME_WIN, AWAY_WIN, TIE = 0, 1, 2
+GAMES_PER_TEAM = 17
+SEEDS_PER_CONFERENCE = 7
+TEAM_INDEX: Dict[str, int] = {t.name: i for i, t in enumerate(fs.TEAMS)}
+
+# Result bytes -> half-wins for the home / away team (bytes.translate tables).
+_HOME_POINTS = bytes.maketrans(bytes((HOME_WIN, AWAY_WIN, TIE)), bytes((2, 0, 1)))
+_AWAY_POINTS = bytes.maketrans(bytes((HOME_WIN, AWAY_WIN, TIE)), bytes((0, 2, 1)))
+# Same-conference division pairings, a three-year cycle.
+_INTRA_ROTATION = (((0, 1), (2, 3)), ((0, 2), (1, 3)), ((0, 3), (1, 2)))
+_INTER, _CONFERENCE, _DIVISION = 0, 1, 2
+
+# =========================== Schedule ===========================
+
+class Schedule:
+    """Games as (home, away) TEAMS indexes, plus the per-team lookups standings need."""
+
+    def __init__(self, games: Sequence[Tuple[int, int]], year: int = 0):
+        self.games = tuple(games)
+        self.year = year
+        n = len(fs.TEAMS)
+        self.division = [0] * n
+        self.conference = [0] * n
+        # Team indexes per division, per conference, in CONFERENCES order
+        self.conference_divisions: List[List[List[int]]] = []
+        div_names = list(fs.DIVISIONS)
+        for c, divs in enumerate(fs.CONFERENCES.values()):
+            members = []
+            for div in divs:
+                teams = [TEAM_INDEX[name] for name in fs.DIVISIONS[div]]
+                for t in teams:
+                    self.division[t], self.conference[t] = div_names.index(div), c
+                members.append(teams)
+            self.conference_divisions.append(members)
+        self.kind = bytes(_DIVISION if self.division[h] == self.division[a] else
+                          _CONFERENCE if self.conference[h] == self.conference[a] else _INTER
+                          for h, a in self.games)
+        self.team_games: List[List[Tuple[int, int, bool]]] = [[] for _ in range(n)]  # (game, opponent, home)
+        for g, (h, a) in enumerate(self.games):
+            self.team_games[h].append((g, a, True))
+            self.team_games[a].append((g, h, False))
+        # Per team, (home, away) itemgetters over its overall, conference and division
+        # games: a season's records are then a few C-level gathers per team.
+        self.gathers = [tuple(_gather([g for g, _, h in games if h == at_home and self.kind[g] >= level])
+                              for level in (_INTER, _CONFERENCE, _DIVISION) for at_home in (True, False))
+                        for games in self.team_games]
+
+    def validate(self) -> None:
+        for t, games in enumerate(self.team_games):
+            name = fs.TEAMS[t].name
+            home = sum(1 for _, _, is_home in games if is_home)
+            division = sum(1 for g, _, _ in games if self.kind[g] == _DIVISION)
+            if len(games) != GAMES_PER_TEAM or home not in (8, 9) or division != 6:
+                raise ValueError(f"{name}: {len(games)} games, {home} at home, {division} in the division")
+            if any(opp == t for _, opp, _ in games):
+                raise ValueError(f"{name} is scheduled against itself")
+
+def _gather(games: List[int]) -> itemgetter:
+    """An itemgetter over `games` that always returns a sequence (a slice for fewer than two)."""
+    if len(games) > 1:
+        return itemgetter(*games)
+    return itemgetter(slice(games[0], games[0] + 1) if games else slice(0, 0))
+
+def _by_place(division: str, places: Dict[str, int]) -> List[int]:
+    teams = fs.DIVISIONS[division]
+    return [TEAM_INDEX[n] for n in sorted(teams, key=lambda n: places.get(n, teams.index(n)))]
+
+def _division_vs_division(a: List[int], b: List[int], year: int, games: List[Tuple[int, int]]) -> None:
+    """Every team in `a` plays every team in `b`, two at home and two away."""
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            games.append((x, y) if (i + j + year) % 2 == 0 else (y, x))
+
+def make_schedule(year: int = 0, places: Optional[Dict[str, int]] = None) -> Schedule:
+    """
+    The `year`'s rotation of the 17-game formula. `places` maps team name to last
+    season's division finish (0 = first); by default a team's place is its position
+    in DIVISIONS.
+    """
+    places = places or {}
+    conferences = [[_by_place(div, places) for div in divs] for divs in fs.CONFERENCES.values()]
+    games: List[Tuple[int, int]] = []
+    for divs in conferences:
+        for teams in divs:
+            games.extend((x, y) for x in teams for y in teams if x != y)
+        pairs = _INTRA_ROTATION[year % 3]
+        for d, e in pairs:
+            _division_vs_division(divs[d], divs[e], year, games)
+        # The four non-paired matchups form a cycle a-c-b-d; each division hosts once
+        (a, b), (c, d) = pairs
+        cycle = (a, c, b, d)
+        for k in range(4):
+            home, away = divs[cycle[k]], divs[cycle[(k + 1) % 4]]
+            games.extend(zip(home, away))
+    first, second = conferences
+    for k in range(4):
+        _division_vs_division(first[k], second[(k + year) % 4], year, games)
+        other = second[(k + year + 2) % 4]
+        games.extend(zip(first[k], other) if year % 2 == 0 else zip(other, first[k]))
+    schedule = Schedule(games, year)
+    schedule.validate()
+    return schedule
+
+# =========================== Playing seasons ===========================
+
+def game_result(st: fs.GameState) -> int:
+    """Result byte for a game simulated with the home team as the user team."""
+    home, away = st.scoreboard[st.user_team.name], st.scoreboard[st.cpu_team.name]
+    return HOME_WIN if home > away else AWAY_WIN if away > home else TIE
+
+def _play_chunk(schedule: Schedule, seasons: List[int], seed) -> bytes:
+    saved = random.getstate()
+    try:
+        row = bytearray()
+        for s in seasons:
+            for g, (h, a) in enumerate(schedule.games):
+                row.append(game_result(fs.simulate_game(fs.TEAMS[h], fs.TEAMS[a], seed=f"{seed}/{s}/{g}")))
+    finally:
+        random.setstate(saved)
+    return bytes(row)
+
+def play_seasons(schedule: Schedule, n: int, seed=0, workers: Optional[int] = None) -> bytearray:
+    """Plays `n` seeded seasons with the engine; returns the flat results batch."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = season_chunks(n, workers)
+    if workers <= 1:
+        parts = [_play_chunk(schedule, list(c), seed) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_play_chunk, [schedule] * len(chunks), [list(c) for c in chunks],
+                                  [seed] * len(chunks)))
+    return bytearray(b"".join(parts))
+
+def season_chunks(n: int, workers: int) -> List[range]:
+    """Splits seasons (or games) 0..n-1 into contiguous ranges, about four per worker."""
+    n_chunks = max(1, min(n, workers * 4))
+    bounds = [n * i // n_chunks for i in range(n_chunks + 1)]
+    return [range(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+
+# =========================== Standings & tiebreakers ===========================
+
+class SeasonStandings:
+    """One season's records (in half-wins: 2 per win, 1 per tie), with tiebreakers over them."""
+    __slots__ = ("schedule", "index", "home", "away", "w2", "div_w2", "conf_w2")
+
+    def __init__(self, schedule: Schedule, row: bytes, index: int = 0):
+        self.schedule, self.index = schedule, index
+        self.home, self.away = home, away = row.translate(_HOME_POINTS), row.translate(_AWAY_POINTS)
+        self.w2, self.conf_w2, self.div_w2 = w2, conf_w2, div_w2 = [], [], []
+        for all_h, all_a, conf_h, conf_a, div_h, div_a in schedule.gathers:
+            w2.append(sum(all_h(home)) + sum(all_a(away)))
+            conf_w2.append(sum(conf_h(home)) + sum(conf_a(away)))
+            div_w2.append(sum(div_h(home)) + sum(div_a(away)))
+
+    def record(self, team: int) -> Tuple[int, int, int]:
+        """(wins, losses, ties)."""
+        pts = [self._points(g, home) for g, _, home in self.schedule.team_games[team]]
+        return pts.count(2), pts.count(0), pts.count(1)
+
+    def _points(self, game: int, home: bool) -> int:
+        return self.home[game] if home else self.away[game]
+
+    # --- tiebreak steps: one comparable value per team in `group` ---
+
+    def _head_to_head(self, group: List[int]) -> List[float]:
+        members = set(group)
+        values = []
+        for t in group:
+            pts = [self._points(g, home) for g, opp, home in self.schedule.team_games[t] if opp in members]
+            if not pts:
+                return [0.0] * len(group)  # not everyone met: the step doesn't apply
+            values.append(sum(pts) / (2 * len(pts)))
+        return values
+
+    def _division_record(self, group: List[int]) -> List[int]:
+        return [self.div_w2[t] for t in group]
+
+    def _conference_record(self, group: List[int]) -> List[int]:
+        return [self.conf_w2[t] for t in group]
+
+    def _strength_of_victory(self, group: List[int]) -> List[float]:
+        values = []
+        for t in group:
+            won = beaten = 0
+            for g, opp, home in self.schedule.team_games[t]:
+                pts = self._points(g, home)
+                if pts:
+                    won += pts
+                    beaten += pts * self.w2[opp]
+            values.append(beaten / (won * 2 * GAMES_PER_TEAM) if won else 0.0)
+        return values
+
+    _STEPS = {
+        "division": (_head_to_head, _division_record, _conference_record, _strength_of_victory),
+        "wildcard": (_head_to_head, _conference_record, _strength_of_victory),
+    }
+
+    def _break(self, group: List[int], kind: str) -> int:
+        while len(group) > 1:
+            for step in self._STEPS[kind]:
+                values = step(self, group)
+                top = max(values)
+                narrowed = [t for t, v in zip(group, values) if v == top]
+                if len(narrowed) < len(group):
+                    group = narrowed
+                    break  # start over with the teams still tied
+            else:
+                return random.Random(f"coin/{self.index}").choice(sorted(group))
+        return group[0]
+
+    def best(self, teams: Sequence[int], kind: str = "division") -> int:
+        """The top team of `teams` by record, then by the `kind` ("division" or "wildcard") tiebreakers."""
+        w2 = self.w2
+        top = max(w2[t] for t in teams)
+        group = [t for t in teams if w2[t] == top]
+        if len(group) > 1 and kind == "wildcard":
+            by_division: Dict[int, List[int]] = {}
+            for t in group:
+                by_division.setdefault(self.schedule.division[t], []).append(t)
+            if len(by_division) < len(group):
+                group = [self._break(ts, "division") if len(ts) > 1 else ts[0] for ts in by_division.values()]
+        return self._break(group, kind) if len(group) > 1 else group[0]
+
+    def rank(self, teams: Sequence[int], kind: str = "wildcard", limit: Optional[int] = None) -> List[int]:
+        """`teams` best first (only the first `limit` of them). Tiebreakers run only inside tied records."""
+        w2 = self.w2
+        ordered = sorted(teams, key=w2.__getitem__, reverse=True)
+        limit = len(ordered) if limit is None else min(limit, len(ordered))
+        out: List[int] = []
+        i = 0
+        while len(out) < limit:
+            j = i + 1
+            while j < len(ordered) and w2[ordered[j]] == w2[ordered[i]]:
+                j += 1
+            tied = ordered[i:j]
+            while tied and len(out) < limit:
+                t = self.best(tied, kind) if len(tied) > 1 else tied[0]
+                out.append(t)
+                tied.remove(t)
+            i = j
+        return out
+
+    def seeds(self) -> List[int]:
+        """Seven seeds per conference in CONFERENCES order: four division winners, then three wild cards."""
+        out: List[int] = []
+        for divisions in self.schedule.conference_divisions:
+            winners = [self.best(teams, "division") for teams in divisions]
+            out.extend(self.rank(winners))
+            rest = [t for teams in divisions for t in teams if t not in winners]
+            out.extend(self.rank(rest, limit=SEEDS_PER_CONFERENCE - len(winners)))
+        return out
+
+def _seed_chunk(schedule: Schedule, results: bytes, first: int) -> bytes:
+    size = len(schedule.games)
+    return bytes(t for i in range(len(results) // size)
+                 for t in SeasonStandings(schedule, results[i * size:(i + 1) * size], first + i).seeds())
+
+def seed_seasons(schedule: Schedule, results: bytes, workers: Optional[int] = None) -> array:
+    """
+    Playoff seeds for every season in a results batch: a flat array('B') of TEAMS
+    indexes, 2 * SEEDS_PER_CONFERENCE per season.
+    """
+    size = len(schedule.games)
+    if len(results) % size:
+        raise ValueError(f"results hold {len(results)} bytes, not a whole number of {size}-game seasons")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks = season_chunks(len(results) // size, workers)
+    args = [(bytes(results[c.start * size:c.stop * size]), c.start) for c in chunks]
+    if workers <= 1:
+        parts = [_seed_chunk(schedule, r, first) for r, first in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_seed_chunk, [schedule] * len(args), *zip(*args)))
+    return array("B", b"".join(parts))
+
+def playoff_odds(seeds: array) -> Dict[str, float]:
+    """Share of seasons each team made the playoffs."""
+    per_season = 2 * SEEDS_PER_CONFERENCE
+    n = len(seeds) // per_season
+    counts = [0] * len(fs.TEAMS)
+    for t in seeds:
+        counts[t] += 1
+    return {team.name: counts[i] / n if n else 0.0 for i, team in enumerate(fs.TEAMS)}
+
+# =========================== CLI ===========================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Play seeded AI-vs-AI seasons and report playoff odds.")
+    ap.add_argument("--seasons", type=int, default=10)
+    ap.add_argument("--year", type=int, default=0, help="schedule rotation year")
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    schedule = make_schedule(args.year)
+    results = play_seasons(schedule, args.seasons, args.seed, args.workers)
+    odds = playoff_odds(seed_seasons(schedule, results, args.workers))
+    last = SeasonStandings(schedule, bytes(results[-len(schedule.games):]), args.seasons - 1)
+    for divisions in schedule.conference_divisions:
+        for teams in divisions:
+            for t in last.rank(teams, "division"):
+                w, l, tie = last.record(t)
+                print(f"{fs.TEAMS[t].name:12s} {w:2d}-{l:2d}{f'-{tie}' if tie else '  '}  "
+                      f"playoffs {odds[fs.TEAMS[t].name] * 100:5.1f}%")
+            print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Batch parameter sweeps over footballsim.DEF_EFFECTS.
+
+A config is a dict of overrides such as {"Nickel.pass_mean": 9, "*.tfl_chance": 0.08}
+("*" applies to every formation; "pass_baseline.comp_max" etc. set the QB baseline
+clamps). Every config plays the same list of seeded
+AI-vs-AI games (common random numbers), so differences between configs come from
+the parameters rather than from luck. Results are cached on disk by the effective
+engine config, the game seeds and the engine version.
+
+    python sweep.py --grid "*.pass_mean=7,8,9" --grid "*.tfl_chance=0.05,0.10" --games 400
+    python sweep.py --lhs 16 --range "*.run_mean=3:6" --range "Blitz.sack_adj=0:0.1" --csv out.csv
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import footballsim as fs
+
+Config = Dict[str, object]
+
+METRICS = ("yards_per_play", "completion_pct", "points_per_game")
+CACHE_PATH = "footballsim_sweep_cache.json"
+DEFAULT_GAMES = 200
+
+# =========================== Config generators ===========================
+
+def grid(space: Dict[str, Sequence]) -> List[Config]:
+    """Full factorial: one config per combination of the listed values."""
+    keys = list(space)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(space[k] for k in keys))]
+
+def latin_hypercube(bounds: Dict[str, Tuple[float, float]], n: int, seed=None) -> List[Config]:
+    """`n` configs where each parameter's range is cut into n strata and each stratum is used once."""
+    rng = random.Random(seed)
+    columns = {}
+    for key, (lo, hi) in bounds.items():
+        strata = list(range(n))
+        rng.shuffle(strata)
+        columns[key] = [lo + (hi - lo) * (s + rng.random()) / n for s in strata]
+    return [{key: columns[key][i] for key in bounds} for i in range(n)]
+
+# =========================== Running games ===========================
+
+@dataclass
+class SweepTotals:
+    games: int = 0
+    plays: int = 0
+    yards: int = 0
+    pass_attempts: int = 0
+    completions: int = 0
+    points: int = 0
+
+    def add_game(self, st: fs.GameState) -> None:
+        self.games += 1
+        for t in st.totals.values():
+            self.plays += t.plays
+            self.yards += t.yards
+            self.pass_attempts += t.pass_attempts
+            self.completions += t.completions
+        self.points += sum(st.scoreboard.values())
+
+    def merge(self, other: "SweepTotals") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "yards_per_play": self.yards / self.plays if self.plays else 0.0,
+            "completion_pct": 100.0 * self.completions / self.pass_attempts if self.pass_attempts else 0.0,
+            "points_per_game": self.points / (2 * self.games) if self.games else 0.0,  # per team
+        }
+
+def game_seeds(games: int, seed) -> List[str]:
+    return [f"{seed}/{i}" for i in range(games)]
+
+def matchup(game_seed: str) -> Tuple[fs.Team, fs.Team]:
+    """Teams for one game, drawn from the game seed so every config sees the same schedule."""
+    home, away = random.Random(f"matchup/{game_seed}").sample(fs.TEAMS, 2)
+    return home, away
+
+def _play_chunk(overrides: Config, seeds: List[str]) -> SweepTotals:
+    totals = SweepTotals()
+    saved = random.getstate()
+    try:
+        with fs.config_overridden(overrides):
+            for game_seed in seeds:
+                totals.add_game(fs.simulate_game(*matchup(game_seed), seed=game_seed))
+    finally:
+        random.setstate(saved)
+    return totals
+
+def effective_overrides(overrides: Config) -> Config:
+    """
+    The whole engine config with `overrides` applied, as override keys. Workers get
+    this rather than the bare overrides, so a config loaded in the parent process
+    also reaches workers that start fresh (spawn on macOS/Windows).
+    """
+    with fs.config_overridden(overrides):
+        return fs.config_to_overrides(fs.export_config())
+
+def config_key(full: Config, games: int, seed) -> str:
+    """Cache key: the effective engine config (not the override spelling) plus seeds and engine."""
+    blob = json.dumps([sorted((k, list(v) if isinstance(v, tuple) else v) for k, v in full.items()),
+                       games, str(seed), fs.ENGINE_VERSION])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+# =========================== Cache ===========================
+
+class SweepCache:
+    """JSON file of config key -> SweepTotals. `path=None` keeps it in memory only."""
+
+    def __init__(self, path: Optional[str] = CACHE_PATH):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, key: str) -> Optional[SweepTotals]:
+        entry = self.entries.get(key)
+        return SweepTotals(**entry) if entry is not None else None
+
+    def put(self, key: str, totals: SweepTotals) -> None:
+        self.entries[key] = asdict(totals)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp, self.path)
+
+# =========================== Sweep ===========================
+
+def run_sweep(configs: List[Config], games: int = DEFAULT_GAMES, seed=0, workers: Optional[int] = None,
+              cache: Optional[SweepCache] = None) -> List[dict]:
+    """
+    Plays `games` seeded games per config and returns one row per config:
+    the overrides, the metrics, the number of games and whether it came from cache.
+    Only uncached configs are simulated; their chunks are spread over `workers` processes.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seeds = game_seeds(games, seed)
+    full = [effective_overrides(c) for c in configs]
+    keys = [config_key(f, games, seed) for f in full]
+    found = {k: cache.get(k) for k in keys} if cache is not None else {}
+
+    pending = [(k, f) for k, f in zip(keys, full) if found.get(k) is None]
+    pending = list({k: f for k, f in pending}.items())  # identical configs run once
+    n_chunks = max(1, min(games, workers * 2))
+    chunks = [seeds[i::n_chunks] for i in range(n_chunks)]
+    jobs = [(k, c, s) for k, c in pending for s in chunks if s]
+
+    if jobs:
+        if workers <= 1:
+            results = [_play_chunk(c, s) for _, c, s in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_play_chunk, [c for _, c, _ in jobs], [s for _, _, s in jobs]))
+        fresh: Dict[str, SweepTotals] = {}
+        for (k, _, _), totals in zip(jobs, results):
+            fresh.setdefault(k, SweepTotals()).merge(totals)
+        if cache is not None:
+            for k, totals in fresh.items():
+                cache.put(k, totals)
+            cache.save()
+    else:
+        fresh = {}
+
+    rows = []
+    for k, c in zip(keys, configs):
+        totals = found.get(k) or fresh[k]
+        rows.append({**c, **totals.metrics(), "games": totals.games, "cached": found.get(k) is not None})
+    return rows
+
+def format_table(rows: List[dict]) -> str:
+    if not rows:
+        return "(no results)"
+    cols = list(rows[0])
+    def cell(v):
+        return f"{v:.3f}" if isinstance(v, float) else str(v)
+    widths = [max(len(c), *(len(cell(r[c])) for r in rows)) for c in cols]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(cols, widths))]
+    lines += ["  ".join(cell(r[c]).rjust(w) for c, w in zip(cols, widths)) for r in rows]
+    return "\n".join(lines)
+
+def write_csv(rows: List[dict], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+
+# =========================== CLI ===========================
+
+def _number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+def _split_option(text: str) -> Tuple[str, str]:
+    key, sep, values = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUES, got {text!r}")
+    fs.effect_override_targets(key)  # fail early on typos
+    return key, values
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Sweep DEF_EFFECTS parameters over seeded AI-vs-AI games.")
+    ap.add_argument("--grid", action="append", default=[], metavar="KEY=V1,V2,...")
+    ap.add_argument("--range", action="append", default=[], metavar="KEY=LO:HI", help="Latin hypercube bounds")
+    ap.add_argument("--lhs", type=int, default=0, help="number of Latin hypercube configs")
+    ap.add_argument("--games", type=int, default=DEFAULT_GAMES)
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--cache", default=CACHE_PATH, help="cache file ('' to disable)")
+    ap.add_argument("--csv", default=None)
+    args = ap.parse_args(argv)
+
+    configs: List[Config] = []
+    if args.grid:
+        space = {}
+        for opt in args.grid:
+            key, values = _split_option(opt)
+            space[key] = [_number(v) for v in values.split(",")]
+        configs += grid(space)
+    if args.lhs:
+        bounds = {}
+        for opt in args.range:
+            key, values = _split_option(opt)
+            lo, _, hi = values.partition(":")
+            bounds[key] = (float(lo), float(hi))
+        configs += latin_hypercube(bounds, args.lhs, seed=args.seed)
+    if not configs:
+        configs = [{}]  # baseline only
+
+    rows = run_sweep(configs, games=args.games, seed=args.seed, workers=args.workers,
+                     cache=SweepCache(args.cache or None))
+    print(format_table(rows))
+    if args.csv:
+        write_csv(rows, args.csv)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import footballsim
+import bracket
+import season
+
+N = len(footballsim.TEAMS)
+
+
+def fixed_matrix(favorite=0, p=0.6):
+    """Every home team wins with probability `p`, except that `favorite` always wins."""
+    p_home = []
+    for h in range(N):
+        for a in range(N):
+            p_home.append(0.5 if h == a else 1.0 if h == favorite else 0.0 if a == favorite else p)
+    return bracket.WinMatrix(p_home, [0.0] * (N * N), [[(24, 17)]] * (N * N), key="test")
+
+
+class TestMatrix(unittest.TestCase):
+    def test_play_pairs_is_seeded(self):
+        first = bracket._play_pairs({}, [(0, 1), (2, 3)], 2, "t", "playoff")
+        self.assertEqual(first, bracket._play_pairs({}, [(0, 1), (2, 3)], 2, "t", "playoff"))
+        self.assertEqual([len(games) for games in first], [2, 2])
+        # Playoff overtime never ends tied
+        self.assertTrue(all(x != y for games in first for x, y in games))
+
+    def test_load_matrix_uses_the_cache_until_the_config_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "matrix.json")
+            m = fixed_matrix()
+            m.key = bracket.matrix_key(3, 1, "playoff")
+            with unittest.mock.patch("bracket.build_matrix", return_value=m) as build:
+                bracket.load_matrix(3, 1, path=path)
+                again = bracket.load_matrix(3, 1, path=path)
+                self.assertEqual(build.call_count, 1)
+                self.assertEqual(again.p_home, m.p_home)
+                self.assertEqual(again.sample_score(0, 1, bracket.random.Random(0)), (24, 17))
+                with footballsim.config_overridden({"*.run_mean": 9}):
+                    bracket.load_matrix(3, 1, path=path)
+                self.assertEqual(build.call_count, 2)
+
+    def test_neutral_prob_averages_both_venues(self):
+        m = fixed_matrix(p=0.6)
+        self.assertAlmostEqual(m.neutral_prob(3, 4), 0.5)
+        self.assertEqual(m.neutral_prob(0, 4), 1.0)
+
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        self.schedule = season.make_schedule(0)
+
+    def test_bracket_favorite_wins_every_time(self):
+        m = fixed_matrix(favorite=0)
+        results = bracket.sample_seasons(m, self.schedule, 1, seed=3)
+        seeds = season.SeasonStandings(self.schedule, bytes(results)).seeds()
+        self.assertEqual(seeds[0], 0)  # the unbeaten Packers are the NFC's top seed
+        odds = bracket.simulate_brackets(m, seeds, 500, seed=1)
+        self.assertEqual(odds["Packers"]["champion"], 1.0)
+        self.assertAlmostEqual(sum(o["champion"] for o in odds.values()), 1.0)
+        self.assertAlmostEqual(sum(o["divisional"] for o in odds.values()), 8.0)
+        self.assertAlmostEqual(sum(o["super_bowl"] for o in odds.values()), 2.0)
+        self.assertEqual(odds, bracket.simulate_brackets(m, seeds, 500, seed=1))
+
+    def test_sample_seasons_follow_the_matrix(self):
+        m = fixed_matrix(favorite=-1, p=0.7)
+        results = bracket.sample_seasons(m, self.schedule, 40, seed=2)
+        self.assertEqual(len(results), 40 * len(self.schedule.games))
+        home_share = results.count(season.HOME_WIN) / len(results)
+        self.assertAlmostEqual(home_share, 0.7, delta=0.03)
+
+    def test_tournament_odds(self):
+        odds = bracket.tournament_odds(fixed_matrix(favorite=0), self.schedule, 20, seed=5, workers=1)
+        self.assertEqual(odds["Packers"]["playoffs"], 1.0)
+        self.assertEqual(odds["Packers"]["champion"], 1.0)
+        self.assertAlmostEqual(sum(o["playoffs"] for o in odds.values()), 14.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
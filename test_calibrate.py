@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+
+import calibrate
+import footballsim
+
+
+class TestTargetsAndLoss(unittest.TestCase):
+    def _write(self, tmp, text):
+        path = os.path.join(tmp, "targets.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_read_targets_default_weight(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, "metric,target,weight\nyards_per_play,5.4,\npoints_per_game,22,2\n")
+            targets = calibrate.read_targets(path)
+        self.assertEqual(targets, {"yards_per_play": (5.4, 1.0), "points_per_game": (22.0, 2.0)})
+
+    def test_read_targets_rejects_unknown_metric(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self._write(tmp, "metric,target\nrushing_epa,0.1\n")
+            with self.assertRaises(ValueError):
+                calibrate.read_targets(path)
+
+    def test_loss_is_weighted_relative_error(self):
+        targets = {"yards_per_play": (5.0, 1.0), "points_per_game": (20.0, 4.0)}
+        self.assertAlmostEqual(calibrate.loss({"yards_per_play": 5.5, "points_per_game": 20.0}, targets), 0.01)
+
+
+class TestOverrides(unittest.TestCase):
+    def test_star_shift_keeps_formation_differences(self):
+        params = [calibrate.Param("*.run_mean", 0.5, -2, 2), calibrate.Param("pass_baseline.comp_max", 0.02, -0.1, 0.1)]
+        ov = calibrate.overrides_for([1.0, 0.05], params)
+        for f, eff in footballsim.DEF_EFFECTS.items():
+            self.assertAlmostEqual(ov[f"{f}.run_mean"], eff["run_mean"] + 1.0)
+        self.assertAlmostEqual(ov["pass_baseline.comp_max"], footballsim.PASS_BASELINE_CLAMPS["comp_max"] + 0.05)
+
+    def test_chances_floor_at_zero(self):
+        ov = calibrate.overrides_for([-1.0], [calibrate.Param("*.tfl_chance", 0.02, -1, 1)])
+        self.assertTrue(all(v == 0.0 for v in ov.values()))
+
+
+class TestCalibrate(unittest.TestCase):
+    def test_short_run_writes_loadable_config(self):
+        targets = {"yards_per_play": (5.4, 1.0), "points_per_game": (22.0, 1.0)}
+        params = [calibrate.Param("*.pass_mean", 1.0, -2, 2)]
+        result = calibrate.calibrate(targets, params=params, iterations=2, games=2, seed=1, workers=1, log=lambda s: None)
+        self.assertEqual(len(result.history), 2)
+        self.assertEqual(set(result.overrides), {f"{f}.pass_mean" for f in footballsim.DEF_CHOICES})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cfg.json")
+            calibrate.write_config(result, targets, path)
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("calibration", json.load(f))
+            saved = footballsim.export_config()
+            try:
+                footballsim.load_config(path)
+                self.assertEqual(footballsim.DEF_EFFECTS["Blitz"]["pass_mean"], result.overrides["Blitz.pass_mean"])
+                self.assertIsInstance(footballsim.DEF_EFFECTS["Blitz"]["pass_big_play_bonus"], tuple)
+            finally:
+                footballsim.apply_config(saved)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import footballsim
+import fantasy
+
+
+class TestScoring(unittest.TestCase):
+    def test_scoring_systems_differ_only_in_receptions(self):
+        ps = footballsim.PlayerStats(rush_yards=20, rec_yards=85, touchdowns=1, receptions=6)
+        self.assertAlmostEqual(fantasy.fantasy_points(ps, "standard"), 16.5)
+        self.assertAlmostEqual(fantasy.fantasy_points(ps, "half_ppr"), 19.5)
+        self.assertAlmostEqual(fantasy.fantasy_points(ps, "ppr"), 22.5)
+        qb = footballsim.PlayerStats(pass_yards=250, pass_touchdowns=2, interceptions_thrown=1)
+        self.assertAlmostEqual(fantasy.fantasy_points(qb, {"pass_yards": 0.04, "pass_touchdowns": 6}), 22.0)
+        with self.assertRaises(ValueError):
+            fantasy.scoring_weights({"sacks": 1})
+
+    def test_default_slate_plays_each_team_at_most_once(self):
+        slate = fantasy.default_slate(0)
+        teams = [t for game in slate for t in game]
+        self.assertEqual(len(teams), len(set(teams)))
+
+
+class TestSlate(unittest.TestCase):
+    def setUp(self):
+        fantasy.clear_cache()
+        self.addCleanup(fantasy.clear_cache)
+
+    def test_rescoring_reuses_cached_lines(self):
+        slate = [(0, 1)]
+        ppr = fantasy.project_slate(slate, "ppr", games=4, seed=2, workers=1)
+        with unittest.mock.patch("fantasy._simulate_matchup") as sim:
+            standard = fantasy.project_slate(slate, "standard", games=4, seed=2, workers=1)
+            sim.assert_not_called()
+        self.assertEqual(set(ppr), {(t.name, footballsim.canonical_name(n))
+                                    for t in footballsim.TEAMS[:2] for n in t.roster.values()})
+        watson = ("Packers", footballsim.canonical_name(footballsim.TEAMS[0].roster["WR1"]))
+        self.assertGreaterEqual(ppr[watson]["mean"], standard[watson]["mean"])
+        row = ppr[watson]
+        self.assertEqual(row["games"], 4)
+        self.assertTrue(0 <= row["bust"] <= 1 and 0 <= row["boom"] <= 1)
+        self.assertLessEqual(row["p10"], row["p90"])
+        cached = fantasy.lines_key(0, 1, 4, 2)
+        with footballsim.config_overridden({"*.run_mean": 9}):
+            self.assertNotEqual(fantasy.load_slate(slate, 4, 2, 1)[0].key, cached)
+
+    def test_lines_persist_to_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lines.json")
+            first = fantasy.load_slate([(2, 3)], games=2, seed=1, workers=1, path=path)[0]
+            fantasy.clear_cache()
+            with unittest.mock.patch("fantasy._simulate_matchup") as sim:
+                again = fantasy.load_slate([(2, 3)], games=2, seed=1, workers=1, path=path)[0]
+                sim.assert_not_called()
+            self.assertEqual(again.values, first.values)
+            self.assertEqual(again.players, first.players)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
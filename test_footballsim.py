@@ -1,4 +1,5 @@
 
+import math
 import io
 import sys
 import unittest
@@ -146,17 +147,106 @@ class TestPenaltiesAndStats(unittest.TestCase):
         self.totals = footballsim.make_penalty_totals(self.user_team, self.cpu_team)
 
     def test_maybe_penalty_branches(self):
-        # Force pre-snap, false start
-        with patch('random.random', side_effect=[0.01, 0.10, 0.30]):  # overall hit, pre=True, false-start pick
-            p = footballsim.maybe_penalty(self.user_team, self.cpu_team, is_pass=False)
+        # One draw against the cumulative table: false start is the first pre-snap entry
+        with patch('random.random', side_effect=[0.01]):
+            p = footballsim.maybe_penalty(self.user_team, self.cpu_team, is_pass=False, pre_snap=True)
         self.assertTrue(p.pre_snap)
-        self.assertIn("False start", p.description)
+        self.assertEqual(p.description, "False start on offense (-5)")
 
-        # Force post-snap DPI
-        with patch('random.random', side_effect=[0.01, 0.50, 0.30]):  # hit, pre=False, DPI pick
-            p = footballsim.maybe_penalty(self.user_team, self.cpu_team, is_pass=True)
+        # Post-snap pass table: holding (0.012), defensive holding (0.006), then DPI
+        with patch('random.random', side_effect=[0.02]):
+            p = footballsim.maybe_penalty(self.user_team, self.cpu_team, is_pass=True, pre_snap=False)
         self.assertFalse(p.pre_snap)
-        self.assertIn("Defensive pass interference", p.description)
+        self.assertEqual(p.description, "Defensive pass interference (+15, automatic first down)")
+        self.assertTrue(p.automatic_first)
+
+        with patch('random.random', side_effect=[0.5]):
+            self.assertIsNone(footballsim.maybe_penalty(self.user_team, self.cpu_team, is_pass=True))
+
+    def test_penalty_tables_follow_play_type(self):
+        run_types, run_cum = footballsim.penalty_table("run", "post")
+        pass_types, pass_cum = footballsim.penalty_table("screen", "post")
+        self.assertNotIn("pass_interference", [p.name for p in run_types])
+        self.assertIn("pass_interference", [p.name for p in pass_types])
+        self.assertAlmostEqual(run_cum[-1], 0.048)
+        self.assertAlmostEqual(pass_cum[-1], 0.048)
+        self.assertGreaterEqual(len(footballsim.PENALTY_TYPES), 15)
+        with patch('random.random', return_value=0.001):
+            batch = footballsim.penalty_batch("sneak", True, 3)
+        self.assertEqual([p.name for p in batch], ["false start"] * 3)
+
+    def test_situation_values(self):
+        v = footballsim.situation_value
+        self.assertGreater(v(1, 10, 80), v(1, 10, 50))
+        self.assertGreater(v(2, 3, 50), v(2, 12, 50))
+        self.assertGreater(v(1, 10, 50), v(3, 10, 50))
+        self.assertEqual(v(1, 99, 50), v(1, footballsim.MAX_DISTANCE, 50))
+        self.assertEqual(len(footballsim.situation_table()), 4 * footballsim.MAX_DISTANCE * 100)
+
+    def test_touchdown_value_follows_conversions_and_kickoffs(self):
+        self.assertEqual(footballsim.kickoff_start(), 26)
+        self.assertAlmostEqual(footballsim.try_points(), 0.94)
+        fourth_and_long = footballsim.situation_value(4, 20, 70)
+        self.addCleanup(footballsim.clear_table_caches)
+        with patch.dict(footballsim.CONVERSIONS, {"pat": 0.5, "two_point": 0.4}), \
+                patch.dict(footballsim.KICKOFF, {"touchback_chance": 1.0, "touchback_spot": 35}):
+            footballsim.clear_table_caches()
+            self.assertAlmostEqual(footballsim.result_value(1, 90, 85, 20),
+                                   6.8 - footballsim.situation_value(1, 10, 35))
+            # The field goal floor on 4th down kicks off from the same table
+            self.assertLess(footballsim.situation_value(4, 20, 70), fourth_and_long)
+
+    def test_penalty_accept_or_decline(self):
+        holding = footballsim.PENALTY_TYPES["holding"].result()
+        dpi = footballsim.PENALTY_TYPES["pass_interference"].result()
+        illegal_block = footballsim.PENALTY_TYPES["illegal_block"].result()
+        # 2nd & 10 at the 40: holding on a run that lost 8 is declined, on a 20-yard run it is accepted
+        self.assertFalse(footballsim.penalty_accepted(2, 50, 40, -8, holding))
+        self.assertTrue(footballsim.penalty_accepted(2, 50, 40, 20, holding))
+        # DPI on a short completion is accepted; an illegal block during a touchdown is accepted
+        self.assertTrue(footballsim.penalty_accepted(2, 50, 40, 4, dpi, is_pass=True))
+        self.assertTrue(footballsim.penalty_accepted(1, 85, 75, 25, illegal_block))
+
+    def test_declined_penalty_not_enforced(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], user_receives=True)
+        st.ball_on, st.line_to_gain, st.down = 40, 50, 2
+        out = footballsim.Narrator(footballsim.PLAY_BY_PLAY, footballsim.QueueSink())
+        o = footballsim.PlayOutcome("run", "J. Jacobs", None, -8)
+        with patch('footballsimpatch1.maybe_penalty', return_value=footballsim.PENALTY_TYPES["holding"].result()):
+            footballsim.apply_play(st, o, "Blitz", out)
+        self.assertIn("Penalty after play: Offensive holding (-10), declined.", list(out.sink.queue.queue))
+        self.assertEqual((st.ball_on, st.down), (32, 3))
+        self.assertEqual(st.penalty_totals["Packers"]["count"], 0)
+
+    def test_accepted_holding_replays_the_down(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], user_receives=True)
+        st.ball_on, st.line_to_gain, st.down = 40, 50, 2
+        o = footballsim.PlayOutcome("run", "J. Jacobs", None, 20)
+        with patch('footballsimpatch1.maybe_penalty', return_value=footballsim.PENALTY_TYPES["holding"].result()):
+            footballsim.apply_play(st, o, "Blitz", footballsim.silent_narrator())
+        self.assertEqual((st.ball_on, st.down, st.line_to_gain), (30, 2, 50))
+        self.assertEqual(st.penalty_totals["Packers"], {"count": 1, "yards": 10})
+
+    def test_penalty_catalogue_validation(self):
+        spec = dict(footballsim.PENALTIES["holding"])
+        for bad in ({"phase": "during"}, {"yards": 0}, {"enforcement": "spot"}, {"rates": {"run": 1.5}},
+                    {"automatic_first": 1}):
+            with self.assertRaises(ValueError, msg=bad):
+                footballsim.compile_penalty("bad", {**spec, **bad})
+        with self.assertRaises(ValueError):
+            footballsim.register_penalty("flood", {**spec, "rates": {"*": 0.99}})
+        self.assertNotIn("flood", footballsim.PENALTIES)
+        post = {**spec, "rates": {"pass": 0.5}}
+        specs = {"all_passes": post, "screens": {**post, "rates": {"screen": 0.6}}}
+        with self.assertRaises(ValueError):  # a screen is a pass, so it draws from both
+            footballsim.compile_penalties(specs)
+        footballsim.compile_penalties(specs, play_types={})
+        pre = dict(footballsim.PENALTIES["false_start"], rates={"*": 0.5})
+        with self.assertRaises(ValueError):  # under 1 in each phase, over 1 for a combined draw
+            footballsim.compile_penalties({"early": pre, "late": {**spec, "rates": {"run": 0.6}}})
+        with footballsim.config_overridden({"penalty.holding.rates": {"*": 0.0}}):
+            self.assertNotIn("holding", [p.name for p in footballsim.penalty_table("run", "post")[0]])
+        self.assertIn("holding", [p.name for p in footballsim.penalty_table("run", "post")[0]])
 
     def test_penalty_accounting(self):
         p = footballsim.PenaltyResult(True, "Offside on defense (+5)", +5, against_defense=True)
@@ -166,10 +256,14 @@ class TestPenaltiesAndStats(unittest.TestCase):
 
     def test_apply_post_play_penalty_for_spot_and_note(self):
         # Holding should return -10 and annotation
-        p = footballsim.PenaltyResult(False, "Offensive holding (-10)", -10, against_defense=False)
+        p = footballsim.PENALTY_TYPES["holding"].result()
         yards, note = footballsim.apply_post_play_penalty_for_spot_and_note(12, p, self.user_team, self.cpu_team, self.totals)
         self.assertEqual(yards, -10)
         self.assertIn("holding", note)
+        # End-of-play fouls are added to the play
+        p = footballsim.PENALTY_TYPES["face_mask"].result()
+        yards, note = footballsim.apply_post_play_penalty_for_spot_and_note(12, p, self.user_team, self.cpu_team, self.totals)
+        self.assertEqual((yards, note), (27, " (penalty: +15)"))
 
 
 # =========================
@@ -213,18 +307,13 @@ class TestPlaySimulators(unittest.TestCase):
 
     def test_simulate_run_tfl_and_big_play(self):
         # Force TFL
-        tfl_eff = footballsim.DEF_EFFECTS[self.def_form].copy()
-        tfl_eff["tfl_chance"] = 1.0
-        with patch.dict(footballsim.DEF_EFFECTS, {self.def_form: tfl_eff}):
+        with footballsim.config_overridden({f"{self.def_form}.tfl_chance": 1.0}):
             runner, yards, _, _ = footballsim.simulate_run(self.team, self.def_form)
         self.assertLess(yards, 0)
 
         # Force big play on non-TFL
-        bp_eff = footballsim.DEF_EFFECTS[self.def_form].copy()
-        bp_eff["tfl_chance"] = 0.0
-        bp_eff["run_big_play_chance"] = 1.0
-        bp_eff["run_big_play_bonus"] = (20, 20)
-        with patch.dict(footballsim.DEF_EFFECTS, {self.def_form: bp_eff}):
+        big_play = {"tfl_chance": 0.0, "run_big_play_chance": 1.0, "run_big_play_bonus": (20, 20)}
+        with footballsim.config_overridden({f"{self.def_form}.{k}": v for k, v in big_play.items()}):
             with patch('random.gauss', return_value=5):
                 runner2, yards2, _, _ = footballsim.simulate_run(self.team, self.def_form)
         self.assertGreaterEqual(yards2, 25)  # base ~5 + bonus 20
@@ -333,6 +422,15 @@ class TestStatsAndPrinting(unittest.TestCase):
         footballsim.update_pass_stats(stats, team, "J. Goff", "A. St. Brown", 0, False, False, False)
         self.assertEqual(stats[team]["J. Goff"].pass_yards, 0)
         self.assertEqual(stats[team]["J. Goff"].interceptions_thrown, 0)
+        self.assertNotIn("A. St. Brown", stats[team])
+
+    def test_update_pass_stats_touchdown_credits_both_ends(self):
+        stats = {}
+        footballsim.update_pass_stats(stats, "Packers", "J. Love", "C. Watson", 25, True, False, True)
+        self.assertEqual(stats["Packers"]["J. Love"].pass_touchdowns, 1)
+        self.assertEqual(stats["Packers"]["J. Love"].touchdowns, 0)
+        self.assertEqual(stats["Packers"]["C. Watson"].receptions, 1)
+        self.assertEqual(stats["Packers"]["C. Watson"].touchdowns, 1)
 
     def test_print_score(self):
         """Test scoreboard printing"""
@@ -642,6 +740,11 @@ class TestGameIntegration(unittest.TestCase):
         ctx = contextlib.ExitStack()
         ctx.enter_context(contextlib.redirect_stdout(buf))
         ctx.enter_context(patch('builtins.input', side_effect=inputs))
+        # Kickoffs are touchbacks and PATs good unless a test says otherwise, so drives
+        # start at O-25 and touchdowns are worth 7
+        ctx.enter_context(patch('footballsimpatch1.sample_kickoff',
+                                return_value=footballsim.KickoffOutcome("touchback", 25)))
+        ctx.enter_context(patch('footballsimpatch1.sample_pat', return_value=True))
         # Apply extra patches
         if patches:
             for p in patches:
@@ -660,7 +763,7 @@ class TestGameIntegration(unittest.TestCase):
             # SACK: -26 yards from O-25 -> safety
             return qb, wr1, -26, False, False, True, False
 
-        def no_penalty(offense, defense, is_pass):
+        def no_penalty(offense, defense, is_pass, **kwargs):
             return None  # No penalties
 
         out = self._run_game_with_inputs_and_patches(
@@ -778,10 +881,821 @@ class TestGameIntegration(unittest.TestCase):
         self.assertIn("FUMBLE! Defense recovers", out)
 
 
+# =========================
+# Unit tests: narration
+# =========================
+
+class TestNarration(unittest.TestCase):
+    def test_levels_gate_flags(self):
+        out = footballsim.Narrator("summary", footballsim.NullSink())
+        self.assertTrue(out.summary)
+        self.assertFalse(out.pbp)
+        self.assertFalse(out.debug)
+        out.set_level(footballsim.DEBUG)
+        self.assertTrue(out.pbp and out.debug)
+
+    def test_queue_sink_collects_messages(self):
+        sink = footballsim.QueueSink()
+        out = footballsim.Narrator(footballsim.SUMMARY, sink)
+        footballsim.print_score({"Packers": 7, "Bears": 3}, out)
+        lines = []
+        while not sink.queue.empty():
+            lines.append(sink.queue.get_nowait())
+        self.assertIn("Packers: 7", lines)
+
+    def test_file_sink_writes_lines(self):
+        import tempfile, os
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            out = footballsim.Narrator(footballsim.PLAY_BY_PLAY, footballsim.FileSink(path))
+            out.emit("First down!")
+            out.close()
+            with open(path, encoding="utf-8") as fh:
+                self.assertEqual(fh.read(), "First down!\n")
+        finally:
+            os.remove(path)
+
+    def test_summary_level_game_skips_play_by_play(self):
+        inputs = ["1", "2", "1", "run", "quit"]
+        sink = footballsim.QueueSink()
+
+        def patched_simulate_run(offense, defense_formation):
+            return footballsim.canonical_name(offense.roster["RB"]), 80, False, False
+
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf), \
+                patch('builtins.input', side_effect=inputs), \
+                patch('footballsimpatch1.simulate_run', side_effect=patched_simulate_run), \
+                patch('footballsimpatch1.sample_kickoff', return_value=footballsim.KickoffOutcome("touchback", 25)), \
+                patch('footballsimpatch1.maybe_penalty', return_value=None):
+            footballsim.game(narrator=footballsim.Narrator(footballsim.SUMMARY, sink))
+        narrated = []
+        while not sink.queue.empty():
+            narrated.append(sink.queue.get_nowait())
+        self.assertIn("TOUCHDOWN Packers!", narrated)
+        self.assertFalse(any(m.startswith("RUN:") for m in narrated))
+        self.assertNotIn("RUN:", buf.getvalue())
+
+    def test_silent_game_emits_nothing(self):
+        inputs = ["1", "2", "1", "run", "quit"]
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf), \
+                patch('builtins.input', side_effect=inputs), \
+                patch('footballsimpatch1.maybe_penalty', return_value=None):
+            footballsim.game(narrator=footballsim.silent_narrator())
+        self.assertNotIn("Computer defense shows", buf.getvalue())
+
+
+# =========================
+# Unit tests: game state snapshots
+# =========================
+
+class TestGameState(unittest.TestCase):
+    def _mid_game_state(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], user_receives=True)
+        st.ball_on, st.line_to_gain, st.down = 63, 70, 3
+        st.quarter, st.seconds_left = 2, 187
+        st.scoreboard["Packers"] = 10
+        st.timeouts["Bears"] = 1
+        footballsim.update_run_stats(st.stats, "Packers", "J. Jacobs", 44, td=True)
+        footballsim.update_pass_stats(st.stats, "Bears", "C. Williams", "D. Moore", 31, True, False, False)
+        st.tendencies_user.push("run"); st.tendencies_cpu.push("punt")
+        return st
+
+    def test_round_trip_without_rng_is_compact(self):
+        st = self._mid_game_state()
+        data = st.to_bytes()
+        self.assertLess(len(data), 400)
+        back = footballsim.GameState.from_bytes(data)
+        self.assertIs(back.offense, back.user_team)
+        self.assertEqual((back.ball_on, back.line_to_gain, back.down, back.quarter, back.seconds_left), (63, 70, 3, 2, 187))
+        self.assertEqual(back.scoreboard, st.scoreboard)
+        self.assertEqual(back.timeouts, st.timeouts)
+        self.assertEqual(back.stats["Packers"]["J. Jacobs"].rush_yards, 44)
+        self.assertEqual(back.stats["Bears"]["D. Moore"].rec_yards, 31)
+        self.assertEqual(back.stats["Bears"]["D. Moore"].receptions, 1)
+        self.assertEqual(back.tendencies_cpu.recent_offense_calls, ["punt"])
+        self.assertIsNone(back.rng_state)
+
+    def test_snapshot_restores_rng_stream(self):
+        st = self._mid_game_state()
+        snap = footballsim.GameState.from_bytes(st.snapshot().to_bytes())
+        expected = [footballsim.random.random() for _ in range(5)]
+        snap.restore_rng()
+        self.assertEqual([footballsim.random.random() for _ in range(5)], expected)
+
+    def test_copy_is_independent(self):
+        st = self._mid_game_state()
+        cp = st.copy()
+        cp.scoreboard["Packers"] += 7
+        cp.stats["Packers"]["J. Jacobs"].rush_yards += 5
+        self.assertEqual(st.scoreboard["Packers"], 10)
+        self.assertEqual(st.stats["Packers"]["J. Jacobs"].rush_yards, 44)
+
+    def test_team_totals_round_trip(self):
+        st = self._mid_game_state()
+        footballsim.tally_play(st, 6)
+        footballsim.tally_pass(st, 12, completed=True, sacked=False)
+        footballsim.tally_pass(st, -7, completed=False, sacked=True)
+        footballsim.tally_pass(st, 0, completed=False, sacked=False)
+        back = footballsim.GameState.from_bytes(st.to_bytes())
+        t = back.totals["Packers"]
+        self.assertEqual((t.plays, t.yards, t.pass_attempts, t.completions), (4, 11, 2, 1))
+        self.assertEqual(back.totals["Bears"].plays, 0)
+
+    def test_config_overridden_restores(self):
+        before = footballsim.DEF_EFFECTS["Nickel"]["pass_mean"]
+        with footballsim.config_overridden({"*.pass_mean": 99}):
+            self.assertTrue(all(e["pass_mean"] == 99 for e in footballsim.DEF_EFFECTS.values()))
+        self.assertEqual(footballsim.DEF_EFFECTS["Nickel"]["pass_mean"], before)
+        with self.assertRaises(ValueError):
+            with footballsim.config_overridden({"Nickel.no_such_param": 1}):
+                pass
+
+    def test_config_generation_moves_only_on_changes(self):
+        gen = footballsim.config_generation()
+        with footballsim.config_overridden({}):
+            pass
+        self.assertEqual(footballsim.config_generation(), gen)
+        with footballsim.config_overridden({"*.pass_mean": 12}):
+            self.assertGreater(footballsim.config_generation(), gen)
+
+    def test_config_overrides_reach_compiled_formations(self):
+        with footballsim.config_overridden({"*.pass_mean": 11}):
+            self.assertTrue(all(f.pass_mean == 11 for f in footballsim.FORMATIONS.values()))
+        self.assertEqual(footballsim.FORMATIONS["Nickel"].pass_mean, footballsim.DEF_EFFECTS["Nickel"]["pass_mean"])
+        with self.assertRaises(ValueError):
+            with footballsim.config_overridden({"Nickel.tfl_chance": 1.5}):
+                pass
+        self.assertEqual(footballsim.DEF_EFFECTS["Nickel"]["tfl_chance"], 0.07)
+        self.assertEqual(footballsim.FORMATIONS["Nickel"].tfl_chance, 0.07)
+
+    def test_formation_records_are_frozen_and_validated(self):
+        nickel = footballsim.FORMATIONS["Nickel"]
+        self.assertFalse(hasattr(nickel, "__dict__"))
+        with self.assertRaises(AttributeError):
+            nickel.pass_mean = 3
+        good = dict(footballsim.DEF_EFFECTS["Nickel"])
+        for bad in ({"pass_mean": "8"}, {"run_big_play_bonus": (35, 15)}, {"tfl_chance": True},
+                    {"sack_adj": float("nan")}, {"extra": 1}):
+            with self.assertRaises(ValueError, msg=bad):
+                footballsim.compile_formation("Custom", {**good, **bad})
+        missing = dict(good)
+        del missing["sack_adj"]
+        with self.assertRaises(ValueError):
+            footballsim.register_formation("Custom", missing)
+        self.assertNotIn("Custom", footballsim.DEF_CHOICES)
+
+    def test_register_formation(self):
+        effects = dict(footballsim.DEF_EFFECTS["4-3 Base"], run_mean=1.5, run_big_play_bonus=[10, 20])
+        try:
+            footballsim.register_formation("46 Bear", effects)
+            self.assertEqual(footballsim.DEF_CHOICES[-1], "46 Bear")
+            self.assertEqual(footballsim.FORMATIONS["46 Bear"].run_big_play_bonus, (10, 20))
+            self.assertEqual(len(footballsim.sample_batch("run", footballsim.TEAMS[0], "46 Bear", 5)), 5)
+        finally:
+            footballsim.DEF_EFFECTS.pop("46 Bear", None)
+            footballsim.FORMATIONS.pop("46 Bear", None)
+            if "46 Bear" in footballsim.DEF_CHOICES:
+                footballsim.DEF_CHOICES.remove("46 Bear")
+
+    def test_pass_baseline_clamps_are_config(self):
+        with footballsim.config_overridden({"pass_baseline.comp_max": 0.60}):
+            self.assertEqual(footballsim.get_team_pass_baselines("Lions")[0], 0.60)
+        self.assertAlmostEqual(footballsim.get_team_pass_baselines("Lions")[0], 0.683)
+
+    def test_apply_config_validates_before_applying(self):
+        before = footballsim.export_config()
+        bad = {"def_effects": {"Nickel": {"pass_mean": 1}, "Wishbone": {"run_mean": 9}}}
+        with self.assertRaises(ValueError):
+            footballsim.apply_config(bad)
+        self.assertEqual(footballsim.export_config(), before)
+
+    def test_rejects_unknown_team(self):
+        custom = footballsim.Team("Expansion", dict(footballsim.TEAMS[0].roster))
+        st = footballsim.GameState.new(custom, footballsim.TEAMS[1], user_receives=True)
+        with self.assertRaises(ValueError):
+            st.to_bytes()
+
+    def test_resume_saved_game(self):
+        st = self._mid_game_state()
+        buf = io.StringIO()
+        with contextlib.redirect_stdout(buf), patch('builtins.input', side_effect=["quit"]):
+            final = footballsim.game(state=st)
+        self.assertIn("Resuming", buf.getvalue())
+        self.assertIn("Q2 03:07 | Packers ball | 3 & 7 at O-63", buf.getvalue())
+        self.assertIs(final, st)
+
+
+# =========================
+# Unit tests: what-if explorer
+# =========================
+
+class TestWhatIfExplorer(unittest.TestCase):
+    def _fourth_down(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], user_receives=True)
+        st.ball_on, st.line_to_gain, st.down = 70, 72, 4
+        st.quarter, st.seconds_left = 4, 40
+        st.scoreboard["Bears"] = 3
+        return st
+
+    def test_punt_and_fg_drive_points(self):
+        st = self._fourth_down()
+        with patch('footballsimpatch1.field_goal_success_prob', return_value=1.0):
+            res = footballsim.explore_calls(st, calls=["punt", "fg"], k=40, seed=7, workers=1, horizon="drive")
+        self.assertEqual(res["punt"].drive_points, {0: 40})
+        self.assertEqual(res["fg"].drive_points, {3: 40})
+        self.assertIsNone(res["fg"].win_prob)
+
+    def test_game_horizon_is_seeded_and_leaves_global_rng_alone(self):
+        st = self._fourth_down()
+        before = footballsim.random.getstate()
+        a = footballsim.explore_calls(st, calls=["run", "deep"], k=30, seed=11, workers=1)
+        b = footballsim.explore_calls(st, calls=["run", "deep"], k=30, seed=11, workers=1)
+        self.assertEqual(footballsim.random.getstate(), before)
+        for call in ("run", "deep"):
+            self.assertEqual(a[call].trials, 30)
+            self.assertEqual(a[call].wins, b[call].wins)
+            self.assertTrue(0.0 <= a[call].win_prob <= 1.0)
+        # Original state is never advanced
+        self.assertEqual((st.down, st.ball_on, st.seconds_left), (4, 70, 40))
+
+    def test_rejects_unknown_horizon(self):
+        with self.assertRaises(ValueError):
+            footballsim.explore_calls(self._fourth_down(), k=1, workers=1, horizon="season")
+
+    def test_menu_plays_out_the_drive_and_reports_k(self):
+        st = self._fourth_down()
+        res = {"run": footballsim.CallOutcome("run", trials=footballsim.WHATIF_MENU_TRIALS, drive_points={0: 1})}
+        with patch('footballsimpatch1.explore_calls', return_value=res) as explore, \
+                patch('builtins.input', side_effect=["whatif", "quit"]), \
+                patch('sys.stdout', new_callable=io.StringIO) as out:
+            footballsim.game(narrator=footballsim.silent_narrator(), state=st)
+        explore.assert_called_once_with(st, k=footballsim.WHATIF_MENU_TRIALS, horizon="drive")
+        self.assertIn(f"plays out the drive, k={footballsim.WHATIF_MENU_TRIALS} per call", out.getvalue())
+
+
+# =========================
+# Unit tests: record & replay
+# =========================
+
+class TestRecordReplay(unittest.TestCase):
+    def _drain(self, sink):
+        lines = []
+        while not sink.queue.empty():
+            lines.append(sink.queue.get_nowait())
+        return lines
+
+    def test_interactive_game_replays_play_by_play(self):
+        live_sink = footballsim.QueueSink()
+        buf = io.StringIO()
+        inputs = ["1", " 2", "1", "run", "PASS", "bad", "deep", "stats", "run", "quit"]
+        with contextlib.redirect_stdout(buf), patch('builtins.input', side_effect=inputs):
+            live, rec = footballsim.record_game(footballsim.Narrator(footballsim.PLAY_BY_PLAY, live_sink), seed=1234)
+        self.assertEqual(rec.decisions[:3], ["1", "2", "1"])
+        self.assertIn("bad", rec.decisions)
+
+        back = footballsim.GameRecord.from_bytes(rec.to_bytes())
+        self.assertEqual(back, rec)
+        replay_sink = footballsim.QueueSink()
+        replayed = footballsim.replay_game(back, footballsim.Narrator(footballsim.PLAY_BY_PLAY, replay_sink))
+        self.assertEqual(self._drain(replay_sink), self._drain(live_sink))
+        self.assertEqual(replayed.scoreboard, live.scoreboard)
+        self.assertEqual(replayed.stats, live.stats)
+
+    def test_simulated_game_record_is_tiny_and_exact(self):
+        live, rec = footballsim.record_simulated_game(footballsim.TEAMS[2], footballsim.TEAMS[30], seed=99)
+        data = rec.to_bytes()
+        self.assertLess(len(data), 40)
+        replayed = footballsim.replay_game(footballsim.GameRecord.from_bytes(data))
+        self.assertEqual(replayed.scoreboard, live.scoreboard)
+        self.assertEqual(replayed.stats, live.stats)
+        self.assertTrue(replayed.game_over())
+
+    def test_replay_rejects_other_engine_version_and_divergence(self):
+        _, rec = footballsim.record_simulated_game(footballsim.TEAMS[0], footballsim.TEAMS[1], seed=5)
+        with self.assertRaises(ValueError):
+            footballsim.replay_game(footballsim.GameRecord(rec.seed, "0.0", rec.decisions, rec.mode, rec.checksum))
+        with self.assertRaises(ValueError):
+            footballsim.replay_game(footballsim.GameRecord(rec.seed + 1, rec.engine_version, rec.decisions,
+                                                           rec.mode, rec.checksum))
+
+
+# =========================
+# Unit tests: play resolution pipeline
+# =========================
+
+class TestPlayResolution(unittest.TestCase):
+    def _state(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], user_receives=True)
+        st.ball_on, st.line_to_gain = 90, 100
+        return st
+
+    def test_completion_touchdown_credits_passer_and_receiver(self):
+        st = self._state()
+        o = footballsim.PlayOutcome("pass", "J. Love", "C. Watson", 25, completed=True)
+        with patch('footballsimpatch1.maybe_penalty', return_value=None), \
+                patch('footballsimpatch1.sample_pat', return_value=True):
+            footballsim.apply_play(st, o, "Nickel", footballsim.silent_narrator())
+        self.assertEqual(st.scoreboard["Packers"], 7)
+        self.assertEqual(st.stats["Packers"]["C. Watson"].rec_yards, 10)  # capped at the goal line
+        self.assertEqual(st.stats["Packers"]["C. Watson"].touchdowns, 1)
+        self.assertEqual(st.stats["Packers"]["J. Love"].pass_yards, 10)
+        self.assertEqual(st.stats["Packers"]["J. Love"].pass_touchdowns, 1)
+        self.assertEqual(st.stats["Packers"]["C. Watson"].receptions, 1)
+        self.assertIs(st.offense, st.cpu_team)
+
+    def test_deep_interception_narration_and_turnover(self):
+        st = self._state()
+        out = footballsim.Narrator(footballsim.PLAY_BY_PLAY, footballsim.QueueSink())
+        o = footballsim.PlayOutcome("deep", "J. Love", "C. Watson", 0, intercepted=True)
+        footballsim.apply_play(st, o, "Dime", out, user_defending=True)
+        lines = list(out.sink.queue.queue)
+        self.assertIn("DEEP PASS: J. Love throws an INTERCEPTION vs your Dime!", lines)
+        self.assertEqual(st.stats["Packers"]["J. Love"].interceptions_thrown, 1)
+        self.assertIs(st.offense, st.cpu_team)
+
+    def test_user_pass_lets_simulator_pick_receiver(self):
+        st = self._state()
+        st.ball_on, st.line_to_gain = 30, 40
+        with patch('footballsimpatch1.simulate_pass', return_value=("J. Love", "T. Kraft", 0, False, False, False, False)) as sim, \
+             patch('footballsimpatch1.ai_choose_target') as ai_target:
+            footballsim.resolve_snap(st, "pass", "Nickel", footballsim.silent_narrator(), pick_target=False)
+        ai_target.assert_not_called()
+        self.assertIsNone(sim.call_args[0][2])
+        self.assertEqual(st.down, 2)
+
+    def test_unknown_call_rejected(self):
+        with self.assertRaises(ValueError):
+            footballsim.resolve_snap(self._state(), "flea-flicker", "Nickel", footballsim.silent_narrator())
+
+
+class TestPlayTypes(unittest.TestCase):
+    def test_every_scrimmage_call_is_registered(self):
+        for call in footballsim.OFFENSE_CALLS:
+            self.assertTrue(call in footballsim.PLAY_TYPES or call in footballsim.SPECIAL_CALLS, call)
+        for pt in footballsim.PLAY_TYPES.values():
+            for name in pt.effect_fields:
+                self.assertIn(name, footballsim.DEF_EFFECTS["Nickel"], (pt.name, name))
+
+    def test_sample_batch(self):
+        team = footballsim.TEAMS[0]
+        for call in ("screen", "playaction", "sneak", "draw"):
+            outcomes = footballsim.sample_batch(call, team, "Blitz", 50)
+            self.assertEqual(len(outcomes), 50)
+            self.assertTrue(all(o.call == call for o in outcomes))
+        self.assertTrue(all(o.player == "J. Love" and -1 <= o.yards <= 4
+                            for o in footballsim.sample_batch("sneak", team, "Goal Line", 200)))
+
+    def test_sneak_resolves_and_narrates(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], user_receives=True)
+        st.ball_on, st.line_to_gain, st.down = 40, 41, 3
+        out = footballsim.Narrator(footballsim.PLAY_BY_PLAY, footballsim.QueueSink())
+        with patch('footballsimpatch1.maybe_penalty', return_value=None), \
+             patch('footballsimpatch1.roll_sneak', return_value=footballsim.PlayOutcome("sneak", "J. Love", None, 2)):
+            footballsim.resolve_snap(st, "sneak", "Goal Line", out)
+        self.assertTrue(any(line.startswith("QB SNEAK:") for line in out.sink.queue.queue))
+        self.assertEqual((st.ball_on, st.down), (42, 1))
+        self.assertEqual(st.stats["Packers"]["J. Love"].rush_yards, 2)
+
+    def test_register_play_type_round_trips_tendencies(self):
+        saved_calls = footballsim.OFFENSE_CALLS
+        pt = footballsim.PlayType("fade", "pass", footballsim.PLAY_TYPES["deep"].params,
+                                  footballsim.PLAY_TYPES["deep"].roll, (),
+                                  footballsim.PlayText("FADE", "SACK", "", "the fade"), clock="pass")
+        try:
+            footballsim.register_play_type(pt)
+            self.assertEqual(footballsim.OFFENSE_CALLS[-1], "fade")
+            t = footballsim.Tendencies(recent_offense_calls=["fade", "sneak", "run"])
+            buf = footballsim._pack_tendencies(t)
+            self.assertEqual(footballsim._unpack_tendencies(buf, 0).recent_offense_calls, ["fade", "sneak", "run"])
+            self.assertAlmostEqual(t.run_ratio(), 2 / 3)
+        finally:
+            footballsim.PLAY_TYPES.pop("fade", None)
+            footballsim._CALL_CODE.pop("fade", None)
+            footballsim.OFFENSE_CALLS = saved_calls
+
+    def test_register_play_type_rejects_unknown_kind(self):
+        pt = footballsim.PlayType("kneel", "clock", None, None, (), footballsim.PlayText("KNEEL", "", "", ""))
+        with self.assertRaises(ValueError):
+            footballsim.register_play_type(pt)
+
+    def test_user_and_ai_choose_new_plays(self):
+        self.assertEqual(footballsim.user_offense_choice(ask=lambda _: "Screen", show=lambda *a: None), "screen")
+        calls = {footballsim.ai_choose_offense(1, 3, 50, 900, 0) for _ in range(200)}
+        self.assertIn("sneak", calls)
+        self.assertLessEqual(calls, set(footballsim.AI_OFFENSE_MIX["short"][0]))
+
+
+class TestClock(unittest.TestCase):
+    def _state(self, quarter, seconds_left, lead=0):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], user_receives=True)
+        st.quarter, st.seconds_left = quarter, seconds_left
+        st.ball_on, st.line_to_gain = 40, 50
+        st.scoreboard["Packers"] = max(0, lead)
+        st.scoreboard["Bears"] = max(0, -lead)
+        return st
+
+    def test_runoff_tables(self):
+        for key, (low, _, high) in footballsim.PLAY_SECONDS.items():
+            draws = {footballsim.draw_seconds(footballsim._PLAY_CLOCK[key]) for _ in range(300)}
+            self.assertTrue(all(low <= d <= high for d in draws), key)
+        with patch('random.random', return_value=0.0):
+            self.assertEqual(footballsim.draw_seconds(footballsim._BETWEEN_CLOCK[("running", "milk")]), 34)
+
+    def test_tempo_follows_score_late_in_halves(self):
+        self.assertEqual(footballsim.clock_tempo(self._state(1, 60, lead=-7)), "normal")
+        self.assertEqual(footballsim.clock_tempo(self._state(2, 100, lead=7)), "hurry_up")
+        self.assertEqual(footballsim.clock_tempo(self._state(4, 250, lead=-3)), "hurry_up")
+        self.assertEqual(footballsim.clock_tempo(self._state(4, 250, lead=3)), "milk")
+        self.assertEqual(footballsim.clock_tempo(self._state(4, 250)), "normal")
+
+    def test_incompletion_and_late_out_of_bounds_stop_the_clock(self):
+        out = footballsim.silent_narrator()
+        st = self._state(1, 600)
+        footballsim.advance_clock(st, "pass", False, out)
+        self.assertTrue(591 <= st.seconds_left <= 596)
+        self.assertFalse(st.clock_running)
+        st = self._state(2, 100)
+        st.timeouts["Packers"] = 0
+        with patch.dict(footballsim.OUT_OF_BOUNDS, {("run", "hurry_up"): 1.0}):
+            footballsim.advance_clock(st, "run", True, out)
+        self.assertTrue(92 <= st.seconds_left <= 97)
+        self.assertFalse(st.clock_running)
+
+    def test_two_minute_warning(self):
+        st = self._state(4, 130)
+        out = footballsim.Narrator(footballsim.PLAY_BY_PLAY, footballsim.QueueSink())
+        with patch.dict(footballsim.OUT_OF_BOUNDS, {("run", "normal"): 0.0}):
+            footballsim.advance_clock(st, "run", True, out)
+        self.assertEqual(st.seconds_left, 120)
+        self.assertIn("Two-minute warning.", list(out.sink.queue.queue))
+
+    def test_ai_timeouts(self):
+        out = footballsim.silent_narrator()
+        st = self._state(4, 90, lead=-4)  # offense hurrying
+        with patch.dict(footballsim.OUT_OF_BOUNDS, {("pass", "hurry_up"): 0.0}):
+            footballsim.advance_clock(st, "pass", True, out)
+        self.assertEqual(st.timeouts["Packers"], 2)
+        self.assertTrue(81 <= st.seconds_left <= 86)
+        st = self._state(4, 200, lead=4)  # offense milking, defense behind
+        with patch.dict(footballsim.OUT_OF_BOUNDS, {("run", "milk"): 0.0}):
+            footballsim.advance_clock(st, "run", True, out)
+        self.assertEqual(st.timeouts["Bears"], 2)
+        self.assertFalse(st.clock_running)
+
+    def test_game_never_spends_the_users_timeouts(self):
+        def play(st, inputs):
+            answers = iter(inputs)
+            with patch('footballsimpatch1.maybe_penalty', return_value=None), \
+                    patch('footballsimpatch1.ai_choose_offense', return_value="run"), \
+                    patch.dict(footballsim.OUT_OF_BOUNDS, {("run", "milk"): 0.0, ("run", "hurry_up"): 0.0}):
+                footballsim.game(narrator=footballsim.silent_narrator(), state=st, seed=1,
+                                 ask=lambda prompt: next(answers), menus=False)
+            return st.timeouts["Packers"]
+
+        # On defense and behind while the CPU milks the clock
+        st = self._state(4, 200, lead=-4)
+        st.offense, st.defense = st.cpu_team, st.user_team
+        self.assertEqual(play(st, ["1", "1", "quit"]), 3)
+        self.assertEqual(play(st, ["timeout", "quit"]), 2)
+        # On offense in the two-minute drill
+        st = self._state(4, 100, lead=-4)
+        self.assertEqual(play(st, ["run", "run", "quit"]), 3)
+
+    def test_kneel_and_spike_calls(self):
+        st = self._state(4, 100, lead=3)
+        st.timeouts["Bears"] = 0
+        self.assertEqual(footballsim.ai_clock_call(st), "kneel")
+        st.timeouts["Bears"] = 3
+        self.assertIsNone(footballsim.ai_clock_call(st))
+        st = self._state(4, 40, lead=-3)
+        st.timeouts["Packers"], st.clock_running = 0, True
+        self.assertEqual(footballsim.ai_clock_call(st), "spike")
+        st.timeouts["Packers"] = 1
+        self.assertIsNone(footballsim.ai_clock_call(st))
+
+    def test_kneel_and_spike_resolve(self):
+        out = footballsim.silent_narrator()
+        st = self._state(4, 100, lead=3)
+        footballsim.resolve_snap(st, "kneel", "4-3 Base", out)
+        self.assertEqual((st.ball_on, st.down, st.timeouts["Bears"]), (39, 2, 2))  # the defense stops it
+        self.assertTrue(97 <= st.seconds_left <= 99)
+        st.timeouts["Bears"] = 0
+        footballsim.resolve_snap(st, "kneel", "4-3 Base", out)
+        self.assertLessEqual(st.seconds_left, 99 - 35)
+        st = self._state(4, 40, lead=-3)
+        footballsim.resolve_snap(st, "spike", "Prevent", out)
+        self.assertEqual((st.ball_on, st.down, st.totals["Packers"].pass_attempts), (40, 2, 1))
+        self.assertTrue(37 <= st.seconds_left <= 39)
+        self.assertFalse(st.clock_running)
+
+    def test_ai_snap_passes_deficit_as_score_trail(self):
+        st = self._state(4, 80, lead=-6)
+        with patch('footballsimpatch1.ai_choose_offense', return_value="pass") as choose, \
+             patch('footballsimpatch1.resolve_snap'):
+            footballsim.ai_snap(st, footballsim.silent_narrator())
+        self.assertEqual(choose.call_args[0][4:], (6, 4))
+
+    def test_clock_running_round_trips(self):
+        st = self._state(2, 50)
+        st.clock_running = st.user_controlled = True
+        back = footballsim.GameState.from_bytes(st.to_bytes())
+        self.assertTrue(back.clock_running)
+        self.assertTrue(back.user_controlled)
+
+    def test_whatif_lets_the_ai_call_both_teams_timeouts(self):
+        st = self._state(4, 100, lead=-4)
+
+        def explore(controlled):
+            st.user_controlled = controlled
+            return footballsim.explore_calls(st, calls=["run"], k=20, seed=3, workers=1)["run"]
+
+        a, b = explore(False), explore(True)
+        self.assertEqual((a.wins, a.drive_points), (b.wins, b.drive_points))
+        self.assertTrue(st.user_controlled)
+
+
+# =========================
+# Unit tests: profiling
+# =========================
+
+class TestKickoffs(unittest.TestCase):
+    def _state(self):
+        return footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], True)
+
+    def test_batch_matches_scalar_distribution(self):
+        footballsim.random.seed(11)
+        batch = footballsim.kickoff_batch(300)
+        footballsim.random.seed(11)
+        scalar = [footballsim.sample_kickoff() for _ in range(300)]
+        self.assertEqual(batch, scalar)
+        results = {k.result for k in batch}
+        self.assertIn("touchback", results)
+        self.assertIn("return", results)
+        self.assertTrue(all(1 <= k.spot <= 100 for k in batch))
+
+    def test_onside_outcomes(self):
+        footballsim.random.seed(2)
+        batch = footballsim.kickoff_batch(200, onside=True)
+        self.assertTrue({k.result for k in batch} <= {"onside_recovered", "onside_failed"})
+        self.assertTrue(all(50 <= k.spot <= 60 for k in batch))
+
+    def test_ai_onside_kick(self):
+        self.assertFalse(footballsim.ai_onside_kick(3, 60, 7))
+        self.assertFalse(footballsim.ai_onside_kick(4, 60, 0))
+        self.assertTrue(footballsim.ai_onside_kick(4, 90, 7))
+        self.assertFalse(footballsim.ai_onside_kick(4, 240, 7))
+        self.assertTrue(footballsim.ai_onside_kick(4, 240, 14))
+
+    def test_return_touchdown_scores_and_rekicks(self):
+        st = self._state()
+        st.offense, st.defense = st.cpu_team, st.user_team
+        seq = [footballsim.KickoffOutcome("return_td", 100, 97), footballsim.KickoffOutcome("return", 30, 25)]
+        with patch('footballsimpatch1.sample_kickoff', side_effect=seq), contextlib.redirect_stdout(io.StringIO()):
+            footballsim.kick_off(st, st.cpu_team, footballsim.Narrator())
+        self.assertEqual(st.scoreboard[st.user_team.name], 7)
+        # The scoring team kicks back off to the CPU
+        self.assertIs(st.offense, st.cpu_team)
+        self.assertEqual(st.ball_on, 30)
+
+    def test_muff_gives_kicking_team_the_ball(self):
+        st = self._state()
+        muff = footballsim.KickoffOutcome("muff", 6)
+        with patch('footballsimpatch1.sample_kickoff', return_value=muff), contextlib.redirect_stdout(io.StringIO()):
+            footballsim.kick_off(st, st.cpu_team, footballsim.Narrator())
+        self.assertIs(st.offense, st.cpu_team)
+        self.assertEqual(st.ball_on, 94)
+        self.assertEqual((st.down, st.line_to_gain), (1, 100))
+
+
+class TestConversions(unittest.TestCase):
+    def test_chart_key_margins(self):
+        # Late: down 2 after the touchdown goes for the tie, up 1 goes for a field-goal lead
+        self.assertTrue(footballsim.ai_go_for_two(-2, 90))
+        self.assertTrue(footballsim.ai_go_for_two(1, 90))
+        self.assertFalse(footballsim.ai_go_for_two(0, 90))
+        self.assertFalse(footballsim.ai_go_for_two(-1, 90))
+        self.assertFalse(footballsim.ai_go_for_two(40, 90))
+        chart = footballsim.conversion_chart()
+        self.assertEqual(len(chart), (footballsim.QUARTERS * footballsim.SECS_PER_Q // 60 + 1)
+                         * (2 * footballsim.CHART_MARGIN + 1))
+
+    def test_chart_is_rebuilt_from_the_conversion_rates(self):
+        self.assertTrue(footballsim.ai_go_for_two(-2, 60))
+        self.addCleanup(footballsim.clear_table_caches)
+        with patch.dict(footballsim.CONVERSIONS, {"two_point": 0.0}):
+            footballsim.clear_table_caches()
+            self.assertFalse(footballsim.ai_go_for_two(-2, 60))
+
+    def _score(self, cpu_points, patches):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], True)
+        st.quarter, st.seconds_left = 4, 60
+        st.scoreboard[st.cpu_team.name] = cpu_points
+        with contextlib.ExitStack() as ctx:
+            for p in patches:
+                ctx.enter_context(p)
+            ctx.enter_context(contextlib.redirect_stdout(io.StringIO()))
+            footballsim.score_touchdown(st, st.user_team, footballsim.Narrator())
+        return st.scoreboard[st.user_team.name]
+
+    def test_missed_pat_scores_six(self):
+        self.assertEqual(self._score(0, [patch('footballsimpatch1.sample_pat', return_value=False)]), 6)
+        self.assertEqual(self._score(0, [patch('footballsimpatch1.sample_pat', return_value=True)]), 7)
+
+    def test_two_point_try_when_chart_says(self):
+        two = patch('footballsimpatch1.sample_two_point', return_value=True)
+        pat = patch('footballsimpatch1.sample_pat', side_effect=AssertionError("kicked"))
+        # Down 8 before the touchdown: 6 makes it -2, so go for two
+        self.assertEqual(self._score(8, [two, pat]), 8)
+
+
+class TestOvertime(unittest.TestCase):
+    def _end_of_regulation(self, overtime="regular", user=17, cpu=17):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], True, overtime)
+        st.quarter, st.seconds_left = footballsim.QUARTERS, 1
+        st.scoreboard[st.user_team.name], st.scoreboard[st.cpu_team.name] = user, cpu
+        touchback = footballsim.KickoffOutcome("touchback", 25)
+        with patch('footballsimpatch1.sample_kickoff', return_value=touchback):
+            footballsim.advance_clock(st, "run", False, footballsim.silent_narrator())
+        return st
+
+    def _in_overtime(self, overtime, possessions):
+        st = self._end_of_regulation(overtime)
+        st.ot_possessions = possessions
+        return st
+
+    def test_tie_starts_overtime_period(self):
+        st = self._end_of_regulation()
+        self.assertTrue(st.in_overtime())
+        self.assertFalse(st.game_over())
+        self.assertEqual(st.seconds_left, 600)
+        self.assertEqual(set(st.timeouts.values()), {2})
+        self.assertEqual((st.ball_on, st.down), (25, 1))
+        self.assertEqual(footballsim.period_label(st.quarter), "OT")
+
+    def test_no_overtime_when_decided_or_disabled(self):
+        self.assertTrue(self._end_of_regulation(user=20).game_over())
+        st = self._end_of_regulation(overtime=None)
+        self.assertTrue(st.game_over())
+        self.assertFalse(st.in_overtime())
+
+    def test_regular_season_opening_field_goal_is_not_enough(self):
+        out = footballsim.silent_narrator()
+        st = self._in_overtime("regular", 1)
+        st.scoreboard[st.user_team.name] += 3
+        self.assertFalse(footballsim.overtime_score(st, st.user_team, out, field_goal=True))
+        st.scoreboard[st.user_team.name] += 4
+        self.assertTrue(footballsim.overtime_score(st, st.user_team, out))
+        self.assertTrue(st.game_over())
+
+    def test_playoff_guarantees_a_possession(self):
+        out = footballsim.silent_narrator()
+        st = self._in_overtime("playoff", 1)
+        st.scoreboard[st.user_team.name] += 7
+        self.assertFalse(footballsim.overtime_score(st, st.user_team, out))
+        # After both sides have had the ball, any lead ends it
+        st.ot_possessions = 3
+        st.scoreboard[st.cpu_team.name] += 10
+        self.assertTrue(footballsim.overtime_score(st, st.cpu_team, out, field_goal=True))
+
+    def test_playoff_periods_continue_until_someone_wins(self):
+        st = self._in_overtime("playoff", 3)
+        st.seconds_left = 1
+        offense, ball_on = st.offense, st.ball_on
+        footballsim.advance_clock(st, "run", False, footballsim.silent_narrator())
+        self.assertEqual(st.quarter, footballsim.QUARTERS + 2)
+        self.assertEqual(st.seconds_left, 900)
+        self.assertIs(st.offense, offense)
+        self.assertEqual(st.ball_on, ball_on)
+
+    def test_state_round_trip_and_validation(self):
+        st = self._in_overtime("playoff", 2)
+        back = footballsim.GameState.from_bytes(st.to_bytes())
+        self.assertEqual((back.overtime, back.ot_possessions, back.quarter), ("playoff", 2, st.quarter))
+        with self.assertRaises(ValueError):
+            footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], True, "college")
+
+
+class TestProfiling(unittest.TestCase):
+    def test_records_phases_and_restores_functions(self):
+        original = footballsim.sample_play
+        out = footballsim.Narrator(footballsim.PLAY_BY_PLAY, footballsim.QueueSink())
+        with footballsim.PhaseProfiler() as prof:
+            self.assertIsNot(footballsim.sample_play, original)
+            footballsim.simulate_game(footballsim.TEAMS[0], footballsim.TEAMS[1], seed=3, narrator=out)
+        self.assertIs(footballsim.sample_play, original)
+        self.assertFalse(hasattr(footballsim.Narrator.emit, "__wrapped__"))
+        phases = prof.report()["phases"]
+        for phase in ("policy", "penalty", "play", "stats", "clock", "narration"):
+            self.assertGreater(phases[phase]["calls"], 0, phase)
+        self.assertLessEqual(sum(p["self_ns"] for p in phases.values()), prof.wall_ns)
+
+    def test_collapsed_stack_format(self):
+        with footballsim.PhaseProfiler() as prof:
+            footballsim.simulate_game(footballsim.TEAMS[2], footballsim.TEAMS[3], seed=4)
+        for line in prof.collapsed().splitlines():
+            stack, value = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("game"))
+            self.assertTrue(value.isdigit())
+        self.assertIn('"phases"', prof.to_json())
+
+    def test_only_one_profiler_at_a_time(self):
+        with footballsim.PhaseProfiler():
+            with self.assertRaises(RuntimeError):
+                footballsim.PhaseProfiler().enable()
+
+
 # =========================
 # Suite & Runner
 # =========================
 
+class TestVarianceReduction(unittest.TestCase):
+    def test_expected_rounded_yards_matches_brute_force(self):
+        nd = footballsim.NormalDist(4.0, 6.0)
+        brute = sum(min(60, max(-12, k)) * (nd.cdf(k + 0.5) - nd.cdf(k - 0.5)) for k in range(-200, 200))
+        self.assertAlmostEqual(footballsim.expected_rounded_yards(4.0, 6.0, -12, 60), brute, places=6)
+
+    def test_expected_matches_sampled_plays(self):
+        footballsim.random.seed(11)
+        offense, n = footballsim.TEAMS[4], 6000
+        for name, pt in footballsim.PLAY_TYPES.items():
+            yards, turnover = pt.expected(pt.params(offense, "Nickel"))
+            outs = footballsim.sample_batch(name, offense, "Nickel", n, pick_target=False)
+            ys = [o.yards for o in outs]
+            mean = sum(ys) / n
+            se = (sum((y - mean) ** 2 for y in ys) / (n - 1) / n) ** 0.5
+            self.assertLess(abs(mean - yards), 4 * se + 0.01, name)
+            lost = sum(1 for o in outs if o.intercepted or o.fumble_lost) / n
+            self.assertLess(abs(lost - turnover), 4 * (turnover / n) ** 0.5 + 0.002, name)
+
+    def test_antithetic_draws_mirror_the_plain_stream(self):
+        plain, mirror = footballsim.random.Random(5), footballsim.AntitheticRandom(5)
+        self.assertAlmostEqual(plain.random() + mirror.random(), 1.0)
+        self.assertAlmostEqual(plain.gauss(10, 3) + mirror.gauss(10, 3), 20.0)
+        self.assertEqual(plain.randint(1, 5) + mirror.randint(1, 5), 6)
+        before = footballsim.random
+        with footballsim.draws_from(footballsim.AntitheticRandom()):
+            st = footballsim.simulate_game(footballsim.TEAMS[0], footballsim.TEAMS[1], seed=3)
+        self.assertIs(footballsim.random, before)
+        self.assertTrue(st.game_over())
+
+    def test_snap_control_records_residuals_and_restores(self):
+        original = footballsim.sample_play
+        with footballsim.SnapControl() as control:
+            self.assertIsNot(footballsim.sample_play, original)
+            with self.assertRaises(RuntimeError):
+                footballsim.SnapControl().enable()
+            control.reset()
+            footballsim.simulate_game(footballsim.TEAMS[0], footballsim.TEAMS[1], seed=4)
+            self.assertEqual(set(control.residuals), {"Packers", "Bears"})
+            self.assertEqual(len(control.residuals["Packers"]), 2)
+        self.assertIs(footballsim.sample_play, original)
+
+
+class TestImportanceSampling(unittest.TestCase):
+    def test_untilted_sampler_leaves_games_alone(self):
+        plain = footballsim.simulate_game(footballsim.TEAMS[0], footballsim.TEAMS[1], seed=8)
+        originals = (footballsim.chance, footballsim.normal, footballsim.resolve_snap)
+        with footballsim.ImportanceSampler({}) as sampler:
+            self.assertIsNot(footballsim.chance, originals[0])
+            with self.assertRaises(RuntimeError):
+                footballsim.ImportanceSampler({}).enable()
+            st = footballsim.simulate_game(footballsim.TEAMS[0], footballsim.TEAMS[1], seed=8)
+        self.assertEqual((footballsim.chance, footballsim.normal, footballsim.resolve_snap), originals)
+        self.assertEqual(st.scoreboard, plain.scoreboard)
+        self.assertEqual(sampler.weight, 1.0)
+        with self.assertRaises(ValueError):
+            footballsim.ImportanceSampler({"pick_six": footballsim.Tilt(factor=2.0)})
+
+    def test_weights_are_likelihood_ratios(self):
+        tilts = {"touchback": footballsim.Tilt(factor=0.5), "kick_return": footballsim.Tilt(shift=3.0)}
+        with footballsim.ImportanceSampler(tilts) as sampler:
+            footballsim.random.seed(2)
+            u = footballsim.random.random()
+            footballsim.random.seed(2)
+            hit = footballsim.chance(0.6, "touchback")
+            self.assertEqual(hit, u < 0.3)
+            self.assertAlmostEqual(sampler.log_weight, math.log(2.0) if hit else math.log(0.4 / 0.7))
+            sampler.reset()
+            x = footballsim.normal(20.0, 5.0, "kick_return")
+            self.assertAlmostEqual(sampler.log_weight, ((x - 23.0) ** 2 - (x - 20.0) ** 2) / 50.0)
+            sampler.reset()
+            footballsim.chance(0.2, "sack")  # no snap in progress, and sacks are untilted here
+            self.assertEqual(sampler.log_weight, 0.0)
+
+    def test_counts_safeties(self):
+        with footballsim.ImportanceSampler(footballsim.SAFETY_TILTS) as sampler:
+            for seed in range(40):
+                sampler.reset()
+                st = footballsim.simulate_game(footballsim.TEAMS[0], footballsim.TEAMS[1], seed=seed)
+                if sampler.counts["safety"]:
+                    break
+        self.assertGreater(sampler.counts["safety"], 0)
+        self.assertGreaterEqual(sum(st.scoreboard.values()), 2 * sampler.counts["safety"])
+
+
 def load_suite():
     suite = unittest.TestSuite()
     loader = unittest.defaultTestLoader
@@ -794,6 +1708,19 @@ def load_suite():
     suite.addTests(loader.loadTestsFromTestCase(TestStatsAndPrinting))
     suite.addTests(loader.loadTestsFromTestCase(TestUIHelpers))
     suite.addTests(loader.loadTestsFromTestCase(TestGameIntegration))
+    suite.addTests(loader.loadTestsFromTestCase(TestNarration))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameState))
+    suite.addTests(loader.loadTestsFromTestCase(TestWhatIfExplorer))
+    suite.addTests(loader.loadTestsFromTestCase(TestRecordReplay))
+    suite.addTests(loader.loadTestsFromTestCase(TestProfiling))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlayResolution))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlayTypes))
+    suite.addTests(loader.loadTestsFromTestCase(TestClock))
+    suite.addTests(loader.loadTestsFromTestCase(TestKickoffs))
+    suite.addTests(loader.loadTestsFromTestCase(TestConversions))
+    suite.addTests(loader.loadTestsFromTestCase(TestOvertime))
+    suite.addTests(loader.loadTestsFromTestCase(TestVarianceReduction))
+    suite.addTests(loader.loadTestsFromTestCase(TestImportanceSampling))
     return suite
 
 
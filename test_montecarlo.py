@@ -0,0 +1,102 @@
+import unittest
+
+import footballsim
+import montecarlo
+import projections
+
+
+class TestMetrics(unittest.TestCase):
+    def test_metric_values(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], True)
+        st.scoreboard["Packers"], st.scoreboard["Bears"] = 24, 17
+        footballsim.update_run_stats(st.stats, "Packers", "J. Jacobs", 88, False)
+        self.assertEqual(montecarlo.win_prob("Packers").value(st), 1.0)
+        self.assertEqual(montecarlo.win_prob("Bears").value(st), 0.0)
+        self.assertEqual(montecarlo.mean_points("Bears").value(st), 17)
+        self.assertEqual(montecarlo.player_yards("Packers", "J.  Jacobs").value(st), 88)
+        self.assertEqual(montecarlo.player_yards("Packers", "J. Love", "pass_yards").value(st), 0)
+        with self.assertRaises(ValueError):
+            montecarlo.Metric("x", "sacks", "Packers", 1.0)
+        with self.assertRaises(ValueError):
+            montecarlo.player_yards("Packers", "J. Love", "no_such_stat")
+
+    def test_wilson_width_is_not_zero_for_a_shutout_sample(self):
+        stats = projections.RunningStats()
+        for _ in range(50):
+            stats.push(1.0)
+        width = montecarlo.half_width(montecarlo.win_prob("Packers"), stats, 1.96)
+        self.assertGreater(width, 0.01)
+        self.assertEqual(montecarlo.half_width(montecarlo.mean_points("Packers"), stats, 1.96), 0.0)
+
+
+class TestSequential(unittest.TestCase):
+    def test_stops_once_every_target_is_met(self):
+        metrics = [montecarlo.win_prob("Packers", 0.2), montecarlo.mean_points("Bears", 4.0)]
+        result = montecarlo.run_sequential(0, 1, metrics, seed=1, workers=1, chunk=8, min_games=16)
+        self.assertTrue(result.converged)
+        self.assertEqual(result.games % 8, 0)
+        self.assertGreaterEqual(result.games, 16)
+        for m in metrics:
+            self.assertLessEqual(result.estimates[m.name][1], m.target)
+        # A tighter target needs more games
+        tight = montecarlo.run_sequential(0, 1, [montecarlo.win_prob("Packers", 0.12)], seed=1, workers=1,
+                                          chunk=8, min_games=16)
+        self.assertGreater(tight.games, result.games)
+
+    def test_max_games_and_worker_independence(self):
+        metrics = [montecarlo.mean_points("Packers", 0.01)]
+        capped = montecarlo.run_sequential(0, 1, metrics, seed=2, workers=1, chunk=4, max_games=10)
+        self.assertFalse(capped.converged)
+        self.assertEqual(capped.games, 10)
+        loose = [montecarlo.win_prob("Bears", 0.25)]
+        self.assertEqual(montecarlo.run_sequential(1, 0, loose, seed=3, workers=2, chunk=4, min_games=8),
+                         montecarlo.run_sequential(1, 0, loose, seed=3, workers=1, chunk=4, min_games=8))
+
+
+class TestVarianceReduction(unittest.TestCase):
+    def test_solve(self):
+        self.assertEqual(montecarlo._solve([[2.0, 0.0], [0.0, 4.0]], [2.0, 8.0]), [1.0, 2.0])
+        self.assertIsNone(montecarlo._solve([[1.0, 2.0], [2.0, 4.0]], [1.0, 2.0]))
+
+    def test_modes_report_games_and_gain(self):
+        metric = montecarlo.mean_points("Packers")
+        plain = montecarlo.run_reduced(0, 1, metric, 24, seed=1, workers=1, chunk=8)
+        self.assertEqual(plain.games, 24)
+        self.assertAlmostEqual(plain.gain, 1.0)
+        pairs = montecarlo.run_reduced(0, 1, metric, 24, seed=1, workers=1, chunk=8, antithetic=True, stratify=True)
+        self.assertEqual(pairs.games, 48)
+        controlled = montecarlo.run_reduced(0, 1, metric, 24, seed=1, workers=1, chunk=8, control=True)
+        self.assertEqual(controlled.games, 24)
+        self.assertGreater(controlled.gain, 1.0)
+        self.assertAlmostEqual(controlled.effective_games, 24 * controlled.gain)
+        with self.assertRaises(ValueError):
+            montecarlo.run_reduced(0, 1, metric, 2)
+
+
+class TestImportanceSampling(unittest.TestCase):
+    def test_untilted_run_is_a_plain_frequency(self):
+        est = montecarlo.run_importance(0, 1, 40, at_least=1, tilts={}, seed=2, workers=1, chunk=16)
+        self.assertEqual(est.games, 40)
+        self.assertAlmostEqual(est.mean, est.hits / 40)
+        self.assertAlmostEqual(est.weight_ess, est.hits)
+        with self.assertRaises(ValueError):
+            montecarlo.run_importance(0, 1, 40, event="pick_six")
+
+    def test_tilted_run_agrees_with_plain(self):
+        plain = montecarlo.run_importance(0, 1, 200, at_least=1, tilts={}, seed=3, workers=1)
+        tilted = montecarlo.run_importance(0, 1, 200, at_least=1, seed=3, workers=1)
+        self.assertGreater(tilted.hits, plain.hits)
+        spread = (plain.stderr ** 2 + tilted.stderr ** 2) ** 0.5
+        self.assertLess(abs(tilted.mean - plain.mean), 4 * spread)
+
+    def test_tilted_long_field_goals_agree_with_plain(self):
+        plain = montecarlo.run_importance(0, 1, 200, event="long_field_goal", at_least=1, tilts={}, seed=4,
+                                          workers=1)
+        tilted = montecarlo.run_importance(0, 1, 200, event="long_field_goal", at_least=1, seed=4, workers=1)
+        self.assertGreater(tilted.hits, plain.hits)
+        spread = (plain.stderr ** 2 + tilted.stderr ** 2) ** 0.5
+        self.assertLess(abs(tilted.mean - plain.mean), 4 * spread)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,64 @@
+import unittest
+import unittest.mock
+
+import footballsim
+import pricing
+
+
+class TestPrice(unittest.TestCase):
+    def test_make_price_from_scores(self):
+        scores = [(24, 17), (20, 17), (17, 20), (27, 24), (10, 10), (31, 14)]
+        p = pricing.make_price("Packers", "Bears", scores)
+        self.assertEqual(p.games, 6)
+        self.assertEqual(p.spread, -3.0)
+        self.assertEqual(p.total, 39.0)
+        self.assertAlmostEqual(p.home_win_prob, 0.8)  # the tie pushes
+        self.assertAlmostEqual(p.tie_prob, 1 / 6)
+        self.assertAlmostEqual(p.key_numbers[3], 0.5)
+        self.assertEqual((p.home_moneyline, p.away_moneyline), (-400, 400))
+
+    def test_american_odds(self):
+        self.assertEqual(pricing.american_odds(0.5), -100)
+        self.assertEqual(pricing.american_odds(0.6), -150)
+        self.assertEqual(pricing.american_odds(0.25), 300)
+
+
+class TestService(unittest.TestCase):
+    SCORES = [(24, 17), (17, 24)] * 10
+
+    def test_cache_hits_evictions_and_config_changes(self):
+        service = pricing.PricingService(cache_size=2, workers=1)
+        with unittest.mock.patch.object(service, "_simulate", return_value=self.SCORES) as sim:
+            first = service.price("Packers", "Bears")
+            self.assertIs(service.price("Packers", "Bears"), first)
+            self.assertEqual((service.hits, service.misses), (1, 1))
+            service.price("Bears", "Packers")
+            service.price("Lions", "Bears")  # evicts Packers-Bears, the least recently used
+            service.price("Packers", "Bears")
+            self.assertEqual(sim.call_count, 4)
+            with footballsim.config_overridden({"*.run_mean": 9}):
+                service.price("Packers", "Bears")
+            self.assertEqual(sim.call_count, 5)
+            self.assertEqual(len(service.cache), 2)
+
+    def test_adaptive_stop_respects_limits(self):
+        service = pricing.PricingService(workers=1, target_se=1e-9, min_games=4, max_games=6, seed=3)
+        p = service.price("Packers", "Bears")
+        self.assertEqual(p.games, 6)
+        loose = pricing.PricingService(workers=1, target_se=1.0, min_games=4, seed=3).price("Packers", "Bears")
+        self.assertEqual(loose.games, 4)
+
+    def test_price_does_not_depend_on_workers(self):
+        with pricing.PricingService(workers=2, min_games=8, max_games=40, target_se=0.01) as pooled:
+            self.assertIsNotNone(pooled._pool)  # warmed on entry
+            p = pooled.price("Bears", "Lions")
+        self.assertEqual(p, pricing.PricingService(workers=1, min_games=8, max_games=40, target_se=0.01)
+                         .price("Bears", "Lions"))
+
+    def test_win_se_never_reports_zero(self):
+        self.assertGreater(pricing._win_se(10, 0), 0)
+        self.assertEqual(pricing._win_se(0, 0), float("inf"))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,78 @@
+import random
+import statistics
+import unittest
+
+import footballsim
+import projections
+
+
+class TestRunningStats(unittest.TestCase):
+    def test_push_and_merge_match_statistics(self):
+        rng = random.Random(1)
+        xs = [rng.gauss(40, 25) for _ in range(1000)]
+        whole, left, right = projections.RunningStats(), projections.RunningStats(), projections.RunningStats()
+        for i, x in enumerate(xs):
+            whole.push(x)
+            (left if i < 300 else right).push(x)
+        left.merge(right)
+        for rs in (whole, left):
+            self.assertEqual(rs.n, 1000)
+            self.assertAlmostEqual(rs.mean, statistics.fmean(xs))
+            self.assertAlmostEqual(rs.variance, statistics.variance(xs))
+        left.merge(projections.RunningStats())
+        self.assertEqual(left.n, 1000)
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_quantiles_stay_accurate_in_bounded_memory(self):
+        rng = random.Random(2)
+        xs = [rng.random() for _ in range(100000)]
+        sketch = projections.QuantileSketch(200, seed=1)
+        sketch.extend(xs)
+        self.assertEqual(sketch.count, len(xs))
+        self.assertLess(sketch.size, 3 * 200 + 50)
+        for q, v in zip((0.1, 0.5, 0.9), sketch.quantiles((0.1, 0.5, 0.9))):
+            self.assertAlmostEqual(v, q, delta=0.02)
+
+    def test_odd_value_held_back_from_either_end(self):
+        held = set()
+        for seed in range(20):
+            sketch = projections.QuantileSketch(8, seed=seed)
+            sketch.extend(range(9))  # a full, odd level 0
+            held.update(sketch.levels[0])
+            self.assertEqual(sketch.count, 9)
+        self.assertEqual(held, {0, 8})
+
+    def test_merged_sketches_match_one_stream(self):
+        rng = random.Random(3)
+        parts = [projections.QuantileSketch(seed=i) for i in range(8)]
+        for i in range(80000):
+            parts[i % 8].push(rng.expovariate(1.0))
+        merged = parts[0]
+        for p in parts[1:]:
+            merged.merge(p)
+        self.assertEqual(merged.count, 80000)
+        self.assertLess(merged.size, merged.max_size)
+        self.assertAlmostEqual(merged.quantile(0.5), 0.693, delta=0.03)
+        self.assertTrue(all(v != v for v in projections.QuantileSketch().quantiles((0.5,))))
+
+
+class TestPlayerAggregate(unittest.TestCase):
+    def test_projections_count_every_rostered_player_each_game(self):
+        agg = projections.project_players(6, seed=4, workers=1, matchups=[(0, 1), (1, 0)])
+        self.assertEqual(agg.games, 6)
+        summary = agg.summary()
+        packers = footballsim.TEAMS[0]
+        for pos, name in packers.roster.items():
+            self.assertEqual(summary[(packers.name, footballsim.canonical_name(name))]["rush_yards"]["n"], 6)
+        qb = summary[(packers.name, footballsim.canonical_name(packers.roster["QB"]))]["pass_yards"]
+        self.assertLessEqual(qb["p10"], qb["p50"])
+        self.assertLessEqual(qb["p50"], qb["p90"])
+        self.assertGreater(qb["mean"], 0)
+        split = projections.project_players(6, seed=4, workers=2, matchups=[(0, 1), (1, 0)]).summary()
+        self.assertAlmostEqual(split[(packers.name, footballsim.canonical_name(packers.roster["QB"]))]["pass_yards"]["mean"],
+                               qb["mean"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,51 @@
+import unittest
+
+import footballsim
+import ratings
+import season
+
+
+class TestElo(unittest.TestCase):
+    def test_update_is_zero_sum_and_matches_expectation(self):
+        elo = ratings.EloRatings(home_advantage=0)
+        self.assertAlmostEqual(elo.expected(0, 1), 0.5)
+        delta = elo.update(0, 1, 1.0)
+        self.assertAlmostEqual(delta, ratings.K_FACTOR / 2)
+        self.assertAlmostEqual(sum(elo.ratings), ratings.INITIAL_RATING * len(footballsim.TEAMS))
+        self.assertGreater(elo.expected(0, 1), 0.5)
+        # A blowout moves the ratings further than a one-score game
+        close, blowout = ratings.EloRatings(), ratings.EloRatings()
+        self.assertGreater(blowout.update(2, 3, 1.0, margin=28), close.update(2, 3, 1.0, margin=3))
+
+    def test_update_seasons_matches_game_by_game_updates(self):
+        sched = season.make_schedule(0)
+        results = bytes((g * 7) % 3 for g in range(2 * len(sched.games)))
+        batch, single = ratings.EloRatings(), ratings.EloRatings()
+        batch.update_seasons(sched, results)
+        score = {season.HOME_WIN: 1.0, season.AWAY_WIN: 0.0, season.TIE: 0.5}
+        for (home, away), r in zip(sched.games * 2, results):
+            single.update(home, away, score[r])
+        self.assertEqual(batch.games, single.games)
+        for a, b in zip(batch.ratings, single.ratings):
+            self.assertAlmostEqual(a, b)
+        with self.assertRaises(ValueError):
+            batch.update_seasons(sched, bytes(10))
+
+    def test_overrides_feed_team_pass_baselines(self):
+        elo = ratings.EloRatings()
+        elo.ratings[0] += 300
+        overrides = elo.overrides()
+        top = footballsim.TEAMS[0]
+        self.assertGreater(overrides[f"team.{top.name}.comp_adj"], 0)
+        self.assertLess(overrides[f"team.{top.name}.int_adj"], 0)
+        self.assertEqual(elo.power_rankings()[0][0], top.name)
+        before = footballsim.get_team_pass_baselines(top.name)
+        with footballsim.config_overridden(overrides):
+            comp, intr = footballsim.get_team_pass_baselines(top.name)
+            self.assertGreater(comp, before[0])
+            self.assertLess(intr, before[1])
+        self.assertEqual(footballsim.get_team_pass_baselines(top.name), before)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
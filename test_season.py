@@ -0,0 +1,101 @@
+import random
+import unittest
+from collections import Counter
+
+import footballsim
+import season
+
+
+def team(name):
+    return season.TEAM_INDEX[name]
+
+
+class TestSchedule(unittest.TestCase):
+    def test_every_rotation_is_valid(self):
+        for year in range(6):
+            sched = season.make_schedule(year)
+            self.assertEqual(len(sched.games), 32 * 17 // 2)
+            pairs = Counter(frozenset(g) for g in sched.games)
+            for pair, n in pairs.items():
+                a, b = sorted(pair)
+                # Division rivals meet twice, everyone else at most once
+                self.assertEqual(n, 2 if sched.division[a] == sched.division[b] else 1)
+
+    def test_divisions_match_teams(self):
+        self.assertEqual([n for div in footballsim.DIVISIONS.values() for n in div], [t.name for t in footballsim.TEAMS])
+        self.assertEqual(footballsim.TEAM_DIVISION["Chiefs"], "AFC West")
+
+    def test_places_pick_same_place_opponents(self):
+        default = season.make_schedule(0)
+        flipped = season.make_schedule(0, places={"Packers": 3, "Vikings": 0})
+        opponents = lambda s, t: {opp for _, opp, _ in s.team_games[team(t)]}
+        self.assertNotEqual(opponents(default, "Packers"), opponents(flipped, "Packers"))
+        self.assertEqual(opponents(default, "Packers") - opponents(flipped, "Packers"),
+                         opponents(flipped, "Vikings") - opponents(default, "Vikings"))
+
+
+class TestStandings(unittest.TestCase):
+    def setUp(self):
+        self.sched = season.make_schedule(0)
+
+    def _games(self, t, opponent_filter):
+        return [(g, home) for g, opp, home in self.sched.team_games[team(t)] if opponent_filter(opp)]
+
+    def test_short_schedule_records(self):
+        # One game or none per team: the gathers must still return sequences
+        sched = season.Schedule([(0, 1), (2, 3)])
+        st = season.SeasonStandings(sched, bytes([season.HOME_WIN, season.TIE]))
+        self.assertEqual(st.w2[:5], [2, 0, 1, 1, 0])
+        self.assertEqual(st.div_w2[:5], [2, 0, 1, 1, 0])
+        self.assertEqual(sum(st.w2), 4)
+        self.assertEqual(st.record(0), (1, 0, 0))
+        self.assertEqual(st.record(4), (0, 0, 0))
+
+    def test_head_to_head_breaks_division_tie(self):
+        row = bytearray([season.TIE] * len(self.sched.games))
+        packers, bears = team("Packers"), team("Bears")
+        for g, home in self._games("Bears", lambda o: o == packers):
+            row[g] = season.HOME_WIN if home else season.AWAY_WIN
+        # Even out the overall records with games outside the division
+        outside = lambda o: self.sched.conference[o] != self.sched.conference[packers]
+        for g, home in self._games("Packers", outside)[:2]:
+            row[g] = season.HOME_WIN if home else season.AWAY_WIN
+        for g, home in self._games("Bears", outside)[:2]:
+            row[g] = season.AWAY_WIN if home else season.HOME_WIN
+        st = season.SeasonStandings(self.sched, bytes(row))
+        north = [team(n) for n in footballsim.DIVISIONS["NFC North"]]
+        self.assertEqual({st.w2[t] for t in north}, {17})
+        self.assertEqual(st.best(north, "division"), bears)
+        self.assertEqual(st.rank(north, "division")[-1], packers)
+        self.assertEqual(st.record(bears), (2, 2, 13))
+
+    def test_seeds_structure_and_reproducibility(self):
+        rng = random.Random(4)
+        n = 30
+        results = bytes(rng.randrange(2) for _ in range(n * len(self.sched.games)))
+        seeds = season.seed_seasons(self.sched, results, workers=1)
+        self.assertEqual(len(seeds), n * 14)
+        for s in range(n):
+            row = seeds[s * 14:(s + 1) * 14]
+            self.assertEqual(len(set(row)), 14)
+            for c in range(2):
+                conf = row[c * 7:(c + 1) * 7]
+                self.assertTrue(all(self.sched.conference[t] == c for t in conf))
+                self.assertEqual(len({self.sched.division[t] for t in conf[:4]}), 4)
+        self.assertEqual(season.seed_seasons(self.sched, results, workers=2), seeds)
+        odds = season.playoff_odds(seeds)
+        self.assertAlmostEqual(sum(odds.values()), 14.0)
+
+    def test_rejects_partial_seasons(self):
+        with self.assertRaises(ValueError):
+            season.seed_seasons(self.sched, bytes(10), workers=1)
+
+    def test_game_result(self):
+        st = footballsim.GameState.new(footballsim.TEAMS[0], footballsim.TEAMS[1], True)
+        self.assertEqual(season.game_result(st), season.TIE)
+        st.scoreboard["Bears"] = 3
+        self.assertEqual(season.game_result(st), season.AWAY_WIN)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+import footballsim
+import sweep
+
+
+class TestConfigGenerators(unittest.TestCase):
+    def test_grid_is_full_factorial(self):
+        configs = sweep.grid({"*.pass_mean": [7, 9], "Blitz.sack_adj": [0.0, 0.05, 0.1]})
+        self.assertEqual(len(configs), 6)
+        self.assertIn({"*.pass_mean": 9, "Blitz.sack_adj": 0.05}, configs)
+
+    def test_latin_hypercube_hits_every_stratum(self):
+        configs = sweep.latin_hypercube({"*.run_mean": (2.0, 6.0)}, 8, seed=1)
+        strata = sorted(int((c["*.run_mean"] - 2.0) / 0.5) for c in configs)
+        self.assertEqual(strata, list(range(8)))
+        self.assertEqual(configs, sweep.latin_hypercube({"*.run_mean": (2.0, 6.0)}, 8, seed=1))
+
+
+class TestRunSweep(unittest.TestCase):
+    def test_metrics_and_common_random_numbers(self):
+        rows = sweep.run_sweep([{}, {}], games=3, seed="t", workers=1)
+        self.assertEqual(rows[0], rows[1])
+        row = rows[0]
+        self.assertEqual(row["games"], 3)
+        self.assertGreater(row["yards_per_play"], 0)
+        self.assertTrue(0 < row["completion_pct"] < 100)
+
+    def test_overrides_change_results_and_are_restored(self):
+        before = dict(footballsim.DEF_EFFECTS["Nickel"])
+        base, tweaked = sweep.run_sweep([{}, {"*.run_mean": 15, "*.pass_mean": 25}], games=3, seed="t", workers=1)
+        self.assertGreater(tweaked["yards_per_play"], base["yards_per_play"])
+        self.assertEqual(footballsim.DEF_EFFECTS["Nickel"], before)
+
+    def test_cache_reuses_runs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            first = sweep.run_sweep([{"*.tfl_chance": 0.2}], games=2, seed=5, workers=1, cache=sweep.SweepCache(path))
+            self.assertFalse(first[0]["cached"])
+            with unittest.mock.patch("sweep._play_chunk", side_effect=AssertionError("should not simulate")):
+                again = sweep.run_sweep([{"*.tfl_chance": 0.2}], games=2, seed=5, workers=1, cache=sweep.SweepCache(path))
+            self.assertTrue(again[0]["cached"])
+            self.assertEqual(again[0]["yards_per_play"], first[0]["yards_per_play"])
+
+    def test_parallel_matches_inline(self):
+        inline = sweep.run_sweep([{}], games=4, seed=3, workers=1)
+        pooled = sweep.run_sweep([{}], games=4, seed=3, workers=2)
+        self.assertEqual(inline, pooled)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -77,10 +77,17 @@ class FootballSimGUI:
         quick_frame = ttk.Frame(root)
         quick_frame.grid(row=3, column=0, columnspan=6, sticky="we", padx=8, pady=6)
         self.quick_btns = {}
-        for label in ["run", "pass", "deep", "punt", "fg", "stats", "score", "clock", "timeout", "quit"]:
-            b = ttk.Button(quick_frame, text=label.capitalize(), command=lambda v=label: self._set_and_send(v))
-            b.pack(side=tk.LEFT, padx=4)
-            self.quick_btns[label] = b
+        play_row = ttk.Frame(quick_frame)
+        play_row.pack(side=tk.TOP, fill=tk.X)
+        cmd_row = ttk.Frame(quick_frame)
+        cmd_row.pack(side=tk.TOP, fill=tk.X, pady=(4, 0))
+        rows = [(play_row, list(footballsim.OFFENSE_CALLS)),
+                (cmd_row, ["stats", "score", "clock", "timeout", "save", "quit"])]
+        for row, labels in rows:
+            for label in labels:
+                b = ttk.Button(row, text=label.capitalize(), command=lambda v=label: self._set_and_send(v))
+                b.pack(side=tk.LEFT, padx=4)
+                self.quick_btns[label] = b
 
         # --- Formation quick selection ---
         form_frame = ttk.Frame(root)